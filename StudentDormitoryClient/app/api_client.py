@@ -1,6 +1,17 @@
 # StudentDormitoryClient/app/api_client.py
 
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from urllib3.exceptions import NewConnectionError
+
+from .entity_store import EntityStore
+from .offline_queue import OfflineQueue, default_outbox_path
+from .resilience import ResilientSession, CircuitOpenError
 
 
 class ApiClient:
@@ -8,20 +19,575 @@ class ApiClient:
     一个专门用于和后端API通信的客户端类。
     它封装了所有HTTP请求的细节，如URL构建、错误处理和超时设置。
     """
-
-    def __init__(self, base_url="http://127.0.0.1:5000/api"):
+    # query_students / query_rooms 支持的筛选条件（同时也是后端的查询参数名）
+    STUDENT_FILTERS = ('department', 'building', 'allocated', 'gender', 'class_name')
+    ROOM_FILTERS = ('building', 'gender_type')
+    # 网关错误、服务重启等状态码说明后端暂时不可用，与网络中断同样处理
+    UNAVAILABLE_STATUS = (502, 503, 504)
+    # 请求没有得到后端答复时抛出的异常
+    OFFLINE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    # 写操作对应的 HTTP 方法；修改只提交变化的字段（PATCH），后端不支持时按实体类型改用 PUT
+    WRITE_METHODS = {'add': 'post', 'update': 'patch', 'delete': 'delete', 'allocate': 'post'}
+    # 各编辑对话框提交的字段；改用 PUT 提交完整记录时只发送这些字段，不带入住人数、宿舍等派生字段
+    WRITABLE_FIELDS = {
+        'students': ('name', 'gender', 'age', 'student_id', 'department', 'class_name', 'phone'),
+        'teachers': ('name', 'gender', 'age', 'teacher_id', 'department', 'title', 'phone'),
+        'counselors': ('name', 'gender', 'counselor_id', 'department', 'phone'),
+        'dorm_managers': ('name', 'manager_id', 'managed_building', 'phone'),
+        'buildings': ('building_name', 'total_rooms', 'available_rooms'),
+        'rooms': ('building_name', 'room_number', 'capacity', 'gender_type'),
+    }
+    # 没有得到确定答复的写请求，在这段时间（秒）内重复提交时复用同一个幂等键
+    IDEMPOTENCY_WINDOW = 600
+
+    def __init__(self, base_url="http://127.0.0.1:5000/api", outbox_path: str = None):
         """
         初始化API客户端。
 
         Args:
             base_url (str): 后端API的根地址。
+            outbox_path (str): 离线队列文件的路径，为 None 时使用用户目录下的默认位置，
+                               按后端地址和登录的账号区分（见 default_outbox_path）。
         """
         self.base_url = base_url
-        # 使用 requests.Session() 可以复用TCP连接，并保持cookies，效率更高
-        self.session = requests.Session()
-        # 为所有请求设置一个默认的超时时间（秒）
+        # 使用 requests.Session() 可以复用TCP连接，并保持cookies，效率更高；
+        # ResilientSession 在此基础上按接口学习超时期限，并对持续失败的接口熔断
+        self.session = ResilientSession()
+        # 为所有请求设置一个默认的超时时间（秒），接口积累了足够的耗时样本后改用学习到的期限
         self.timeout = 5
         self.current_user = None  # 【核心新增】用于存储当前登录用户的信息
+        # 所有界面共享的实体仓库，列表响应和增删改结果都会写入这里
+        self.store = EntityStore()
+        # 批量接口一次提交较多数据，单独给一个更宽松的超时时间
+        self.bulk_timeout = 30
+        # 记录后端不支持的批量接口，之后直接走逐条提交，不再重复探测
+        self._unsupported_bulk_routes = set()
+        # 记录不支持 PATCH 的实体类型，之后的修改直接以 PUT 提交完整记录
+        self._put_only_kinds = set()
+        # 每个列表查询最近一次返回的 id 列表，离线时据此从仓库中取出记录：(路径, 参数) -> id 列表
+        self._last_ids = {}
+        # 列表查询的 ETag，用于条件请求：(路径, 参数) -> ETag
+        self._validators = {}
+        # 网络不可用时暂存写操作的持久化队列，恢复连接后由 replay_offline_queue 按顺序重放
+        self._fixed_outbox = outbox_path is not None
+        self.outbox = OfflineQueue(outbox_path or default_outbox_path(base_url))
+        self._replay_lock = threading.Lock()
+        # 写请求没有得到答复时，用同一个幂等键自动重试的次数，以及第一次重试前等待的秒数（之后逐次加倍）
+        self.max_retries = 2
+        self.retry_backoff = 0.5
+        # 还没有得到确定答复的写请求：请求签名 -> (幂等键, 提交时间)
+        self._unsettled_keys = {}
+        self._key_lock = threading.Lock()
+        # 学生首页数据（个人资料、宿舍、室友），本次登录期间缓存
+        self._dashboard = None
+
+    def metrics(self) -> list:
+        """各接口的延迟统计和熔断器状态（见 ResilientSession.metrics）"""
+        metrics = getattr(self.session, 'metrics', None)
+        return metrics() if metrics else []
+
+    def _cache_list(self, kind: str, result, complete: bool = False):
+        """把列表响应写入实体仓库。complete 为 True 表示这是该类实体的完整列表"""
+        if isinstance(result, list):
+            if complete:
+                self.store.replace_all(kind, result)
+            else:
+                self.store.merge(kind, result)
+        return result
+
+    def _cache_entity(self, kind: str, result, merge: bool = False):
+        """
+        把新增/修改接口返回的单条记录写入实体仓库。
+        merge 为 True 时（修改接口的答复）只覆盖返回的字段，后端只返回改动的字段时其余字段保留。
+        """
+        if isinstance(result, dict) and 'id' in result:
+            if merge and self.store.contains(kind, result['id']):
+                self.store.update_fields(kind, result['id'], result)
+            else:
+                self.store.upsert(kind, result)
+        return result
+
+    def _forget_entity(self, kind: str, entity_id: int, is_deleted: bool):
+        """删除成功后把记录从实体仓库中移除"""
+        if is_deleted:
+            self.store.remove(kind, entity_id)
+        return is_deleted
+
+    @staticmethod
+    def _query_params(filters: dict, allowed: tuple, fields=None, sort=None, limit: int = None,
+                      offset: int = None) -> dict:
+        """把查询条件转换成请求参数，值为 None 或空字符串的筛选条件会被忽略"""
+        params = {}
+        for key, value in (filters or {}).items():
+            if key not in allowed:
+                raise ValueError(f"不支持的筛选条件: {key}")
+            if value is None or value == '':
+                continue
+            params[key] = ('true' if value else 'false') if isinstance(value, bool) else value
+        if fields:
+            # id 始终需要返回，实体仓库按 id 合并记录
+            params['fields'] = ','.join(dict.fromkeys(['id', *fields]))
+        if sort:
+            params['sort'] = sort if isinstance(sort, str) else ','.join(sort)
+        if limit is not None:
+            params['limit'] = limit
+        if offset is not None:
+            params['offset'] = offset
+        return params
+
+    def _query(self, kind: str, path: str, params: dict):
+        """
+        执行一次列表查询并写入实体仓库。
+        没有任何筛选和分页时，结果就是该类实体的完整列表；
+        带 fields 投影时只合并返回的字段，不会覆盖记录中其它已知字段。
+        后端返回过 ETag 时带上 If-None-Match 重新验证，数据没有变化（304）时直接使用仓库中的记录。
+        离线时不发请求，同一查询上一次的结果从仓库中取出（包括离线期间在本地生效的修改）。
+        """
+        key = (path, tuple(sorted(params.items())))
+        cached_ids = self._last_ids.get(key)
+        if self.outbox.offline and cached_ids is not None:
+            return self.store.get_many(kind, cached_ids)
+        etag = self._validators.get(key) if cached_ids is not None else None
+        headers = {'If-None-Match': etag} if etag else None
+        try:
+            response = self.session.get(f"{self.base_url}/{path}", params=params, headers=headers,
+                                        timeout=self.timeout)
+            self._check_available(response)
+            self.outbox.set_offline(False)
+            if response.status_code == 304 and etag:
+                return self.store.get_many(kind, cached_ids)
+            response.raise_for_status()
+            result = response.json()
+        except self.OFFLINE_ERRORS as err:
+            self.outbox.set_offline(True)
+            return self.store.get_many(kind, cached_ids) if cached_ids is not None else {"error": str(err)}
+        except requests.exceptions.RequestException as err:
+            return {"error": str(err)}
+        if isinstance(result, list):
+            self._last_ids[key] = [row['id'] for row in result if 'id' in row]
+            if response.headers.get('ETag'):
+                self._validators[key] = response.headers.get('ETag')
+        complete = not (set(params) - {'fields', 'sort'})
+        if 'fields' in params and isinstance(result, list):
+            self.store.merge_fields(kind, result, complete=complete)
+            return result
+        return self._cache_list(kind, result, complete=complete)
+
+    def query_students(self, filters: dict = None, fields=None, sort=None, limit: int = None, offset: int = None):
+        """
+        按条件查询学生，筛选、排序和分页都由后端完成。
+
+        Args:
+            filters (dict): 可组合的筛选条件，键为 STUDENT_FILTERS 之一，
+                            例如 {'department': '计算机学院', 'allocated': False}。
+            fields (list): 只返回这些字段（id 总会返回），为 None 时返回全部字段。
+            sort (list or str): 排序字段，'-' 前缀表示降序，例如 ['department', '-student_id']。
+            limit (int), offset (int): 分页参数。
+        """
+        params = self._query_params(filters, self.STUDENT_FILTERS, fields, sort, limit, offset)
+        return self._query('students', 'students/', params)
+
+    def query_rooms(self, filters: dict = None, fields=None, sort=None, limit: int = None, offset: int = None):
+        """按条件查询宿舍房间，参数含义同 query_students，筛选条件见 ROOM_FILTERS"""
+        params = self._query_params(filters, self.ROOM_FILTERS, fields, sort, limit, offset)
+        return self._query('rooms', 'rooms/', params)
+
+    def fetch_page(self, kind: str, filters: dict = None, fields=None, sort=None, offset: int = 0, limit: int = 200):
+        """
+        取列表的一页，不写入实体仓库，供只在内存中保留部分页面的表格使用（见 PagedTableModel）。
+        后端忽略分页参数（返回了全部数据）时，在本地截取这一页。
+
+        Args:
+            kind (str): 'students' 或 'rooms'，筛选条件分别见 STUDENT_FILTERS、ROOM_FILTERS。
+        """
+        allowed = {'students': self.STUDENT_FILTERS, 'rooms': self.ROOM_FILTERS}.get(kind)
+        if allowed is None:
+            raise ValueError(f"不支持分页查询: {kind}")
+        params = self._query_params(filters, allowed, fields, sort, limit, offset)
+        try:
+            response = self.session.get(f"{self.base_url}/{kind}/", params=params, timeout=self.timeout)
+            self._check_available(response)
+            self.outbox.set_offline(False)
+            response.raise_for_status()
+            result = response.json()
+        except self.OFFLINE_ERRORS as err:
+            self.outbox.set_offline(True)
+            return {"error": str(err)}
+        except requests.exceptions.RequestException as err:
+            return {"error": str(err)}
+        if isinstance(result, list) and len(result) > limit:
+            result = result[offset:offset + limit]
+        return result
+
+    def _bulk_post(self, bulk_path: str, payload_key: str, items: list, single_func,
+                   chunk_size: int = 500, max_workers: int = 8):
+        """
+        把 items 分块提交到批量接口，返回与 items 一一对应的结果列表。
+        后端没有该批量接口（404/405）时，退化为有并发上限的逐条提交。
+
+        Args:
+            bulk_path (str): 批量接口路径，例如 'allocations/bulk'。
+            payload_key (str): 请求体中条目列表的键名。
+            items (list): 待提交的条目（字典）。
+            single_func (callable): 逐条提交时调用的函数，参数为单个条目。
+
+        Returns:
+            list: 每个结果都是在原条目字段上附加 'success' 以及 'data' 或 'error' 的字典。
+        """
+        results = []
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            chunk_results = None
+            # 离线期间逐条提交，由各自的单条方法决定是否进入离线队列
+            if bulk_path not in self._unsupported_bulk_routes and not self.outbox.is_active():
+                chunk_results = self._post_bulk_chunk(bulk_path, payload_key, chunk)
+            if chunk_results is None:
+                chunk_results = self._post_individually(chunk, single_func, max_workers)
+            results.extend(chunk_results)
+        return results
+
+    def _post_bulk_chunk(self, bulk_path: str, payload_key: str, chunk: list):
+        """提交一个分块；返回 None 表示后端不支持批量接口"""
+        payload = {payload_key: chunk}
+        signature, key = self._idempotency_key('post', bulk_path, payload)
+        try:
+            response, _ = self._send_with_retry('post', bulk_path, payload, key, timeout=self.bulk_timeout)
+        except self.OFFLINE_ERRORS as err:
+            self.outbox.set_offline(True)
+            if self._not_sent(err):
+                # 请求肯定没有送达后端，改为逐条提交（进入离线队列）
+                return None
+            # 网关错误、连接中断、读超时：分块可能已经执行，逐条重新提交会重复写入。
+            # 幂等键保留，稍后重新提交同一批记录时后端可以识别
+            error = f"{err}；批量提交的结果未知，请稍后刷新确认"
+            return [{**item, 'success': False, 'error': error} for item in chunk]
+        except requests.exceptions.RequestException as err:
+            return [{**item, 'success': False, 'error': str(err)} for item in chunk]
+        self._settle_key(signature)
+        if response.status_code in (404, 405):
+            self._unsupported_bulk_routes.add(bulk_path)
+            return None
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        per_item = body.get('results') if isinstance(body, dict) else body
+        if not isinstance(per_item, list) or len(per_item) != len(chunk):
+            error = body.get('error') if isinstance(body, dict) else None
+            error = error or f"批量接口返回了无法识别的结果 (HTTP {response.status_code})"
+            return [{**item, 'success': False, 'error': error} for item in chunk]
+        return [self._item_result(item, result) for item, result in zip(chunk, per_item)]
+
+    def _post_individually(self, chunk: list, single_func, max_workers: int):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda item: self._item_result(item, single_func(item)), chunk))
+
+    @staticmethod
+    def _item_result(item: dict, result):
+        """把单个条目的返回值统一成 {'success': ..., 'data'/'error': ...} 的形式"""
+        if isinstance(result, dict) and 'error' in result:
+            return {**item, 'success': False, 'error': result['error']}
+        if isinstance(result, dict) and result.get('success') is False:
+            return {**item, 'success': False, 'error': result.get('message', 'API返回失败')}
+        if result is None or result is False:
+            return {**item, 'success': False, 'error': "API返回失败"}
+        return {**item, 'success': True, 'data': result}
+
+    # --- 写操作与离线队列 ---
+
+    @staticmethod
+    def _not_sent(err) -> bool:
+        """连接没有建立（连接被拒绝、域名解析失败、连接超时），请求肯定没有到达后端"""
+        if isinstance(err, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(err.args[0], 'reason', None) if err.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def _check_available(self, response):
+        """后端暂时不可用（UNAVAILABLE_STATUS）时按网络中断处理"""
+        if response.status_code in self.UNAVAILABLE_STATUS:
+            raise requests.exceptions.ConnectionError(f"后端暂时不可用 (HTTP {response.status_code})")
+
+    @staticmethod
+    def _write_path(op: str, kind: str, entity_id=None) -> str:
+        if op == 'allocate':
+            return "allocations/"
+        return f"{kind}/" if op == 'add' else f"{kind}/{entity_id}"
+
+    def _send(self, method: str, path: str, payload: dict = None, headers: dict = None, timeout: float = None):
+        kwargs = {'json': payload} if payload is not None else {}
+        if headers:
+            kwargs['headers'] = headers
+        send = getattr(self.session, method)
+        response = send(f"{self.base_url}/{path}", timeout=timeout or self.timeout, **kwargs)
+        self._check_available(response)
+        return response
+
+    def _idempotency_key(self, method: str, path: str, payload) -> tuple:
+        """
+        为一次写请求取得幂等键。
+        相同的请求（方法、路径和请求体都相同）上一次提交还没有得到确定答复时（仍在进行，或者超时），
+        在 IDEMPOTENCY_WINDOW 秒内复用上一次的幂等键：用户因为不确定结果而重复提交，后端也只会执行一次。
+        写操作进入离线队列后，幂等键就归队列中的那条修改所有，同时结束复用：
+        之后再提交相同的内容（例如 a→b→a 的修改）是一次新的操作。
+
+        Returns:
+            tuple: (请求签名, 幂等键)，得到确定答复后用请求签名调用 _settle_key。
+        """
+        signature = json.dumps([method, path, payload], sort_keys=True, ensure_ascii=False)
+        now = time.monotonic()
+        with self._key_lock:
+            self._unsettled_keys = {sig: value for sig, value in self._unsettled_keys.items()
+                                    if now - value[1] < self.IDEMPOTENCY_WINDOW}
+            key = self._unsettled_keys.get(signature, (uuid.uuid4().hex, now))[0]
+            self._unsettled_keys[signature] = (key, now)
+        return signature, key
+
+    def _settle_key(self, signature: str):
+        """请求得到了确定的答复，之后相同的请求视为新的操作"""
+        with self._key_lock:
+            self._unsettled_keys.pop(signature, None)
+
+    def _send_with_retry(self, method: str, path: str, payload, key: str, timeout: float = None):
+        """
+        带幂等键发送写请求；请求没有得到答复时用同一个幂等键重试，最多 max_retries 次，间隔逐次加倍。
+        后端按幂等键去重，即使前一次请求其实已经生效，重试也不会重复执行。
+
+        Returns:
+            tuple: (响应, 重试次数)。
+        Raises:
+            OFFLINE_ERRORS 中的异常: 重试之后仍然没有得到答复。之前某次请求可能已经送达时，
+                                     抛出的是那一次的异常（见 _not_sent）。
+        """
+        uncertain = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._send(method, path, payload, {'Idempotency-Key': key}, timeout), attempt
+            except self.OFFLINE_ERRORS as err:
+                if not self._not_sent(err):
+                    uncertain = uncertain or err
+                if attempt == self.max_retries:
+                    if uncertain is not None and uncertain is not err:
+                        raise uncertain
+                    raise
+                time.sleep(self.retry_backoff * 2 ** attempt)
+
+    def _write(self, op: str, kind: str, entity_id=None, payload: dict = None, cache: bool = True):
+        """
+        执行一次写操作（op 为 add/update/delete/allocate），成功后更新实体仓库。
+        离线、请求没有得到答复，或者离线队列中还有未同步的修改时，记入离线队列并先在本地生效，
+        返回值的形式与在线时相同，界面照常处理。
+        修改以 PATCH 提交，payload 只需包含改动的字段；后端不支持 PATCH 时改用 PUT 提交完整记录（见 _put_instead）。
+        cache 为 False 时在线成功后不写入实体仓库，由批量操作的调用方统一写入。
+        """
+        method, path = self.WRITE_METHODS[op], self._write_path(op, kind, entity_id)
+        signature, key = self._idempotency_key(method, path, payload)
+        if self.outbox.is_active():
+            return self._queue_write(op, kind, entity_id, payload, key=key, signature=signature)
+        try:
+            if op == 'update' and kind in self._put_only_kinds:
+                response, retries = self._send_with_retry('put', path, self._full_record(kind, entity_id, payload), key)
+            else:
+                response, retries = self._send_with_retry(method, path, payload, key)
+                if op == 'update' and response.status_code in (404, 405):
+                    response, retries = self._put_instead(kind, entity_id, path, payload)
+        except self.OFFLINE_ERRORS as err:
+            # 结果仍不确定：用同一个幂等键进入离线队列，恢复连接后重放时由后端去重
+            self.outbox.set_offline(True)
+            return self._queue_write(op, kind, entity_id, payload, err, key, signature)
+        except requests.exceptions.RequestException as err:
+            self._settle_key(signature)
+            return False if op == 'delete' else {"error": str(err)}
+        self._settle_key(signature)
+        if op == 'delete':
+            # 重试得到 404，说明之前没有得到答复的那次请求已经删除了记录
+            deleted = response.status_code == 204 or (retries > 0 and response.status_code == 404)
+            return self._forget_entity(kind, entity_id, deleted) if cache else deleted
+        try:
+            result = response.json()
+        except ValueError:
+            # 例如网关或服务器错误返回的 HTML 页面；按失败处理，调用方据此撤销先行修改
+            return {"error": f"后端返回了无法解析的答复 (HTTP {response.status_code})"}
+        return result if op == 'allocate' or not cache else self._cache_entity(kind, result, merge=op == 'update')
+
+    def _full_record(self, kind: str, entity_id, payload: dict) -> dict:
+        """PUT 需要完整的记录：仓库中当前记录的可写字段（WRITABLE_FIELDS），加上要修改的字段"""
+        record = self.store.get(kind, entity_id) or {}
+        writable = {field: record[field] for field in self.WRITABLE_FIELDS.get(kind, ()) if field in record}
+        return {**writable, **payload}
+
+    def _put_instead(self, kind: str, entity_id, path: str, payload: dict):
+        """
+        PATCH 得到 404/405 时改用 PUT 提交完整记录（PATCH 没有被执行，使用新的幂等键）。
+        PUT 被接受说明后端不支持 PATCH，记住该类实体，之后直接使用 PUT；PUT 同样得到 404 时记录确实不存在。
+        """
+        response, retries = self._send_with_retry('put', path, self._full_record(kind, entity_id, payload),
+                                                  uuid.uuid4().hex)
+        if response.status_code not in (404, 405):
+            self._put_only_kinds.add(kind)
+        return response, retries
+
+    def _queue_write(self, op: str, kind: str, entity_id=None, payload: dict = None, err=None, key: str = None,
+                     signature: str = None):
+        """把写操作记入离线队列，并在本地仓库中先行生效；之后不再为相同的请求复用 key"""
+        if signature is not None:
+            self._settle_key(signature)
+        if payload and 'password' in payload:
+            # 带密码的请求（新建账户等）不写入磁盘
+            error = str(err) if err else "网络不可用"
+            return False if op == 'delete' else {"error": f"{error}，涉及密码的操作需要在线完成"}
+        if key and self.outbox.has_key(key):
+            # 同时发出、共用同一个幂等键的相同请求已经在队列中，不再重复记入，也不再重复在本地生效
+            if op == 'update':
+                return {**(self.store.get(kind, entity_id) or {}), 'id': entity_id}
+            return True if op == 'delete' else {"error": "相同的操作已在等待同步，不会重复提交"}
+        if op == 'add':
+            temp_id = self.outbox.next_temp_id()
+            self.outbox.append(op, kind, payload=payload, temp_id=temp_id, key=key)
+            return self._cache_entity(kind, {**payload, 'id': temp_id})
+        base = self.store.get(kind, entity_id) if op != 'allocate' else None
+        self.outbox.append(op, kind, entity_id, payload, base, key=key)
+        if op == 'update':
+            self.store.update_fields(kind, entity_id, payload)
+            return {**(base or {}), **payload, 'id': entity_id}
+        if op == 'delete':
+            self.store.remove(kind, entity_id)
+            return True
+        return {'message': "网络不可用，分配已暂存，恢复连接后自动提交", 'queued': True}
+
+    def ping(self) -> bool:
+        """后端是否可以连通（除 UNAVAILABLE_STATUS 以外的任何 HTTP 答复都算连通）"""
+        try:
+            response = self.session.get(f"{self.base_url}/", timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code not in self.UNAVAILABLE_STATUS
+
+    def replay_offline_queue(self):
+        """
+        按顺序重放离线队列中的修改，每条修改都带上它的幂等键；遇到网络问题时停下，剩余的修改留待下次。
+        修改和删除提交前先与后端的当前记录比较，离线期间已被他人改动（或删除）时视为冲突：
+        该修改被放弃，本地的先行修改被撤销。被后端拒绝的修改同样处理。
+
+        Returns:
+            dict: {'replayed': 成功提交数, 'conflicts': [冲突或被拒绝的修改及原因],
+                   'remaining': 剩余的修改数, 'offline': 是否仍然离线}
+        """
+        report = {'replayed': 0, 'conflicts': []}
+        if not self._replay_lock.acquire(blocking=False):
+            return {**report, 'remaining': len(self.outbox), 'offline': self.outbox.offline}
+        try:
+            if not self.ping():
+                self.outbox.set_offline(True)
+            else:
+                self.outbox.set_offline(False)
+                self._drain_outbox(report)
+        finally:
+            self._replay_lock.release()
+        return {**report, 'remaining': len(self.outbox), 'offline': self.outbox.offline}
+
+    def _drain_outbox(self, report: dict):
+        while True:
+            entry = self.outbox.peek()
+            if entry is None:
+                return
+            try:
+                problem = self._replay_entry(entry)
+            except self.OFFLINE_ERRORS:
+                self.outbox.set_offline(True)
+                return
+            except CircuitOpenError:
+                # 接口熔断中：修改没有发出，留在队列中等下一次同步，不按冲突放弃
+                return
+            except (requests.exceptions.RequestException, ValueError) as err:
+                problem = str(err)
+            if problem:
+                self._revert_entry(entry)
+                report['conflicts'].append(f"{OfflineQueue.describe(entry)}：{problem}")
+            else:
+                report['replayed'] += 1
+            self.outbox.acknowledge(entry['key'])
+
+    def _replay_entry(self, entry: dict):
+        """提交一条离线修改。成功时返回 None，冲突或被后端拒绝时返回原因"""
+        op, kind, entity_id, payload = entry['op'], entry['kind'], entry['entity_id'], entry['payload']
+        if (entity_id is not None and entity_id < 0) or (op == 'allocate' and min(payload.values()) < 0):
+            return "所依赖的离线新增记录没有提交成功"
+        path = self._write_path(op, kind, entity_id)
+        if op in ('update', 'delete') and entry.get('base'):
+            conflict = self._find_conflict(op, path, entry['base'], payload)
+            if conflict:
+                return conflict
+        if op == 'update' and kind in self._put_only_kinds:
+            response = self._send('put', path, self._full_record(kind, entity_id, payload),
+                                  {'Idempotency-Key': entry['key']})
+        else:
+            response = self._send(self.WRITE_METHODS[op], path, payload, {'Idempotency-Key': entry['key']})
+            if op == 'update' and response.status_code in (404, 405):
+                response, _ = self._put_instead(kind, entity_id, path, payload)
+        if op == 'delete':
+            # 404：记录已经不存在，删除的目的已经达到
+            if response.status_code in (204, 404):
+                self.store.remove(kind, entity_id)
+                return None
+            return f"HTTP {response.status_code}"
+        result = response.json()
+        if response.status_code >= 400 or not isinstance(result, dict) or 'error' in result \
+                or result.get('success') is False:
+            if isinstance(result, dict):
+                return result.get('error') or result.get('message') or f"HTTP {response.status_code}"
+            return f"HTTP {response.status_code}"
+        if op == 'add':
+            self.store.remove(kind, entry['temp_id'])
+            self._cache_entity(kind, result)
+            if 'id' in result:
+                self.outbox.remap(kind, entry['temp_id'], result['id'])
+        elif op == 'update':
+            self._cache_entity(kind, result, merge=True)
+        return None
+
+    def _find_conflict(self, op: str, path: str, base: dict, payload: dict):
+        """
+        比较后端的当前记录和离线修改时的本地快照 base：
+        修改时，要改的字段被他人改成了别的值；删除时，记录的任何字段被他人改过，都算冲突。
+        后端不支持读取单条记录时不做检查。
+        """
+        response = self.session.get(f"{self.base_url}/{path}", timeout=self.timeout)
+        self._check_available(response)
+        if response.status_code == 404:
+            return "记录已被他人删除" if op == 'update' else None
+        if response.status_code != 200:
+            return None
+        current = response.json()
+        if not isinstance(current, dict):
+            return None
+        fields = payload if op == 'update' else base
+        changed = [field for field in fields if field != 'id' and field in base and field in current
+                   and current[field] != base[field] and (op == 'delete' or current[field] != payload[field])]
+        return f"离线期间已被他人修改（{', '.join(changed)}）" if changed else None
+
+    def _revert_entry(self, entry: dict):
+        """撤销被放弃的离线修改在本地仓库中的先行修改（分配的撤销由界面重新加载完成）"""
+        if entry['op'] == 'add':
+            self.store.remove(entry['kind'], entry['temp_id'])
+        elif entry['op'] in ('update', 'delete') and entry.get('base'):
+            self.store.upsert(entry['kind'], entry['base'])
+
+    def apply_allocation_locally(self, student_id: int, room_id: int):
+        """
+        在提交分配请求之前，先在本地仓库中完成分配：
+        学生写入楼栋和房间号，房间已住人数加一。
+
+        Returns:
+            OptimisticChange: 请求失败时用于回滚。
+        """
+        change = self.store.begin_change()
+        room = self.store.get('rooms', room_id)
+        if room is not None:
+            change.increment('rooms', room_id, 'current_occupancy', 1)
+            change.update_fields('students', student_id, {'dormitory_building': room.get('building_name'),
+                                                          'dormitory_room': room.get('room_number')})
+        return change
 
     def login(self, username, password, role):
         """
@@ -40,6 +606,9 @@ class ApiClient:
             # 【核心新增】登录成功后，保存用户信息
             if result and 'user' in result:
                 self.current_user = result['user']
+                self._dashboard = None
+                if not self._fixed_outbox:
+                    self.outbox.switch_to(default_outbox_path(self.base_url, username, role))
             return result
         except requests.exceptions.HTTPError as err:
             print(f"登录失败 (HTTP Error): {err.response.status_code} - {err.response.text}")
@@ -73,9 +642,62 @@ class ApiClient:
             url = f"{self.base_url}/me/profile"
             headers = {'X-Username': self.current_user['username'], 'X-Role': self.current_user['role']}
             response = self.session.put(url, headers=headers, json=data, timeout=self.timeout)
-            return response.json()
+            result = response.json()
+        except requests.exceptions.RequestException as err:
+            return {"error": str(err)}
+        if self._dashboard is not None and isinstance(result, dict) and 'error' not in result:
+            self._dashboard = {**self._dashboard, 'profile': {**self._dashboard['profile'], **result}}
+        return result
+
+    def get_my_dashboard(self, refresh: bool = False, roommate_fields=None):
+        """
+        一次取回学生首页需要的全部数据。
+        优先使用组合接口 /me/dashboard；后端没有该接口时，并发请求个人资料和室友列表后在本地组合，
+        室友列表只请求 roommate_fields 指定的字段（见 get_my_roommates）。
+        结果在本次登录期间缓存，个人信息对话框等处直接复用；refresh 为 True 时重新请求。
+
+        Returns:
+            dict: {'profile': 个人资料, 'room': 宿舍（未分配时为 None）, 'roommates': 室友列表}
+        """
+        if not self.current_user or self.current_user.get('role') != 'student':
+            return {"error": "当前用户不是学生或未登录"}
+        if self._dashboard is not None and not refresh:
+            return self._dashboard
+        try:
+            url = f"{self.base_url}/me/dashboard"
+            headers = {'X-Username': self.current_user['username'], 'X-Role': self.current_user['role']}
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code in (404, 405):
+                dashboard = self._compose_dashboard(roommate_fields)
+            else:
+                response.raise_for_status()
+                dashboard = response.json()
+                if not isinstance(dashboard, dict) or ('error' not in dashboard and not dashboard.get('profile')):
+                    # 组合接口的答复中没有个人资料，改为分别请求后在本地组合
+                    dashboard = self._compose_dashboard(roommate_fields)
         except requests.exceptions.RequestException as err:
             return {"error": str(err)}
+        if 'error' in dashboard:
+            return dashboard
+        if dashboard.get('room') is None:
+            dashboard['room'] = self._dorm_room_of(dashboard['profile'])
+        self._dashboard = dashboard
+        return dashboard
+
+    def _compose_dashboard(self, roommate_fields=None):
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard") as executor:
+            profile_future = executor.submit(self.get_my_profile)
+            roommates_future = executor.submit(self.get_my_roommates, fields=roommate_fields)
+            profile, roommates = profile_future.result(), roommates_future.result()
+        for part in (profile, roommates):
+            if isinstance(part, dict) and 'error' in part:
+                return part
+        return {'profile': profile, 'room': self._dorm_room_of(profile), 'roommates': roommates}
+
+    @staticmethod
+    def _dorm_room_of(profile: dict):
+        building, room = profile.get('dormitory_building'), profile.get('dormitory_room')
+        return {'building_name': building, 'room_number': room} if building and room else None
 
     def change_my_password(self, old_password: str, new_password: str):
         """修改当前用户的密码"""
@@ -94,287 +716,225 @@ class ApiClient:
 
     def add_student(self, data: dict):
         """添加新学生"""
+        return self._write('add', 'students', payload=data)
+
+    def _create_student(self, data: dict):
+        if self.outbox.offline:
+            return {"error": "网络不可用"}
+        signature, key = self._idempotency_key('post', 'students/', data)
         try:
-            url = f"{self.base_url}/students/"
-            response = self.session.post(url, json=data, timeout=self.timeout)
-            return response.json()
+            response, _ = self._send_with_retry('post', 'students/', data, key)
+            result = response.json()
         except requests.exceptions.RequestException as err:
+            # 没有得到答复时保留幂等键，重新导入同一条记录时后端可以识别重复
             return {"error": str(err)}
+        self._settle_key(signature)
+        return result
+
+    def add_students_bulk(self, students: list, chunk_size: int = 500, max_workers: int = 8):
+        """
+        批量添加学生。优先提交到 /students/bulk，后端不支持时退化为并发的逐条添加。
+        逐条添加时不会逐条写入实体仓库，由调用方在每个分块完成后统一合并，避免界面被大量单条通知淹没。
+
+        Returns:
+            list: 与 students 一一对应的结果（见 _bulk_post）。
+        """
+        return self._bulk_post('students/bulk', 'students', students, self._create_student,
+                               chunk_size=chunk_size, max_workers=max_workers)
+
+    def bulk_delete(self, kind: str, ids: list, chunk_size: int = 500, max_workers: int = 4):
+        """
+        批量删除。优先提交到 /<kind>/bulk_delete，后端不支持时退化为有并发上限的逐条删除。
+        与 add_students_bulk 一样不逐条写入实体仓库，由调用方在全部完成后一次性移除（见 EntityStore.remove_many）。
+
+        Args:
+            kind (str): 实体类型，例如 'students'、'rooms'。
+
+        Returns:
+            list: 与 ids 一一对应的结果 {'id', 'success', 以及 'data' 或 'error'}（见 _bulk_post）。
+        """
+        return self._bulk_post(f'{kind}/bulk_delete', kind, [{'id': entity_id} for entity_id in ids],
+                               lambda item: self._write('delete', kind, item['id'], cache=False),
+                               chunk_size=chunk_size, max_workers=max_workers)
+
+    def bulk_update(self, kind: str, ids: list, fields: dict, chunk_size: int = 500, max_workers: int = 4):
+        """
+        把多条记录的若干字段改成相同的值（例如把 300 名学生的班级改为同一个班），
+        提交方式与写入实体仓库的约定同 bulk_delete（见 EntityStore.update_many）。
+
+        Returns:
+            list: 与 ids 一一对应的结果 {'id', 修改的字段..., 'success', 以及 'data' 或 'error'}。
+        """
+        return self._bulk_post(f'{kind}/bulk_update', kind, [{'id': entity_id, **fields} for entity_id in ids],
+                               lambda item: self._write('update', kind, item['id'], fields, cache=False),
+                               chunk_size=chunk_size, max_workers=max_workers)
 
     def update_student(self, student_id: int, data: dict):
         """修改学生信息"""
-        try:
-            url = f"{self.base_url}/students/{student_id}"
-            response = self.session.put(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('update', 'students', student_id, data)
 
     def delete_student(self, student_id: int):
         """删除学生"""
-        try:
-            url = f"{self.base_url}/students/{student_id}"
-            response = self.session.delete(url, timeout=self.timeout)
-            return response.status_code == 204
-        except requests.exceptions.RequestException as err:
-            return False
+        return self._write('delete', 'students', student_id)
 
     def get_teachers(self):
         """
         调用后端接口获取所有教师列表。
         """
-        try:
-            url = f"{self.base_url}/teachers/"
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            print(f"获取教师列表时发生网络错误: {err}")
-            # 返回一个带error键的字典，以符合ApiWorker的预期
-            return {"error": str(err)}
+        return self._query('teachers', 'teachers/', {})
 
     def add_teacher(self, data: dict):
         """调用后端接口添加新教师 (包含登录账户信息)"""
-        try:
-            url = f"{self.base_url}/teachers/"
-            response = self.session.post(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('add', 'teachers', payload=data)
 
     def update_teacher(self, teacher_id: int, data: dict):
         """调用后端接口修改教师信息"""
-        try:
-            url = f"{self.base_url}/teachers/{teacher_id}"
-            response = self.session.put(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('update', 'teachers', teacher_id, data)
 
     def delete_teacher(self, teacher_id: int):
         """调用后端接口删除教师"""
-        try:
-            url = f"{self.base_url}/teachers/{teacher_id}"
-            response = self.session.delete(url, timeout=self.timeout)
-            return response.status_code == 204
-        except requests.exceptions.RequestException as err:
-            print(f"删除教师时发生网络错误: {err}")
-            return False
+        return self._write('delete', 'teachers', teacher_id)
 
     def get_counselors(self):
         """获取所有辅导员列表"""
-        try:
-            url = f"{self.base_url}/counselors/"
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._query('counselors', 'counselors/', {})
 
     def add_counselor(self, data: dict):
         """添加新辅导员"""
-        try:
-            url = f"{self.base_url}/counselors/"
-            response = self.session.post(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('add', 'counselors', payload=data)
 
     def update_counselor(self, counselor_id: int, data: dict):
         """修改辅导员信息"""
-        try:
-            url = f"{self.base_url}/counselors/{counselor_id}"
-            response = self.session.put(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('update', 'counselors', counselor_id, data)
 
     def delete_counselor(self, counselor_id: int):
         """删除辅导员"""
-        try:
-            url = f"{self.base_url}/counselors/{counselor_id}"
-            response = self.session.delete(url, timeout=self.timeout)
-            return response.status_code == 204
-        except requests.exceptions.RequestException as err:
-            return False
+        return self._write('delete', 'counselors', counselor_id)
 
     def get_dorm_managers(self):
         """获取所有宿管列表"""
-        try:
-            url = f"{self.base_url}/dorm_managers/"
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._query('dorm_managers', 'dorm_managers/', {})
 
     def add_dorm_manager(self, data: dict):
         """添加新宿管"""
-        try:
-            url = f"{self.base_url}/dorm_managers/"
-            response = self.session.post(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('add', 'dorm_managers', payload=data)
 
     def update_dorm_manager(self, manager_id: int, data: dict):
         """修改宿管信息"""
-        try:
-            url = f"{self.base_url}/dorm_managers/{manager_id}"
-            response = self.session.put(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('update', 'dorm_managers', manager_id, data)
 
     def delete_dorm_manager(self, manager_id: int):
         """删除宿管"""
-        try:
-            url = f"{self.base_url}/dorm_managers/{manager_id}"
-            response = self.session.delete(url, timeout=self.timeout)
-            return response.status_code == 204
-        except requests.exceptions.RequestException as err:
-            return False
+        return self._write('delete', 'dorm_managers', manager_id)
 
     def get_buildings(self):
         """获取所有宿舍楼列表"""
-        try:
-            url = f"{self.base_url}/buildings/"
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._query('buildings', 'buildings/', {})
 
     def add_building(self, data: dict):
         """添加新宿舍楼"""
-        try:
-            url = f"{self.base_url}/buildings/"
-            response = self.session.post(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('add', 'buildings', payload=data)
 
     def update_building(self, building_id: int, data: dict):
         """修改宿舍楼信息"""
-        try:
-            url = f"{self.base_url}/buildings/{building_id}"
-            response = self.session.put(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('update', 'buildings', building_id, data)
 
     def delete_building(self, building_id: int):
         """删除宿舍楼"""
-        try:
-            url = f"{self.base_url}/buildings/{building_id}"
-            response = self.session.delete(url, timeout=self.timeout)
-            return response.status_code == 204
-        except requests.exceptions.RequestException as err:
-            return False
+        return self._write('delete', 'buildings', building_id)
     def get_rooms(self, building_name: str = None):
         """获取宿舍房间列表，可以按楼栋名筛选"""
-        try:
-            url = f"{self.base_url}/rooms/"
-            params = {}
-            if building_name:
-                params['building'] = building_name
-            response = self.session.get(url, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self.query_rooms({'building': building_name})
 
     # ... 未来添加 add_room, update_room, delete_room ...
 
+    def iter_pages(self, path: str, params: dict = None, page_size: int = 1000):
+        """
+        按 limit/offset 分页拉取列表接口，每次产出一页数据，不写入实体仓库。
+        用于导出等需要遍历大量数据、但不希望一次性占用大量内存的场景。
+        后端忽略分页参数时（一次返回了全部数据），只产出这一页。
+
+        Raises:
+            requests.exceptions.RequestException: 网络或 HTTP 错误。
+            ValueError: 接口返回了错误信息。
+        """
+        offset = 0
+        first_id = None
+        while True:
+            query = {**(params or {}), 'limit': page_size, 'offset': offset}
+            response = self.session.get(f"{self.base_url}/{path}", params=query, timeout=self.bulk_timeout)
+            response.raise_for_status()
+            page = response.json()
+            if isinstance(page, dict) and 'error' in page:
+                raise ValueError(page['error'])
+            if not page or (offset and page[0].get('id') == first_id):
+                return
+            yield page
+            if len(page) != page_size:
+                return
+            if first_id is None:
+                first_id = page[0].get('id')
+            offset += page_size
+
     def get_unallocated_students(self):
         """获取所有未分配宿舍的学生列表"""
-        try:
-            url = f"{self.base_url}/students/"
-            # 【核心】使用 params 参数来筛选 allocated=false 的学生
-            response = self.session.get(url, params={'allocated': 'false'}, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self.query_students({'allocated': False})
 
     def allocate_dorm(self, student_id: int, room_id: int):
         """执行宿舍分配"""
-        try:
-            url = f"{self.base_url}/allocations/"
-            payload = {"student_id": student_id, "room_id": room_id}
-            response = self.session.post(url, json=payload, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('allocate', 'allocations', payload={"student_id": student_id, "room_id": room_id})
+
+    def allocate_many(self, pairs: list, chunk_size: int = 500, max_workers: int = 8):
+        """
+        批量执行宿舍分配。
+        按 chunk_size 分块提交到 /allocations/bulk；后端不支持该接口时，
+        退化为最多 max_workers 个并发的逐条 allocate_dorm 请求。
+
+        Args:
+            pairs (list): [(student_id, room_id), ...] 或 [{'student_id': ..., 'room_id': ...}, ...]
+
+        Returns:
+            list: 与 pairs 一一对应的结果，
+                  {'student_id', 'room_id', 'success', 以及 'data' 或 'error'}。
+        """
+        items = [pair if isinstance(pair, dict) else {'student_id': pair[0], 'room_id': pair[1]} for pair in pairs]
+        return self._bulk_post('allocations/bulk', 'allocations', items,
+                               lambda item: self.allocate_dorm(item['student_id'], item['room_id']),
+                               chunk_size=chunk_size, max_workers=max_workers)
 
     def get_all_students(self):
         """获取所有学生列表（不过滤）"""
-        try:
-            url = f"{self.base_url}/students/"
-            # 不传递任何参数，后端默认返回所有学生
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self.query_students()
 
     def get_students_by_building(self, building_name: str):
         """根据楼栋名称获取学生列表"""
-        try:
-            url = f"{self.base_url}/students/"
-            params = {'building': building_name}
-            response = self.session.get(url, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self.query_students({'building': building_name})
 
     def get_students_by_department(self, department_name: str):
         """根据院系名称获取学生列表"""
-        try:
-            url = f"{self.base_url}/students/"
-            params = {'department': department_name}
-            response = self.session.get(url, params=params, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self.query_students({'department': department_name})
 
     def add_room(self, data: dict):
         """添加新宿舍房间"""
-        try:
-            url = f"{self.base_url}/rooms/"
-            response = self.session.post(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('add', 'rooms', payload=data)
 
     def update_room(self, room_id: int, data: dict):
         """修改宿舍房间信息"""
-        try:
-            url = f"{self.base_url}/rooms/{room_id}"
-            response = self.session.put(url, json=data, timeout=self.timeout)
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            return {"error": str(err)}
+        return self._write('update', 'rooms', room_id, data)
 
     def delete_room(self, room_id: int):
         """删除宿舍房间"""
-        try:
-            url = f"{self.base_url}/rooms/{room_id}"
-            response = self.session.delete(url, timeout=self.timeout)
-            return response.status_code == 204
-        except requests.exceptions.RequestException as err:
-            return False
+        return self._write('delete', 'rooms', room_id)
 
-    def get_my_roommates(self):
-        """获取当前登录学生的室友列表"""
+    def get_my_roommates(self, fields=None):
+        """获取当前登录学生的室友列表，fields 指定只返回的字段"""
         if not self.current_user or self.current_user.get('role') != 'student':
             return {"error": "当前用户不是学生或未登录"}
         try:
             url = f"{self.base_url}/roommates/"
             headers = {'X-Username': self.current_user['username']}
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            params = {'fields': ','.join(fields)} if fields else None
+            response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as err:
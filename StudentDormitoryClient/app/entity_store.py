@@ -0,0 +1,212 @@
+# StudentDormitoryClient/app/entity_store.py
+
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class EntityStore(QObject):
+    """
+    客户端统一的内存实体仓库。
+    学生、房间、楼栋和教职工记录都按 id 只保存一份，
+    API 响应和增删改操作都在这里更新，界面组件通过 changed 信号订阅自己关心的变化。
+    """
+    # (实体类型, 发生变化的 id 列表)；id 列表为 None 表示整批刷新
+    changed = pyqtSignal(str, object)
+
+    KINDS = ('students', 'rooms', 'buildings', 'teachers', 'counselors', 'dorm_managers')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 仓库会在 ApiWorker 的后台线程中被写入，所以所有读写都需要加锁
+        self._lock = threading.RLock()
+        self._entities = {kind: {} for kind in self.KINDS}
+
+    def get(self, kind: str, entity_id):
+        """按 id 取出一条记录，不存在时返回 None"""
+        with self._lock:
+            return self._entities[kind].get(entity_id)
+
+    def get_many(self, kind: str, ids):
+        """按 id 列表取出记录，跳过已不存在的 id"""
+        with self._lock:
+            table = self._entities[kind]
+            return [table[i] for i in ids if i in table]
+
+    def all(self, kind: str):
+        """返回某类实体的全部记录（浅拷贝的列表）"""
+        with self._lock:
+            return list(self._entities[kind].values())
+
+    def contains(self, kind: str, entity_id) -> bool:
+        with self._lock:
+            return entity_id in self._entities[kind]
+
+    # 以下整批写入的方法在内容与仓库中已有的数据完全相同时不发出 changed 信号，
+    # 定时刷新拿到没有变化的列表时，界面不会重绘或重建模型
+
+    def replace_all(self, kind: str, rows: list):
+        """用完整列表替换某类实体（例如不带筛选条件的列表接口）"""
+        table = {row['id']: row for row in rows if 'id' in row}
+        with self._lock:
+            if table == self._entities[kind]:
+                return
+            self._entities[kind] = table
+        self.changed.emit(kind, None)
+
+    def merge(self, kind: str, rows: list):
+        """合并一个部分列表（例如按楼栋或院系筛选的结果），不会删除列表外的记录"""
+        changed = False
+        with self._lock:
+            table = self._entities[kind]
+            for row in rows:
+                if 'id' in row and table.get(row['id']) != row:
+                    table[row['id']] = row
+                    changed = True
+        if changed:
+            self.changed.emit(kind, None)
+
+    def merge_fields(self, kind: str, rows: list, complete: bool = False):
+        """
+        合并只包含部分字段的列表（例如带 fields= 投影的查询结果）：
+        已有记录只覆盖返回的字段，其余字段保留。complete 为 True 时删除列表外的记录。
+        """
+        with self._lock:
+            table = self._entities[kind]
+            returned = {}
+            for row in rows:
+                if 'id' in row:
+                    old = table.get(row['id'])
+                    returned[row['id']] = {**old, **row} if old else row
+            if complete:
+                if returned == table:
+                    return
+                self._entities[kind] = returned
+            else:
+                if all(table.get(entity_id) == row for entity_id, row in returned.items()):
+                    return
+                table.update(returned)
+        self.changed.emit(kind, None)
+
+    def upsert(self, kind: str, row: dict):
+        """新增或整体替换一条记录"""
+        if not row or 'id' not in row:
+            return
+        with self._lock:
+            self._entities[kind][row['id']] = row
+        self.changed.emit(kind, [row['id']])
+
+    def update_fields(self, kind: str, entity_id, fields: dict):
+        """
+        修改一条记录的部分字段。
+
+        Returns:
+            dict or None: 修改前的记录快照；记录不存在时返回 None。
+        """
+        with self._lock:
+            old = self._entities[kind].get(entity_id)
+            if old is None:
+                return None
+            self._entities[kind][entity_id] = {**old, **fields}
+        self.changed.emit(kind, [entity_id])
+        return old
+
+    def remove(self, kind: str, entity_id):
+        """
+        删除一条记录。
+
+        Returns:
+            dict or None: 被删除的记录；记录不存在时返回 None。
+        """
+        with self._lock:
+            old = self._entities[kind].pop(entity_id, None)
+        if old is not None:
+            self.changed.emit(kind, [entity_id])
+        return old
+
+    def update_many(self, kind: str, ids, fields: dict):
+        """把多条记录的若干字段改成相同的值，只发出一次 changed 通知；不存在的记录被跳过"""
+        changed = []
+        with self._lock:
+            table = self._entities[kind]
+            for entity_id in ids:
+                old = table.get(entity_id)
+                if old is not None:
+                    table[entity_id] = {**old, **fields}
+                    changed.append(entity_id)
+        if changed:
+            self.changed.emit(kind, changed)
+
+    def remove_many(self, kind: str, ids):
+        """删除多条记录，只发出一次 changed 通知"""
+        with self._lock:
+            table = self._entities[kind]
+            removed = [entity_id for entity_id in ids if table.pop(entity_id, None) is not None]
+        if removed:
+            self.changed.emit(kind, removed)
+
+    def begin_change(self):
+        """开始一次乐观更新，返回可回滚的 OptimisticChange"""
+        return OptimisticChange(self)
+
+    def clear(self):
+        with self._lock:
+            for kind in self.KINDS:
+                self._entities[kind] = {}
+        for kind in self.KINDS:
+            self.changed.emit(kind, None)
+
+
+class OptimisticChange:
+    """
+    一次乐观更新。
+    先直接修改仓库让界面立即生效，请求在后台提交；
+    提交失败时调用 rollback() 把涉及的记录恢复成修改前的样子。
+    """
+
+    def __init__(self, store: EntityStore):
+        self.store = store
+        self._undo = []  # 回滚操作，按相反顺序执行
+
+    def _restore(self, kind: str, entity_id, old):
+        if old is None:
+            self.store.remove(kind, entity_id)
+        else:
+            self.store.upsert(kind, old)
+
+    def upsert(self, kind: str, row: dict):
+        old = self.store.get(kind, row['id'])
+        self._undo.append(lambda: self._restore(kind, row['id'], old))
+        self.store.upsert(kind, row)
+
+    def update_fields(self, kind: str, entity_id, fields: dict):
+        old = self.store.update_fields(kind, entity_id, fields)
+        if old is not None:
+            self._undo.append(lambda: self._restore(kind, entity_id, old))
+        return old
+
+    def increment(self, kind: str, entity_id, field: str, delta: int = 1):
+        """
+        对计数字段（例如房间已住人数）做增量修改。
+        回滚时做反向增量而不是恢复快照，这样同一房间上并发的多个分配互不覆盖。
+        """
+        if self.store.get(kind, entity_id) is None:
+            return
+        self._add(kind, entity_id, field, delta)
+        self._undo.append(lambda: self._add(kind, entity_id, field, -delta))
+
+    def _add(self, kind: str, entity_id, field: str, delta: int):
+        record = self.store.get(kind, entity_id)
+        if record is not None:
+            self.store.update_fields(kind, entity_id, {field: (record.get(field) or 0) + delta})
+
+    def remove(self, kind: str, entity_id):
+        old = self.store.remove(kind, entity_id)
+        if old is not None:
+            self._undo.append(lambda: self._restore(kind, entity_id, old))
+        return old
+
+    def rollback(self):
+        for undo in reversed(self._undo):
+            undo()
+        self._undo.clear()
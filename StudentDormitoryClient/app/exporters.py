@@ -0,0 +1,77 @@
+# StudentDormitoryClient/app/exporters.py
+
+import csv
+import os
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # 未安装 openpyxl 时只支持导出 CSV 文件
+    Workbook = None
+
+
+def _cell_value(row: dict, field):
+    value = field(row) if callable(field) else row.get(field)
+    return '' if value is None else value
+
+
+class _CsvSink:
+    def __init__(self, path: str):
+        # utf-8-sig 让 Excel 直接打开时不会出现中文乱码
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+
+    def write(self, values: list):
+        self._writer.writerow(values)
+
+    def close(self):
+        self._file.close()
+
+
+class _XlsxSink:
+    def __init__(self, path: str):
+        if Workbook is None:
+            raise ValueError("导出 XLSX 文件需要安装 openpyxl，请改为导出 CSV 文件或安装该依赖。")
+        self._path = path
+        # write_only 模式逐行写入临时文件，不会在内存中保留整张表
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+
+    def write(self, values: list):
+        self._sheet.append(values)
+
+    def close(self):
+        self._workbook.save(self._path)
+
+
+def export_pages(path: str, columns: list, pages, on_progress=None, is_cancelled=None) -> dict:
+    """
+    把按页产出的记录流式写入 CSV 或 XLSX 文件（按扩展名判断），每次只在内存中保留一页数据。
+
+    Args:
+        path (str): 导出文件路径。
+        columns (list): [(表头, 字段名或 callable(row) -> 值), ...]，与表格模型的列定义相同。
+        pages (iterable): 逐页产出记录列表，例如 ApiClient.iter_pages(...)。
+        on_progress (callable): on_progress(已写入行数)，每写完一页调用一次。
+        is_cancelled (callable): 返回 True 时停止导出并删除未写完的文件。
+
+    Returns:
+        dict: {'rows', 'cancelled', 'path'}
+    """
+    sink = _XlsxSink(path) if path.lower().endswith('.xlsx') else _CsvSink(path)
+    rows, cancelled = 0, False
+    try:
+        sink.write([header for header, _ in columns])
+        for page in pages:
+            if is_cancelled and is_cancelled():
+                cancelled = True
+                break
+            for row in page:
+                sink.write([_cell_value(row, field) for _, field in columns])
+            rows += len(page)
+            if on_progress:
+                on_progress(rows)
+    finally:
+        sink.close()
+    if cancelled and os.path.exists(path):
+        os.remove(path)
+    return {'rows': rows, 'cancelled': cancelled, 'path': path}
@@ -0,0 +1,283 @@
+# StudentDormitoryClient/app/importers.py
+
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # 未安装 openpyxl 时只支持 CSV 文件
+    load_workbook = None
+
+# 导入文件的表头可以使用中文或英文字段名
+STUDENT_COLUMN_ALIASES = {
+    'name': ('姓名', 'name'),
+    'gender': ('性别', 'gender'),
+    'age': ('年龄', 'age'),
+    'student_id': ('学号', 'student_id'),
+    'department': ('院系', 'department'),
+    'class_name': ('班级', 'class_name'),
+    'phone': ('联系方式', '电话', 'phone'),
+    'username': ('登录用户名', '用户名', 'username'),
+    'password': ('初始密码', '密码', 'password'),
+}
+
+
+def _cell_text(value) -> str:
+    """把单元格的值转成去掉首尾空白的文字；Excel 中的整数会被读成 2023001.0，这里还原成 2023001"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _map_header(header) -> list:
+    lookup = {alias: field for field, aliases in STUDENT_COLUMN_ALIASES.items() for alias in aliases}
+    return [lookup.get(_cell_text(title)) for title in header]
+
+
+def _iter_csv(path: str):
+    # utf-8-sig 兼容 Excel 另存为 CSV 时写入的 BOM
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = _map_header(header)
+        for row in reader:
+            yield reader.line_num, row, fields
+
+
+def _iter_xlsx(path: str):
+    if load_workbook is None:
+        raise ValueError("读取 XLSX 文件需要安装 openpyxl，请改用 CSV 文件或安装该依赖。")
+    # read_only 模式按行流式读取，不会把整个工作簿载入内存
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        fields = _map_header(header)
+        for line_num, row in enumerate(rows, start=2):
+            yield line_num, row, fields
+    finally:
+        workbook.close()
+
+
+def iter_student_rows(path: str):
+    """
+    流式读取 CSV/XLSX 学生名单。
+
+    Yields:
+        tuple: (文件中的行号, {字段名: 文字})，空行会被跳过。
+    """
+    reader = _iter_xlsx if path.lower().endswith('.xlsx') else _iter_csv
+    for line_num, row, fields in reader(path):
+        record = {field: _cell_text(value) for field, value in zip(fields, row) if field}
+        if any(record.values()):
+            yield line_num, record
+
+
+def validate_student_row(record: dict):
+    """
+    校验并整理一行学生数据：与“添加学生”对话框一样要求姓名、学号和初始密码；
+    对话框会把无效的年龄当作未填写，批量导入时则拒绝这一行，避免悄悄丢失数据。
+
+    Returns:
+        tuple: (payload, None) 或 (None, 错误原因)。
+    """
+    if not record.get('name') or not record.get('student_id'):
+        return None, "姓名和学号不能为空"
+    age = record.get('age', '')
+    if age and not age.isdigit():
+        return None, f"年龄 '{age}' 不是有效数字"
+    if not record.get('password'):
+        return None, "初始密码不能为空"
+    payload = {
+        "name": record['name'],
+        "gender": record.get('gender', ''),
+        "age": int(age) if age else None,
+        "student_id": record['student_id'],
+        "department": record.get('department', ''),
+        "class_name": record.get('class_name', ''),
+        "phone": record.get('phone', ''),
+        # 未提供登录用户名时使用学号
+        "username": record.get('username') or record['student_id'],
+        "password": record['password'],
+    }
+    return payload, None
+
+
+class _ErrorReport:
+    """导入错误报告：第一次写入被拒绝的行时才创建（或续写）文件，没有被拒绝的行时不留下空报告"""
+    HEADER = ['行号', '学号', '姓名', '错误原因']
+
+    def __init__(self, path: str, append: bool):
+        self.path = path
+        self.append = append
+        self._file = None
+        self._writer = None
+
+    def writerow(self, row: list):
+        if self._writer is None:
+            mode = 'a' if self.append else 'w'
+            self._file = open(self.path, mode, encoding='utf-8-sig', newline='')
+            self._writer = csv.writer(self._file)
+            if mode == 'w':
+                self._writer.writerow(self.HEADER)
+        self._writer.writerow(row)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self._file.close()
+
+
+class StudentImportJob:
+    """
+    学生批量导入任务（不依赖界面，可在任意后台线程中运行）。
+
+    文件按行流式读取、逐行校验，合格的行按 chunk_size 分块，
+    最多 max_in_flight 个分块同时上传；被拒绝的行写入错误报告。
+    已连续完成的行号会写入检查点文件，中断后可以从检查点继续导入。
+    """
+
+    def __init__(self, api_client, source_path: str, chunk_size: int = 200, max_in_flight: int = 4):
+        self.api_client = api_client
+        self.source_path = source_path
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        base, _ = os.path.splitext(source_path)
+        self.checkpoint_path = source_path + '.progress.json'
+        self.report_path = base + '_导入错误报告.csv'
+
+    def _file_signature(self) -> dict:
+        stat = os.stat(self.source_path)
+        return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def saved_progress(self) -> int:
+        """返回检查点记录的已处理行号；文件发生变化或没有检查点时返回 0"""
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if checkpoint.get('signature') != self._file_signature():
+            return 0
+        return int(checkpoint.get('rows_done', 0))
+
+    def _save_progress(self, rows_done: int, imported: int, rejected: int):
+        checkpoint = {'signature': self._file_signature(), 'rows_done': rows_done,
+                      'imported': imported, 'rejected': rejected}
+        with open(self.checkpoint_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+
+    def run(self, resume: bool = False, on_progress=None, is_cancelled=None) -> dict:
+        """
+        执行导入。
+
+        Args:
+            resume (bool): 是否跳过检查点之前已处理的行。
+            on_progress (callable): on_progress(已读取行数, 成功数, 拒绝数)。
+            is_cancelled (callable): 返回 True 时停止读取新行，已提交的分块会等待完成。
+
+        Returns:
+            dict: {'imported', 'rejected', 'cancelled', 'report_path'}，没有错误报告时 report_path 为 None
+        """
+        skip_until = self.saved_progress() if resume else 0
+        counters = {'read': 0, 'imported': 0, 'rejected': 0}
+        in_flight = {}  # future -> (分块序号, 行号列表)
+        covered = {}  # 分块序号 -> 该分块覆盖到的最后一个文件行号
+        done_chunks = set()
+        state = {'submitted': 0, 'next_chunk': 0, 'rows_done': skip_until}
+        cancelled = False
+
+        append = bool(skip_until) and os.path.exists(self.report_path)
+        if not append and os.path.exists(self.report_path):
+            # 重新导入时，上一次留下的报告已经过时
+            os.remove(self.report_path)
+        with _ErrorReport(self.report_path, append) as report, \
+                ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="import") as executor:
+
+            def notify():
+                if on_progress:
+                    on_progress(counters['read'], counters['imported'], counters['rejected'])
+
+            def collect(futures):
+                for future in futures:
+                    chunk_index, lines = in_flight.pop(future)
+                    created = []
+                    for line_num, result in zip(lines, future.result()):
+                        if result['success']:
+                            counters['imported'] += 1
+                            if isinstance(result.get('data'), dict):
+                                created.append(result['data'])
+                        else:
+                            counters['rejected'] += 1
+                            report.writerow([line_num, result.get('student_id', ''), result.get('name', ''), result['error']])
+                    if created:
+                        self.api_client.store.merge('students', created)
+                    done_chunks.add(chunk_index)
+                # 只有从头开始连续完成的分块才能推进检查点
+                advanced = False
+                while state['next_chunk'] in done_chunks:
+                    state['rows_done'] = covered.pop(state['next_chunk'])
+                    done_chunks.discard(state['next_chunk'])
+                    state['next_chunk'] += 1
+                    advanced = True
+                if advanced:
+                    report.flush()
+                    self._save_progress(state['rows_done'], counters['imported'], counters['rejected'])
+                notify()
+
+            def submit(chunk, lines, last_line):
+                chunk_index = state['submitted']
+                state['submitted'] += 1
+                covered[chunk_index] = last_line
+                future = executor.submit(self.api_client.add_students_bulk, chunk)
+                in_flight[future] = (chunk_index, lines)
+                while len(in_flight) >= self.max_in_flight:
+                    finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    collect(finished)
+
+            chunk, lines, seen_ids, last_line = [], [], set(), skip_until
+            for line_num, record in iter_student_rows(self.source_path):
+                if line_num <= skip_until:
+                    continue
+                if is_cancelled and is_cancelled():
+                    cancelled = True
+                    break
+                counters['read'] += 1
+                last_line = line_num
+                payload, error = validate_student_row(record)
+                if payload and payload['student_id'] in seen_ids:
+                    payload, error = None, "文件中学号重复"
+                if error:
+                    counters['rejected'] += 1
+                    report.writerow([line_num, record.get('student_id', ''), record.get('name', ''), error])
+                else:
+                    seen_ids.add(payload['student_id'])
+                    chunk.append(payload)
+                    lines.append(line_num)
+                if len(chunk) >= self.chunk_size:
+                    submit(chunk, lines, last_line)
+                    chunk, lines = [], []
+                    notify()
+            if chunk or last_line > state['rows_done']:
+                submit(chunk, lines, last_line)
+            if in_flight:
+                collect(list(in_flight))
+
+        if not cancelled and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return {'imported': counters['imported'], 'rejected': counters['rejected'],
+                'cancelled': cancelled, 'report_path': self.report_path if os.path.exists(self.report_path) else None}
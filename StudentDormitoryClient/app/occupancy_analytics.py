@@ -0,0 +1,182 @@
+# StudentDormitoryClient/app/occupancy_analytics.py
+
+from PyQt6.QtCore import QObject
+
+from .entity_store import EntityStore
+from .table_models import collation_key
+
+try:
+    import numpy as np
+except ImportError:  # 未安装 numpy 时逐行累加，结果相同，只是全校规模下慢一些
+    np = None
+
+UNSPECIFIED = '未填写'
+
+
+def _column(values, dtype):
+    return np.array(values, dtype=dtype) if np is not None else list(values)
+
+
+def _group_sum(codes, weights, size: int) -> list:
+    """按分组编号对权重求和，返回长度为 size 的列表"""
+    if np is not None:
+        return np.bincount(codes, weights=weights, minlength=size).astype(int).tolist()
+    totals = [0] * size
+    for code, weight in zip(codes, weights):
+        totals[code] += weight
+    return totals
+
+
+def _ratio(part, whole):
+    return part / whole if whole else 0.0
+
+
+class _Columns:
+    """
+    一类实体的列式副本：每条记录占一行，分组字段保存为整数编号，数值字段保存为整数列，
+    统计时对整列做分组求和（numpy.bincount），不必逐条遍历字典。
+    记录被删除时只把它的数值清零，行号保持不变。
+    """
+
+    def __init__(self, groups: dict, values: dict):
+        # groups: {列名: 取出分组值的函数}；values: {列名: 取出数值的函数}
+        self.groups = groups
+        self.values = values
+        self.labels = {name: [] for name in groups}
+        self._codes = {name: {} for name in groups}
+        self.rows = {}  # id -> 行号
+        self.columns = {}
+
+    def rebuild(self, records: list):
+        self.labels = {name: [] for name in self.groups}
+        self._codes = {name: {} for name in self.groups}
+        self.rows = {record['id']: row for row, record in enumerate(records)}
+        self.columns = {}
+        for name, getter in self.groups.items():
+            self.columns[name] = _column([self._code(name, getter(record)) for record in records], 'int64')
+        for name, getter in self.values.items():
+            self.columns[name] = _column([getter(record) for record in records], 'int64')
+
+    def _code(self, name: str, label) -> int:
+        codes = self._codes[name]
+        code = codes.get(label)
+        if code is None:
+            code = codes[label] = len(self.labels[name])
+            self.labels[name].append(label)
+        return code
+
+    def update(self, entity_id, record) -> bool:
+        """
+        就地更新一行；record 为 None 表示记录已删除。
+        新出现的记录需要追加行，返回 False，由调用方安排整体重建。
+        """
+        row = self.rows.get(entity_id)
+        if row is None:
+            return record is None
+        if record is None:
+            for name in self.values:
+                self.columns[name][row] = 0
+            return True
+        for name, getter in self.groups.items():
+            self.columns[name][row] = self._code(name, getter(record))
+        for name, getter in self.values.items():
+            self.columns[name][row] = getter(record)
+        return True
+
+    def totals(self, group: str, *values) -> list:
+        """
+        按一个分组字段汇总若干数值列，返回按分组值排列的 [(分组值, 汇总1, 汇总2, ...)]，略去全部为 0 的分组
+        """
+        size = len(self.labels[group])
+        sums = [_group_sum(self.columns[group], self.columns[name], size) for name in values]
+        rows = [(label, *row) for label, *row in zip(self.labels[group], *sums) if any(row)]
+        return sorted(rows, key=lambda row: collation_key(str(row[0])))
+
+
+def _int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class OccupancyAnalytics(QObject):
+    """
+    按楼栋、房间性别类型和院系统计宿舍的床位、入住、空床和利用率，数据来自实体仓库中缓存的房间和学生。
+
+    房间和学生各保存一份列式副本（见 _Columns），统计是对整列的分组求和，10 万个床位也只需几毫秒。
+    订阅 EntityStore 的变化：单条记录的修改（例如分配宿舍后房间人数加一）只改写对应的一行，
+    出现新记录或仓库整批刷新时，在下一次统计时重建列式副本。
+    """
+    REBUILD_THRESHOLD = 2000
+
+    def __init__(self, store: EntityStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._rooms = _Columns(
+            groups={'building': lambda room: room.get('building_name') or UNSPECIFIED,
+                    'gender': lambda room: room.get('gender_type') or '不限'},
+            values={'present': lambda room: 1,
+                    'capacity': lambda room: _int(room.get('capacity')),
+                    'occupied': lambda room: _int(room.get('current_occupancy'))})
+        self._students = _Columns(
+            groups={'department': lambda student: student.get('department') or UNSPECIFIED,
+                    'gender': lambda student: student.get('gender') or UNSPECIFIED},
+            values={'present': lambda student: 1,
+                    'allocated': lambda student: 1 if student.get('dormitory_room') else 0})
+        self._dirty = {'rooms': True, 'students': True}
+        self.store.changed.connect(self._on_store_changed)
+
+    def _columns(self, kind: str) -> _Columns:
+        if self._dirty[kind]:
+            getattr(self, f'_{kind}').rebuild(self.store.all(kind))
+            self._dirty[kind] = False
+        return getattr(self, f'_{kind}')
+
+    def _on_store_changed(self, kind: str, ids):
+        if kind not in self._dirty or self._dirty[kind]:
+            return
+        if ids is None or len(ids) > self.REBUILD_THRESHOLD:
+            self._dirty[kind] = True
+            return
+        columns = getattr(self, f'_{kind}')
+        for entity_id in ids:
+            if not columns.update(entity_id, self.store.get(kind, entity_id)):
+                self._dirty[kind] = True
+                return
+
+    def room_report(self, group: str) -> list:
+        """
+        按 'building'（楼栋）或 'gender'（房间性别类型）统计床位。
+
+        Returns:
+            list: [{'name', 'rooms', 'beds', 'occupied', 'vacant', 'utilization'}]，按名称排列。
+        """
+        rows = []
+        for name, rooms, beds, occupied in self._columns('rooms').totals(group, 'present', 'capacity', 'occupied'):
+            rows.append({'name': name, 'rooms': rooms, 'beds': beds, 'occupied': occupied,
+                         'vacant': max(beds - occupied, 0), 'utilization': _ratio(occupied, beds)})
+        return rows
+
+    def student_report(self, group: str) -> list:
+        """
+        按 'department'（院系）或 'gender'（性别）统计学生的住宿分配情况。
+
+        Returns:
+            list: [{'name', 'students', 'allocated', 'unallocated', 'allocation_rate', 'bed_share'}]，
+                  bed_share 为该组学生占全部已住床位的比例。
+        """
+        totals = self._columns('students').totals(group, 'present', 'allocated')
+        all_allocated = sum(allocated for _, _, allocated in totals)
+        return [{'name': name, 'students': students, 'allocated': allocated, 'unallocated': students - allocated,
+                 'allocation_rate': _ratio(allocated, students), 'bed_share': _ratio(allocated, all_allocated)}
+                for name, students, allocated in totals]
+
+    def summary(self) -> dict:
+        """全校合计：{'rooms', 'beds', 'occupied', 'vacant', 'utilization', 'unallocated'}"""
+        rooms = beds = occupied = 0
+        for row in self.room_report('gender'):
+            rooms, beds, occupied = rooms + row['rooms'], beds + row['beds'], occupied + row['occupied']
+        unallocated = sum(row['unallocated'] for row in self.student_report('gender'))
+        return {'rooms': rooms, 'beds': beds, 'occupied': occupied, 'vacant': max(beds - occupied, 0),
+                'utilization': _ratio(occupied, beds), 'unallocated': unallocated}
@@ -0,0 +1,163 @@
+# StudentDormitoryClient/app/offline_queue.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+def default_outbox_path(base_url: str = '', username: str = '', role: str = '') -> str:
+    """每个后端地址和账号各用一个队列文件，切换服务器或账号后不会把别人的修改提交上去"""
+    identity = hashlib.sha1(f"{base_url}\n{username}\n{role}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(os.path.expanduser('~'), '.student_dormitory_client', f'outbox-{identity}.jsonl')
+
+
+class OfflineQueue(QObject):
+    """
+    网络不可用时暂存写操作（新增、修改、删除、分配）的持久化队列。
+
+    队列以追加写入的日志文件保存在磁盘上，每一行是一条记录：
+    - 新的修改：{'key', 'op', 'kind', 'entity_id', 'payload', 'base', 'temp_id', 'queued_at'}；
+    - {'ack': key}：该修改已经提交（或被放弃）；
+    - {'remap': [kind, 临时 id, 正式 id]}：离线新增的记录提交成功，之后的修改改用正式 id。
+    启动时按顺序重放日志即可恢复队列；程序在写入中途退出时，最后一行不完整的记录会被忽略。
+    队列清空时日志文件被截断。
+
+    key 是客户端生成的幂等键，重放时随请求一起发送，后端据此识别重复提交。
+    """
+    # (是否离线, 待同步的修改数)
+    state_changed = pyqtSignal(bool, int)
+
+    OP_NAMES = {'add': '新增', 'update': '修改', 'delete': '删除', 'allocate': '分配宿舍'}
+    KIND_NAMES = {'students': '学生', 'rooms': '房间', 'buildings': '宿舍楼', 'teachers': '教师',
+                  'counselors': '辅导员', 'dorm_managers': '宿管', 'allocations': ''}
+
+    def __init__(self, path: str = None, parent=None):
+        super().__init__(parent)
+        self.path = path or default_outbox_path()
+        self._lock = threading.Lock()
+        self._entries = []
+        self.offline = False
+        self._load()
+
+    # --- 状态 ---
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def is_active(self) -> bool:
+        """离线，或者还有未同步的修改：新的写操作都应进入队列，以保持提交顺序"""
+        return self.offline or len(self) > 0
+
+    def set_offline(self, offline: bool):
+        if offline != self.offline:
+            self.offline = offline
+            self.state_changed.emit(offline, len(self))
+
+    def peek(self):
+        with self._lock:
+            return dict(self._entries[0]) if self._entries else None
+
+    def next_temp_id(self) -> int:
+        """离线新增的记录使用负数临时 id，提交成功后换成后端分配的 id"""
+        with self._lock:
+            used = [entry['temp_id'] for entry in self._entries if entry.get('temp_id') is not None]
+        return min(used, default=0) - 1
+
+    @classmethod
+    def describe(cls, entry: dict) -> str:
+        if entry['op'] == 'allocate':
+            payload = entry['payload']
+            return f"分配宿舍（学生 #{payload['student_id']} → 房间 #{payload['room_id']}）"
+        target = (entry.get('base') or entry.get('payload') or {}).get('name') or f"#{entry.get('entity_id')}"
+        return f"{cls.OP_NAMES[entry['op']]}{cls.KIND_NAMES.get(entry['kind'], entry['kind'])} {target}"
+
+    # --- 写入 ---
+
+    def has_key(self, key: str) -> bool:
+        with self._lock:
+            return any(entry['key'] == key for entry in self._entries)
+
+    def append(self, op: str, kind: str, entity_id=None, payload: dict = None, base: dict = None,
+               temp_id: int = None, key: str = None) -> dict:
+        """记入一条修改；key 为 None 时生成新的幂等键"""
+        entry = {'key': key or uuid.uuid4().hex, 'op': op, 'kind': kind, 'entity_id': entity_id, 'payload': payload,
+                 'base': base, 'temp_id': temp_id, 'queued_at': time.time()}
+        with self._lock:
+            self._write_line(entry)
+            self._entries.append(entry)
+            count = len(self._entries)
+        self.state_changed.emit(self.offline, count)
+        return entry
+
+    def acknowledge(self, key: str):
+        """一条修改已经提交或被放弃，把它移出队列"""
+        with self._lock:
+            self._entries = [entry for entry in self._entries if entry['key'] != key]
+            if self._entries:
+                self._write_line({'ack': key})
+            else:
+                self._truncate()
+            count = len(self._entries)
+        self.state_changed.emit(self.offline, count)
+
+    def remap(self, kind: str, temp_id: int, real_id: int):
+        """离线新增的记录已提交，把队列中引用其临时 id 的修改改为正式 id"""
+        with self._lock:
+            self._apply_remap(kind, temp_id, real_id)
+            if self._entries:
+                self._write_line({'remap': [kind, temp_id, real_id]})
+
+    def _apply_remap(self, kind: str, temp_id: int, real_id: int):
+        for entry in self._entries:
+            if entry['kind'] == kind and entry['entity_id'] == temp_id:
+                entry['entity_id'] = real_id
+            if entry['op'] == 'allocate':
+                field = {'students': 'student_id', 'rooms': 'room_id'}.get(kind)
+                if field and entry['payload'].get(field) == temp_id:
+                    entry['payload'] = {**entry['payload'], field: real_id}
+
+    def switch_to(self, path: str):
+        """改用另一个队列文件（例如登录了另一个账号）；原文件中的修改留在原处，该账号再次登录时继续同步"""
+        with self._lock:
+            if path == self.path:
+                return
+            self.path = path
+            self._entries = []
+            self._load()
+            count = len(self._entries)
+        self.state_changed.emit(self.offline, count)
+
+    # --- 文件 ---
+
+    def _write_line(self, record: dict):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _truncate(self):
+        if os.path.exists(self.path):
+            open(self.path, 'w', encoding='utf-8').close()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'ack' in record:
+                    self._entries = [entry for entry in self._entries if entry['key'] != record['ack']]
+                elif 'remap' in record:
+                    self._apply_remap(*record['remap'])
+                elif 'key' in record:
+                    self._entries.append(record)
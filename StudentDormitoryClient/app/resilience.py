@@ -0,0 +1,169 @@
+# StudentDormitoryClient/app/resilience.py
+
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    熔断器处于打开状态，请求没有发出就直接失败。
+    这只说明该接口最近持续出错（例如后端的某个接口反复返回 500），不代表网络中断，
+    因此不是 ConnectionError：调用方按普通的请求失败处理，不进入离线队列，也不改用缓存。
+    """
+
+
+class EndpointStats:
+    """
+    单个接口的延迟统计和熔断器状态。
+
+    熔断器的三种状态：
+    - closed：正常放行，连续失败 failure_threshold 次后打开；
+    - open：所有请求立即失败，cooldown 秒后转为 half_open；
+    - half_open：只放行一个探测请求，成功则关闭，失败则重新打开，并把 cooldown 加倍（不超过 max_cooldown）。
+    """
+
+    def __init__(self, window: int, cooldown: float):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.cooldown = cooldown
+        self.probing = False
+
+    def percentile(self, p: float):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class ResilientSession(requests.Session):
+    """
+    带自适应超时和熔断器的 requests.Session，ApiClient 的所有请求都经过这里。
+
+    - 超时：每个接口（方法 + 路径，路径中的 id 归一化，再加上查询参数名）分别统计最近 window 次请求的耗时，
+      样本足够后，超时取 p95 × multiplier，并限制在 [min_timeout, max_timeout] 之间；
+      样本不足时使用调用方给出的超时。超时的请求按耗时等于超时时间记入样本，
+      所以本来就慢的接口（例如一次取回全部学生）会逐渐得到更宽松的期限，而平时很快的接口在后端变慢时很快失败；
+    - 熔断：网络错误、超时和 5xx 答复都算失败，同一接口连续失败时打开熔断器，之后的请求抛出 CircuitOpenError，
+      不再等待超时；冷却后放行一个探测请求确认后端是否恢复。
+    - metrics() 返回各接口的统计和熔断器状态。
+    """
+
+    ID_SEGMENT = re.compile(r'/-?\d+(?=/|$)')
+
+    def __init__(self, window: int = 200, min_samples: int = 20, multiplier: float = 3.0, min_timeout: float = 1.0,
+                 max_timeout: float = 60.0, failure_threshold: int = 5, cooldown: float = 10.0,
+                 max_cooldown: float = 120.0):
+        super().__init__()
+        self.window = window
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @classmethod
+    def endpoint_of(cls, method: str, url: str, params=None) -> str:
+        path = cls.ID_SEGMENT.sub('/{id}', urlsplit(url).path)
+        names = ','.join(sorted(params)) if isinstance(params, dict) and params else ''
+        return f"{method.upper()} {path}" + (f"?{names}" if names else '')
+
+    def _stats_for(self, endpoint: str) -> EndpointStats:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = EndpointStats(self.window, self.base_cooldown)
+        return stats
+
+    def _deadline(self, stats: EndpointStats, requested):
+        if len(stats.latencies) < self.min_samples or isinstance(requested, tuple):
+            return requested
+        learned = stats.percentile(0.95) * self.multiplier
+        return min(self.max_timeout, max(self.min_timeout, learned))
+
+    def request(self, method, url, params=None, **kwargs):
+        endpoint = self.endpoint_of(method, url, params)
+        with self._lock:
+            stats = self._stats_for(endpoint)
+            self._admit(endpoint, stats)
+            timeout = self._deadline(stats, kwargs.get('timeout'))
+        kwargs['timeout'] = timeout
+        started = time.monotonic()
+        try:
+            response = super().request(method, url, params=params, **kwargs)
+        except requests.exceptions.Timeout:
+            self._record(stats, timeout if isinstance(timeout, (int, float)) else time.monotonic() - started, False)
+            raise
+        except requests.exceptions.ConnectionError:
+            self._record(stats, None, False)
+            raise
+        except Exception:
+            with self._lock:
+                stats.probing = False
+            raise
+        self._record(stats, time.monotonic() - started, response.status_code < 500)
+        return response
+
+    def _admit(self, endpoint: str, stats: EndpointStats):
+        """熔断器不允许请求通过时抛出 CircuitOpenError（调用方持有锁）"""
+        if stats.state == 'open':
+            if time.monotonic() - stats.opened_at < stats.cooldown:
+                raise CircuitOpenError(f"接口 {endpoint} 暂时不可用（熔断中）")
+            stats.state = 'half_open'
+        if stats.state == 'half_open':
+            if stats.probing:
+                raise CircuitOpenError(f"接口 {endpoint} 正在恢复检测中")
+            stats.probing = True
+
+    def _record(self, stats: EndpointStats, latency, ok: bool):
+        with self._lock:
+            stats.requests += 1
+            if latency is not None:
+                stats.latencies.append(latency)
+            if ok:
+                stats.consecutive_failures = 0
+                if stats.state != 'closed':
+                    stats.state = 'closed'
+                    stats.cooldown = self.base_cooldown
+                stats.probing = False
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.state == 'half_open':
+                # 探测失败，重新打开并延长冷却时间
+                stats.cooldown = min(stats.cooldown * 2, self.max_cooldown)
+            if stats.state == 'half_open' or stats.consecutive_failures >= self.failure_threshold:
+                stats.state = 'open'
+                stats.opened_at = time.monotonic()
+            stats.probing = False
+
+    def metrics(self) -> list:
+        """
+        Returns:
+            list: 每个接口一项，{'endpoint', 'state', 'requests', 'failures', 'consecutive_failures',
+                  'p50', 'p95'（秒，没有样本时为 None）, 'timeout'（当前的超时期限，None 表示使用调用方的超时）,
+                  'retry_in'（熔断打开时距离下一次探测的秒数）}
+        """
+        now = time.monotonic()
+        with self._lock:
+            rows = []
+            for endpoint, stats in sorted(self._stats.items()):
+                rows.append({
+                    'endpoint': endpoint, 'state': stats.state, 'requests': stats.requests,
+                    'failures': stats.failures, 'consecutive_failures': stats.consecutive_failures,
+                    'p50': stats.percentile(0.5), 'p95': stats.percentile(0.95),
+                    'timeout': self._deadline(stats, None),
+                    'retry_in': max(0.0, stats.cooldown - (now - stats.opened_at)) if stats.state == 'open' else 0.0,
+                })
+            return rows
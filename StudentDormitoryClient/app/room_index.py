@@ -0,0 +1,280 @@
+# StudentDormitoryClient/app/room_index.py
+
+from heapq import nsmallest
+
+from PyQt6.QtCore import QObject
+
+from .entity_store import EntityStore
+from .table_models import collation_key
+
+
+def free_beds(room: dict):
+    """房间剩余床位数；记录中缺少容量（只加载了部分字段）时返回 None"""
+    capacity = room.get('capacity')
+    if capacity is None:
+        return None
+    return int(capacity) - int(room.get('current_occupancy') or 0)
+
+
+def room_key(building_name, room_number):
+    """学生记录中只有宿舍楼名和房间号，用二者组成的键把学生和房间对应起来"""
+    return '' if building_name is None else str(building_name), '' if room_number is None else str(room_number)
+
+
+def room_accepts(room: dict, gender) -> bool:
+    """房间是否还能住进一名该性别的学生；房间或学生没有性别信息时不限制"""
+    free = free_beds(room)
+    if free is None or free <= 0:
+        return False
+    gender_type = room.get('gender_type') or ''
+    return not gender_type or not gender or gender_type == gender
+
+
+class RoomAvailabilityIndex(QObject):
+    """
+    全校房间的空床位索引，供分配宿舍时按学生推荐房间。
+
+    有空床位的房间按 性别类型 -> 剩余床位数 -> 房间 id 集合 分桶保存，
+    查询一名学生可入住的房间只需要读取对应性别和“不限性别”两组桶，不必扫描全部房间。
+    索引订阅 EntityStore 的变化：单个房间的人数、容量或性别类型变化时只把它移到新的桶里，
+    仓库整批刷新房间列表时，在下一次查询时重建索引。
+    """
+
+    def __init__(self, store: EntityStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._dirty = True
+        self._buckets = {}  # 性别类型（不限为 ''） -> {剩余床位数: {房间 id, ...}}
+        self._location = {}  # 房间 id -> (性别类型, 剩余床位数, (楼栋, 房间号))
+        self._room_at = {}  # (楼栋, 房间号) -> 房间 id
+        self._order = {}  # 房间 id -> (楼栋, 房间号) 的排序键
+        self._text_keys = {}  # 楼栋名、房间号大量重复，排序键按文字缓存
+        self.store.changed.connect(self._on_store_changed)
+
+    def _on_store_changed(self, kind: str, ids):
+        if kind != 'rooms' or self._dirty:
+            return
+        if ids is None:
+            self._dirty = True
+            return
+        for room_id in ids:
+            self._discard(room_id)
+            room = self.store.get('rooms', room_id)
+            if room is not None:
+                self._add(room)
+
+    def _rebuild(self):
+        self._buckets, self._location, self._order, self._room_at = {}, {}, {}, {}
+        for room in self.store.all('rooms'):
+            self._add(room)
+        self._dirty = False
+
+    def _add(self, room: dict):
+        free = free_beds(room)
+        if free is None or free <= 0:
+            return
+        room_id = room['id']
+        gender_type = room.get('gender_type') or ''
+        self._buckets.setdefault(gender_type, {}).setdefault(free, set()).add(room_id)
+        key = room_key(room.get('building_name'), room.get('room_number'))
+        self._location[room_id] = (gender_type, free, key)
+        self._room_at[key] = room_id
+        self._order[room_id] = (self._text_key(room.get('building_name')), self._text_key(room.get('room_number')))
+
+    def _text_key(self, value) -> str:
+        text = '' if value is None else str(value)
+        key = self._text_keys.get(text)
+        if key is None:
+            key = self._text_keys[text] = collation_key(text)
+        return key
+
+    def _discard(self, room_id):
+        location = self._location.pop(room_id, None)
+        self._order.pop(room_id, None)
+        if location is None:
+            return
+        gender_type, free, key = location
+        if self._room_at.get(key) == room_id:
+            del self._room_at[key]
+        levels = self._buckets[gender_type]
+        levels[free].discard(room_id)
+        if not levels[free]:
+            del levels[free]
+
+    def room_at(self, key):
+        """按 (楼栋, 房间号) 查找有空床位的房间，没有空床位或不存在时返回 None"""
+        if self._dirty:
+            self._rebuild()
+        return self._room_at.get(key)
+
+    def rank_key(self, room_id, gender):
+        """
+        房间在 candidates 中的排序键；房间已住满或不适合该性别的学生时返回 None。
+        """
+        location = self._location.get(room_id)
+        if location is None:
+            return None
+        gender_type, free, _ = location
+        if gender_type and gender and gender_type != gender:
+            return None
+        return free, 1 if gender and not gender_type else 0, self._order[room_id]
+
+    def candidates(self, gender=None, limit: int = None) -> list:
+        """
+        一名学生可入住的房间，按推荐顺序排列：
+        剩余床位少的在前（先住满已有人的房间，少占用空房间），
+        床位数相同时限定该性别的房间排在不限性别的房间之前，再按楼栋、房间号排列。
+
+        Args:
+            gender: 学生性别；为空时不按性别筛选。
+            limit (int): 最多返回的房间数，None 表示全部。
+
+        Returns:
+            list: 房间 id 列表。
+        """
+        if self._dirty:
+            self._rebuild()
+        if gender:
+            groups = [(0, self._buckets.get(gender, {})), (1, self._buckets.get('', {}))]
+        else:
+            groups = [(0, levels) for levels in self._buckets.values()]
+        result = []
+        for free in sorted({free for _, levels in groups for free in levels}):
+            level = [(rank, self._order[room_id], room_id)
+                     for rank, levels in groups for room_id in levels.get(free, ())]
+            level.sort()
+            result.extend(room_id for _, _, room_id in level)
+            if limit is not None and len(result) >= limit:
+                return result[:limit]
+        return result
+
+    def free_bed_count(self, gender=None) -> int:
+        """可供该性别学生入住的空床位总数"""
+        if self._dirty:
+            self._rebuild()
+        if gender:
+            groups = [self._buckets.get(gender, {}), self._buckets.get('', {})]
+        else:
+            groups = list(self._buckets.values())
+        return sum(free * len(ids) for levels in groups for free, ids in levels.items())
+
+
+class RoomCompositionIndex(QObject):
+    """
+    每个房间已入住学生的构成摘要：按 (院系, 班级) 和院系统计各房间的人数，
+    推荐房间时直接查出某个班级、院系的学生住在哪些房间，不必扫描学生名册。
+    单个学生的分配、调整只更新他原来和现在所在房间的计数，
+    待更新的学生过多或仓库整批刷新学生列表时，在下一次查询时重建。
+    """
+    REBUILD_THRESHOLD = 2000
+
+    def __init__(self, store: EntityStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._dirty = True
+        self._placement = {}  # 学生 id -> ((楼栋, 房间号), (院系, 班级), 院系)
+        self._by_class = {}  # (院系, 班级) -> {(楼栋, 房间号): 人数}
+        self._by_department = {}  # 院系 -> {(楼栋, 房间号): 人数}
+        self.store.changed.connect(self._on_store_changed)
+
+    def _on_store_changed(self, kind: str, ids):
+        if kind != 'students' or self._dirty:
+            return
+        if ids is None or len(ids) > self.REBUILD_THRESHOLD:
+            self._dirty = True
+            return
+        for student_id in ids:
+            self._discard(student_id)
+            student = self.store.get('students', student_id)
+            if student is not None:
+                self._add(student)
+
+    def _rebuild(self):
+        self._placement, self._by_class, self._by_department = {}, {}, {}
+        for student in self.store.all('students'):
+            self._add(student)
+        self._dirty = False
+
+    @staticmethod
+    def _groups(student: dict):
+        department = student.get('department') or ''
+        return (department, student.get('class_name') or ''), department
+
+    def _add(self, student: dict):
+        if not student.get('dormitory_room'):
+            return
+        key = room_key(student.get('dormitory_building'), student['dormitory_room'])
+        class_group, department = self._groups(student)
+        self._placement[student['id']] = (key, class_group, department)
+        for counts, group in ((self._by_class, class_group), (self._by_department, department)):
+            rooms = counts.setdefault(group, {})
+            rooms[key] = rooms.get(key, 0) + 1
+
+    def _discard(self, student_id):
+        placement = self._placement.pop(student_id, None)
+        if placement is None:
+            return
+        key, class_group, department = placement
+        for counts, group in ((self._by_class, class_group), (self._by_department, department)):
+            rooms = counts[group]
+            rooms[key] -= 1
+            if not rooms[key]:
+                del rooms[key]
+
+    def peer_rooms(self, student: dict):
+        """
+        Returns:
+            tuple: (同班同学所在房间 {(楼栋, 房间号): 人数}, 同院系学生所在房间 {(楼栋, 房间号): 人数})
+        """
+        if self._dirty:
+            self._rebuild()
+        class_group, department = self._groups(student)
+        classmates = self._by_class.get(class_group, {}) if class_group[1] else {}
+        peers = self._by_department.get(department, {}) if department else {}
+        return classmates, peers
+
+
+class RoomRecommender(QObject):
+    """
+    为一名待分配的学生推荐房间：只考虑有空床位、性别类型相符的房间，
+    已住有同班同学、同院系学生的房间按人数加权优先，分数相同时按空床位索引的顺序（剩余床位少的在前）。
+    只有住着同班、同院系学生的房间需要逐个打分，其余名额直接取空床位索引的推荐顺序补足。
+    """
+    CLASSMATE_WEIGHT = 3
+    DEPARTMENT_WEIGHT = 1
+
+    def __init__(self, store: EntityStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.availability = RoomAvailabilityIndex(store, self)
+        self.composition = RoomCompositionIndex(store, self)
+
+    def recommend(self, student: dict, limit: int = 20) -> list:
+        """返回推荐的房间 id 列表，最多 limit 个"""
+        gender = student.get('gender')
+        classmates, peers = self.composition.peer_rooms(student)
+        scores = {}
+        for rooms, weight in ((classmates, self.CLASSMATE_WEIGHT), (peers, self.DEPARTMENT_WEIGHT)):
+            for key, count in rooms.items():
+                scores[key] = scores.get(key, 0) + weight * count
+        scored = []
+        for key, score in scores.items():
+            room_id = self.availability.room_at(key)
+            rank = self.availability.rank_key(room_id, gender) if room_id is not None else None
+            if rank is not None:
+                scored.append((-score, rank, room_id))
+        result = [room_id for _, _, room_id in nsmallest(limit, scored)]
+        if len(result) < limit:
+            chosen = set(result)
+            for room_id in self.availability.candidates(gender, limit=limit + len(result)):
+                if room_id not in chosen:
+                    result.append(room_id)
+                    if len(result) == limit:
+                        break
+        return result
+
+    def affinity(self, student: dict, room: dict):
+        """房间中已住的 (同班同学人数, 同院系学生人数)"""
+        classmates, peers = self.composition.peer_rooms(student)
+        key = room_key(room.get('building_name'), room.get('room_number'))
+        return classmates.get(key, 0), peers.get(key, 0)
@@ -0,0 +1,169 @@
+# StudentDormitoryClient/app/scoped_client.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import Qt
+
+from .api_client import ApiClient
+
+
+class ScopedApiClient:
+    """
+    限定在某个院系或楼栋范围内的 ApiClient 视图，供教师、辅导员和宿管的工作台使用。
+
+    - 所有学生查询都会自动带上作用域条件，调用方无法越过作用域；
+    - 作用域内的查询结果按查询条件缓存 id 列表（各作用域互不干扰），记录本身仍来自共享的实体仓库，
+      因此其它地方的修改会立即反映在缓存结果中；缓存超过 max_age 秒或调用 invalidate() 后重新请求；
+    - 实体仓库中的学生发生变化时，只丢弃成员关系可能因此改变的缓存查询（记录被删除、
+      不再满足或开始满足筛选条件、排序依据可能改变），其余缓存继续使用；
+    - prefetch() 在后台线程中提前加载名册，随后的同一查询会直接使用预取结果。
+
+    作用域没有重写的方法和属性（store、update_student 等）直接使用底层的 ApiClient。
+    """
+    # 筛选条件 -> 学生记录中对应的字段；allocated 按是否有房间号判断
+    FILTER_FIELDS = {'department': 'department', 'building': 'dormitory_building', 'allocated': 'dormitory_room',
+                     'gender': 'gender', 'class_name': 'class_name'}
+
+    def __init__(self, api_client: ApiClient, scope: dict, name: str = '', max_age: float = 300):
+        """
+        Args:
+            api_client (ApiClient): 共享的底层客户端。
+            scope (dict): 作用域条件，例如 {'department': '计算机学院'}。
+            name (str): 作用域名称，用于状态栏等处的显示。
+            max_age (float): 缓存的有效期（秒）。
+        """
+        self._client = api_client
+        self.scope = dict(scope)
+        self.name = name
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._cache = {}  # 查询键 -> (加载时间, id 列表)
+        self._pending = {}  # 查询键 -> 预取中的 Future
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        # 仓库可能在工作线程中修改，直接在发出信号的线程中处理，保证下一次查询之前缓存已经更新
+        api_client.store.changed.connect(self._on_store_changed, Qt.ConnectionType.DirectConnection)
+
+    @classmethod
+    def for_department(cls, api_client: ApiClient, department: str, **kwargs):
+        return cls(api_client, {'department': department}, name=department, **kwargs)
+
+    @classmethod
+    def for_building(cls, api_client: ApiClient, building_name: str, **kwargs):
+        return cls(api_client, {'building': building_name}, name=building_name, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    # --- 缓存 ---
+
+    @staticmethod
+    def _cache_key(filters: dict, fields, sort) -> tuple:
+        return (tuple(sorted(filters.items())), tuple(fields or ()),
+                sort if isinstance(sort, (str, type(None))) else tuple(sort))
+
+    def _fetch(self, key: tuple, filters: dict, fields, sort):
+        result = self._client.query_students(filters, fields, sort)
+        with self._lock:
+            self._pending.pop(key, None)
+            if isinstance(result, list):
+                self._cache[key] = (time.monotonic(), [row['id'] for row in result if 'id' in row])
+        return result
+
+    def invalidate(self):
+        """丢弃本作用域的缓存，下一次查询会重新请求后端"""
+        with self._lock:
+            self._cache.clear()
+
+    @classmethod
+    def _matches(cls, filters: tuple, row: dict):
+        """记录是否满足查询条件；记录不存在时为 False，缺少判断所需的字段时为 None（无法确定）"""
+        if row is None:
+            return False
+        for key, value in filters:
+            field = cls.FILTER_FIELDS.get(key)
+            if field not in row:
+                return None
+            actual = bool(row[field]) if key == 'allocated' else row[field]
+            if actual != value:
+                return False
+        return True
+
+    def _on_store_changed(self, kind: str, ids):
+        # 整批合并（ids 为 None）来自列表查询本身，不影响已缓存的成员关系
+        if kind != 'students' or not ids:
+            return
+        rows = {entity_id: self.store.get(kind, entity_id) for entity_id in ids}
+        with self._lock:
+            for key in list(self._cache):
+                filters, _, sort = key
+                members = set(self._cache[key][1])
+                for entity_id, row in rows.items():
+                    member = entity_id in members
+                    if self._matches(filters, row) is not member or (member and sort):
+                        del self._cache[key]
+                        break
+
+    def prefetch(self, filters: dict = None, fields=None, sort=None):
+        """在后台线程中提前执行一次查询并写入缓存；已缓存或正在预取时什么也不做"""
+        merged = {**(filters or {}), **self.scope}
+        key = self._cache_key(merged, fields, sort)
+        with self._lock:
+            if key in self._pending or self._is_fresh(key):
+                return
+            self._pending[key] = self._executor.submit(self._fetch, key, merged, fields, sort)
+
+    def _is_fresh(self, key: tuple) -> bool:
+        cached = self._cache.get(key)
+        return cached is not None and time.monotonic() - cached[0] < self.max_age
+
+    # --- 作用域内的查询 ---
+
+    def query_students(self, filters: dict = None, fields=None, sort=None, limit: int = None, offset: int = None):
+        """同 ApiClient.query_students，但始终附加作用域条件；分页查询不缓存"""
+        merged = {**(filters or {}), **self.scope}
+        if limit is not None or offset is not None:
+            return self._client.query_students(merged, fields, sort, limit, offset)
+        key = self._cache_key(merged, fields, sort)
+        with self._lock:
+            if self._is_fresh(key):
+                return self.store.get_many('students', self._cache[key][1])
+            future = self._pending.get(key)
+        if future is not None:
+            result = future.result()
+            if isinstance(result, list):
+                return result
+        return self._fetch(key, merged, fields, sort)
+
+    def query_rooms(self, filters: dict = None, fields=None, sort=None, limit: int = None, offset: int = None):
+        """同 ApiClient.query_rooms，作用域中的楼栋条件同样适用于房间"""
+        scope = {key: value for key, value in self.scope.items() if key in ApiClient.ROOM_FILTERS}
+        return self._client.query_rooms({**(filters or {}), **scope}, fields, sort, limit, offset)
+
+    def iter_pages(self, path: str, params: dict = None, page_size: int = 1000):
+        """导出等分页遍历同样限定在作用域内"""
+        if path.startswith('students'):
+            params = {**(params or {}), **self.scope}
+        return self._client.iter_pages(path, params, page_size)
+
+    def fetch_page(self, kind: str, filters: dict = None, fields=None, sort=None, offset: int = 0, limit: int = 200):
+        """分页表格同样限定在作用域内"""
+        allowed = ApiClient.STUDENT_FILTERS if kind == 'students' else ApiClient.ROOM_FILTERS
+        scope = {key: value for key, value in self.scope.items() if key in allowed}
+        return self._client.fetch_page(kind, {**(filters or {}), **scope}, fields, sort, offset, limit)
+
+    def get_all_students(self):
+        return self.query_students()
+
+    def get_students_by_building(self, building_name: str):
+        return self.query_students({'building': building_name})
+
+    def get_students_by_department(self, department_name: str):
+        return self.query_students({'department': department_name})
+
+    def get_unallocated_students(self):
+        return self.query_students({'allocated': False})
+
+    def get_rooms(self, building_name: str = None):
+        return self.query_rooms({'building': building_name})
@@ -0,0 +1,167 @@
+# StudentDormitoryClient/app/search_index.py
+
+from bisect import bisect_left
+from functools import lru_cache
+
+from PyQt6.QtCore import QObject
+
+from .entity_store import EntityStore
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时不支持按拼音首字母搜索
+    lazy_pinyin = None
+
+# 取值大量重复的字段，按不同取值建立索引，查询时只需扫描不同的取值
+CATEGORY_FIELDS = ('department', 'class_name', 'dormitory_building', 'dormitory_room')
+
+
+def _normalize(value) -> str:
+    return '' if value is None else str(value).strip().lower()
+
+
+@lru_cache(maxsize=None)
+def _char_initial(char: str) -> str:
+    return lazy_pinyin(char, style=Style.FIRST_LETTER)[0][:1].lower() if '\u4e00' <= char <= '\u9fff' else char
+
+
+def name_initials(name: str) -> str:
+    """中文姓名的拼音首字母，例如 张三 -> zs；未安装 pypinyin 时返回空字符串"""
+    if lazy_pinyin is None or not name:
+        return ''
+    # 逐字查询并缓存，常用汉字只需计算一次
+    return ''.join(_char_initial(char) for char in name)
+
+
+def _substrings(text: str) -> set:
+    return {text[i:j] for i in range(len(text)) for j in range(i + 1, len(text) + 1)}
+
+
+class _PrefixIndex:
+    """有序 (值, id) 列表，用二分查找回答前缀查询"""
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self._values = [value for value, _ in pairs]
+        self._ids = [entity_id for _, entity_id in pairs]
+
+    def match(self, prefix: str) -> list:
+        start = bisect_left(self._values, prefix)
+        end = bisect_left(self._values, prefix + '\uffff', start)
+        return self._ids[start:end]
+
+
+class StudentSearchIndex(QObject):
+    """
+    学生列表的内存搜索索引。
+
+    - 姓名及其拼音首字母：所有子串建立倒排索引，可以按姓、名或其中任意几个字查找；
+    - 学号、电话：有序列表上的前缀查找，电话另外支持按尾号查找；
+    - 院系、班级、楼栋、房间：按不同取值建立索引，查询时只需扫描不同的取值。
+
+    查询只做字典查找、二分查找和集合运算，10 万条记录也只需几毫秒。
+    索引订阅 EntityStore 的变化：单条记录的增删改先记为“待更新”，查询时对这些记录逐条比对，
+    待更新的记录过多或仓库整批刷新时，在下一次查询时重建索引。
+    """
+    REBUILD_THRESHOLD = 2000
+
+    def __init__(self, store: EntityStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._dirty = True
+        self._names = {}
+        self._categories = {}
+        self._prefixes = []
+        self._phone_tails = None
+        self._stale = set()
+        self.store.changed.connect(self._on_store_changed)
+
+    def _on_store_changed(self, kind: str, ids):
+        if kind != 'students' or self._dirty:
+            return
+        if ids is None:
+            self._dirty = True
+        else:
+            self._stale.update(ids)
+            if len(self._stale) > self.REBUILD_THRESHOLD:
+                self._dirty = True
+
+    def _rebuild(self):
+        names = {}  # 姓名 -> id 列表（重名很常见，先按姓名归并，再展开子串）
+        categories = {field: {} for field in CATEGORY_FIELDS}
+        numbers, phones, phone_tails = [], [], []
+        for record in self.store.all('students'):
+            entity_id = record['id']
+            names.setdefault(_normalize(record.get('name')), []).append(entity_id)
+            for field in CATEGORY_FIELDS:
+                value = _normalize(record.get(field))
+                if value:
+                    categories[field].setdefault(value, []).append(entity_id)
+            number, phone = _normalize(record.get('student_id')), _normalize(record.get('phone'))
+            if number:
+                numbers.append((number, entity_id))
+            if phone:
+                phones.append((phone, entity_id))
+                phone_tails.append((phone[::-1], entity_id))
+
+        self._names = {}
+        for name, ids in names.items():
+            keys = _substrings(name) | _substrings(name_initials(name))
+            for key in keys:
+                self._names.setdefault(key, []).extend(ids)
+        self._names.pop('', None)
+        self._categories = categories
+        self._prefixes = [_PrefixIndex(numbers), _PrefixIndex(phones)]
+        self._phone_tails = _PrefixIndex(phone_tails)
+        self._stale = set()
+        self._dirty = False
+
+    @staticmethod
+    def _record_matches(record: dict, term: str) -> bool:
+        """逐条比对一条记录，规则与索引查询一致"""
+        name = _normalize(record.get('name'))
+        if term in name or term in name_initials(name):
+            return True
+        phone = _normalize(record.get('phone'))
+        if _normalize(record.get('student_id')).startswith(term) or phone.startswith(term):
+            return True
+        if term.isdigit() and phone.endswith(term):
+            return True
+        return any(term in _normalize(record.get(field)) for field in CATEGORY_FIELDS)
+
+    def _match_term(self, term: str) -> set:
+        matched = set(self._names.get(term, ()))
+        for prefix_index in self._prefixes:
+            matched.update(prefix_index.match(term))
+        if term.isdigit():
+            matched.update(self._phone_tails.match(term[::-1]))
+        for values in self._categories.values():
+            for value, ids in values.items():
+                if term in value:
+                    matched.update(ids)
+        if self._stale:
+            matched -= self._stale
+            for record in self.store.get_many('students', self._stale):
+                if self._record_matches(record, term):
+                    matched.add(record['id'])
+        return matched
+
+    def search(self, query: str):
+        """
+        查询学生。多个以空格分隔的查询词之间是“且”的关系。
+
+        Returns:
+            set or None: 匹配的学生 id 集合；查询为空时返回 None，表示不过滤。
+        """
+        terms = _normalize(query).split()
+        if not terms:
+            return None
+        if self._dirty:
+            self._rebuild()
+        result = None
+        for term in terms:
+            matched = self._match_term(term)
+            result = matched if result is None else result & matched
+            if not result:
+                break
+        return result
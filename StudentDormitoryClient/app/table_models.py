@@ -0,0 +1,765 @@
+# StudentDormitoryClient/app/table_models.py
+
+import re
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache, partial
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QSortFilterProxyModel, QTimer, pyqtSignal
+
+from .entity_store import EntityStore
+from .workers import with_transform
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时汉字按编码排序
+    lazy_pinyin = None
+
+
+# data() 在这个角色下返回单元格的排序键
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def display_text(value) -> str:
+    """把字段值转换成表格中显示的文字，None 显示为空"""
+    return '' if value is None else str(value)
+
+
+def changed_fields(original: dict, payload: dict) -> dict:
+    """
+    编辑对话框保存前调用：只保留与原记录不同的字段，供 update_* 做部分更新。
+    原记录可以是原始值，也可以是 row_texts 的文字形式，两边都按显示文字比较（None 与空字符串相同）。
+    """
+    return {key: value for key, value in payload.items() if display_text(value) != display_text(original.get(key))}
+
+
+_DIGITS = re.compile(r'\d+')
+
+
+@lru_cache(maxsize=None)
+def _collation_char(char: str) -> str:
+    """汉字换成带声调的拼音（同音字再按字本身区分），其它字符转成小写"""
+    if lazy_pinyin is not None and '\u4e00' <= char <= '\u9fff':
+        return lazy_pinyin(char, style=Style.TONE3)[0] + char
+    return char.lower()
+
+
+def _natural_digits(match) -> str:
+    digits = match.group().lstrip('0') or '0'
+    return f"{len(digits):03d}{digits}"
+
+
+def collation_key(text: str) -> str:
+    """
+    文字的排序键：汉字按拼音排序，连续的数字按数值排序（前面加上位数，按字符串比较即为数值顺序），
+    例如 "2-9" 排在 "2-10" 前面，"张三" 排在 "李四" 后面。
+    """
+    key = text.lower() if text.isascii() else ''.join(map(_collation_char, text))
+    return _DIGITS.sub(_natural_digits, key) if _DIGITS.search(key) else key
+
+
+def sort_key(value):
+    """
+    单元格的排序键：数字和纯数字的文字（年龄、容量、学号等）按数值比较，
+    其余文字见 collation_key（房间号按自然顺序，姓名按拼音），空值排在最后。
+    """
+    if value is None or value == '':
+        return (2, '')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    text = str(value).strip()
+    if text.isdigit():
+        return (0, int(text))
+    return (1, collation_key(text))
+
+
+def format_record(record: dict, columns: list) -> tuple:
+    """计算一条记录在表格中的显示文字和排序键，返回 (文字元组, 排序键元组)"""
+    values = [field(record) if callable(field) else record.get(field) for _, field in columns]
+    return tuple(display_text(value) for value in values), tuple(sort_key(value) for value in values)
+
+
+def enable_sorting(view):
+    """启用表头点击排序；初始不排序，保持后端返回的顺序"""
+    view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+    view.setSortingEnabled(True)
+
+
+class RowBuffer:
+    """
+    在后台线程中整理好的一批表格行：每条记录的显示文字和排序键都已经算好，
+    GUI 线程调用 EntityTableModel.set_rows 时只需要换入。
+
+    每一行都和整理时仓库中的记录对象绑定在一起，记录之后被修改（仓库中换成了新的对象）时，
+    模型会发现对象不一致，改为重新计算这一行，因此不会显示过期的内容。
+    """
+
+    def __init__(self, store: EntityStore, kind: str, columns: list, rows: list):
+        self.ids = [row['id'] for row in rows if 'id' in row]
+        self.entries = {}
+        for record in store.get_many(kind, self.ids):
+            self.entries[record['id']] = (record, *format_record(record, columns))
+        # 每一列的名次表和每一行的名次也在后台算好，表头排序时不需要再比较排序键；
+        # rank_lists[列] 与 ranked_ids 一一对应
+        self.ranks = {column: ColumnRanks(entry[2][column] for entry in self.entries.values())
+                      for column in range(len(columns))}
+        self.ranked_ids = list(self.entries)
+        self.rank_lists = {column: [ranks.rank_of[self.entries[entity_id][2][column]] for entity_id in self.ranked_ids]
+                           for column, ranks in self.ranks.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class ColumnRanks:
+    """
+    一列排序键的名次表：不同的键排好序后依次编号，相同的键名次相同，排序时只需比较数字。
+    之后出现的新键取相邻两个名次的中间值，已有的名次不需要重新编号。
+    """
+
+    def __init__(self, keys):
+        self._keys = sorted(set(keys))
+        # 排序键 -> 名次
+        self.rank_of = {key: rank for rank, key in enumerate(self._keys)}
+
+    def rank(self, key):
+        rank = self.rank_of.get(key)
+        if rank is None:
+            position = bisect_left(self._keys, key)
+            low = self.rank_of[self._keys[position - 1]] if position > 0 else -1
+            high = self.rank_of[self._keys[position]] if position < len(self._keys) else low + 2
+            rank = self.rank_of[key] = (low + high) / 2
+            self._keys.insert(position, key)
+        return rank
+
+
+class EntityTableModel(QAbstractTableModel):
+    """
+    基于 EntityStore 的只读表格模型。
+    模型本身只保存当前显示的 id 顺序，行数据始终从仓库读取，
+    仓库发生变化时只刷新受影响的行，不需要重新请求整个列表。
+
+    超过 PROGRESSIVE_THRESHOLD 行的列表分批显示：先立即显示首批 FIRST_BATCH 行（首屏），
+    其余的行在事件循环空闲时逐批追加，每一批占用的时间不超过 FRAME_BUDGET 秒，
+    批与批之间界面照常绘制，滚动、选择和排序在加载过程中都可以使用。进度通过 load_progress 发出。
+
+    表头排序（sort）按每列的名次表（ColumnRanks）对 id 排序，不比较排序键本身，也不重建任何行。
+    排序是稳定的，依次点击的最近 MAX_SORT_COLUMNS 列组成多列排序（最后点击的列优先），
+    重新加载列表后按同样的顺序重新排序。
+    """
+    # (已显示的行数, 总行数)；分批显示时每追加一批发出一次，两者相等表示显示完毕
+    load_progress = pyqtSignal(int, int)
+
+    PROGRESSIVE_THRESHOLD = 2000
+    FIRST_BATCH = 200
+    FRAME_BUDGET = 0.008
+    MIN_BATCH = 50
+    MAX_SORT_COLUMNS = 3
+
+    def __init__(self, store: EntityStore, kind: str, columns: list, accepts=None, parent=None):
+        """
+        Args:
+            store (EntityStore): 数据来源仓库。
+            kind (str): 实体类型，例如 'students'。
+            columns (list): [(表头, 字段名或 callable(row) -> 显示值), ...]
+            accepts (callable): 判断一条记录是否属于本视图；为 None 时只显示 set_rows 指定的记录。
+        """
+        super().__init__(parent)
+        self.store = store
+        self.kind = kind
+        self.columns = columns
+        self.accepts = accepts
+        self._ids = []
+        self._row_of = {}
+        # id -> (记录对象, 显示文字, 排序键)；记录对象与仓库中的不一致时重新计算
+        self._formatted = {}
+        # 分批显示时等待追加的 id（_pending[_next:] 尚未追加），以及实测的每行耗时（秒，用来决定一批追加多少行）
+        self._pending = []
+        self._next = 0
+        self._row_cost = 20e-6
+        # 排序：依次点击过的 [(列, 顺序), ...]，每列的名次表，按列缓存的 id -> 名次，
+        # 以及排序键可能已经过期的 id（整批刷新后 _ranks_unchecked 为 True，排序前逐条核对）
+        self._sorting = []
+        self._column_ranks = {}
+        self._row_ranks = {}
+        self._rank_stale = set()
+        self._ranks_unchecked = False
+        # RowBuffer 在后台算好的名次，以及此后排序键被重新计算过的 id（用这些名次时需要修正）
+        self._buffer_ranks = None
+        self._reranked = set()
+        self._insert_timer = QTimer(self)
+        self._insert_timer.setInterval(0)
+        self._insert_timer.timeout.connect(self._insert_batch)
+        self.store.changed.connect(self._on_store_changed)
+
+    # --- 成员管理 ---
+
+    def make_buffer(self, rows: list) -> RowBuffer:
+        """在后台线程中调用：把一次列表请求的结果整理成 RowBuffer（见 ApiWorker 的 transform）"""
+        return RowBuffer(self.store, self.kind, self.columns, rows)
+
+    def set_rows(self, rows):
+        """
+        用一次列表请求的结果重置模型显示的记录；显示的记录和顺序都没有变化时不重置。
+        rows 可以是记录列表，也可以是后台线程中整理好的 RowBuffer。
+        """
+        if isinstance(rows, RowBuffer):
+            ids = rows.ids
+            self._formatted = {entity_id: rows.entries[entity_id] for entity_id in ids if entity_id in rows.entries}
+            self._column_ranks = dict(rows.ranks)
+            self._buffer_ranks = (rows.ranked_ids, rows.rank_lists)
+            self._ranks_unchecked = False
+        else:
+            ids = [row['id'] for row in rows if 'id' in row]
+            self._formatted = {entity_id: self._formatted[entity_id] for entity_id in ids if entity_id in self._formatted}
+            self._column_ranks = {}
+            self._buffer_ranks = None
+            self._ranks_unchecked = True
+        self._row_ranks = {}
+        self._rank_stale.clear()
+        self._reranked.clear()
+        for column, order in self._sorting:
+            ids = self._sorted(ids, column, order)
+        if ids == self._ids + self._pending[self._next:]:
+            return
+        self._insert_timer.stop()
+        first = ids if len(ids) <= self.PROGRESSIVE_THRESHOLD else ids[:self.FIRST_BATCH]
+        self.beginResetModel()
+        self._ids = first
+        self._pending = ids[len(first):]
+        self._next = 0
+        self._reindex()
+        self.endResetModel()
+        if self._pending:
+            self.load_progress.emit(len(self._ids), len(ids))
+            self._insert_timer.start()
+
+    def is_loading(self) -> bool:
+        return self._next < len(self._pending)
+
+    def _insert_batch(self):
+        deadline = time.perf_counter() + self.FRAME_BUDGET
+        first_batch = True
+        while self.is_loading():
+            started = time.perf_counter()
+            # 按实测的每行耗时估计剩余预算内还能追加多少行，留出四分之一给视图的重绘和信号处理
+            count = int((deadline - started) * 0.75 / self._row_cost)
+            if count < self.MIN_BATCH:
+                # 每次至少追加 MIN_BATCH 行：估计的每行耗时超过整个预算时也能推进，随后按实测耗时修正
+                if not first_batch:
+                    break
+                count = self.MIN_BATCH
+            first_batch = False
+            chunk = self._pending[self._next:self._next + count]
+            self._next += len(chunk)
+            # 等待期间被删除或不再属于本视图的记录不再显示
+            records = self.store.get_many(self.kind, chunk)
+            chunk = [record['id'] for record in records if self.accepts is None or self.accepts(record)]
+            if not chunk:
+                continue
+            start = len(self._ids)
+            self.beginInsertRows(QModelIndex(), start, start + len(chunk) - 1)
+            self._ids.extend(chunk)
+            self._row_of.update((entity_id, start + offset) for offset, entity_id in enumerate(chunk))
+            self.endInsertRows()
+            # 按实际追加的行数计算：最后一批往往不足 count 行
+            cost = (time.perf_counter() - started) / len(chunk)
+            self._row_cost = (self._row_cost + cost) / 2
+        total = len(self._ids) + len(self._pending) - self._next
+        self.load_progress.emit(len(self._ids), total)
+        if not self.is_loading():
+            self._insert_timer.stop()
+            self._pending = []
+            self._next = 0
+
+    def clear(self):
+        self.set_rows([])
+
+    # --- 排序 ---
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """按一列排序（点击表头时由视图调用），值相同的行保持之前的顺序"""
+        if not 0 <= column < len(self.columns):
+            return
+        self._sorting = [item for item in self._sorting if item[0] != column]
+        self._sorting = self._sorting[-(self.MAX_SORT_COLUMNS - 1):] + [(column, order)]
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_ids = [self._ids[index.row()] for index in persistent]
+        ids = self._sorted(self._ids + self._pending[self._next:], column, order)
+        # 分批显示过程中排序时，已显示的行数不变，其余的行按排序后的顺序继续追加
+        shown = len(self._ids)
+        self._ids, self._pending, self._next = ids[:shown], ids[shown:], 0
+        self._reindex()
+        # 排序后移到尚未显示部分的行，其持久索引（当前行、选择）随之失效
+        rows = [self._row_of.get(entity_id) for entity_id in persistent_ids]
+        self.changePersistentIndexList(persistent, [QModelIndex() if row is None else self.index(row, index.column())
+                                                    for row, index in zip(rows, persistent)])
+        self.layoutChanged.emit()
+
+    def _sorted(self, ids: list, column: int, order) -> list:
+        ranks = self._ranks_for(column, ids)
+        return sorted(ids, key=ranks.__getitem__, reverse=order == Qt.SortOrder.DescendingOrder)
+
+    def _ranks_for(self, column: int, ids: list) -> dict:
+        """返回覆盖 ids 的 id -> 名次；名次按列缓存，记录变化后只更新变化的 id"""
+        self._refresh_sort_keys(ids)
+        column_ranks = self._column_ranks.get(column)
+        if column_ranks is None:
+            column_ranks = self._column_ranks[column] = ColumnRanks(
+                self._formatted[entity_id][2][column] for entity_id in ids)
+        formatted = self._formatted
+        row_ranks = self._row_ranks.get(column)
+        if row_ranks is None and self._buffer_ranks is not None and column in self._buffer_ranks[1]:
+            ranked_ids, rank_lists = self._buffer_ranks
+            row_ranks = dict(zip(ranked_ids, rank_lists[column]))
+            for entity_id in self._reranked:
+                row_ranks[entity_id] = column_ranks.rank(formatted[entity_id][2][column])
+            self._row_ranks[column] = row_ranks
+        if row_ranks is None:
+            try:
+                rank_of = column_ranks.rank_of
+                row_ranks = {entity_id: rank_of[formatted[entity_id][2][column]] for entity_id in ids}
+            except KeyError:  # 有名次表中没有的新键
+                row_ranks = {entity_id: column_ranks.rank(formatted[entity_id][2][column]) for entity_id in ids}
+            self._row_ranks[column] = row_ranks
+        else:
+            for entity_id in set(ids).difference(row_ranks):
+                row_ranks[entity_id] = column_ranks.rank(formatted[entity_id][2][column])
+        return row_ranks
+
+    def _refresh_sort_keys(self, ids: list):
+        """重新计算排序键可能已经过期的记录，并更新已缓存的名次"""
+        if self._ranks_unchecked:
+            records = {record['id']: record for record in self.store.get_many(self.kind, ids)}
+            stale = [entity_id for entity_id in ids
+                     if entity_id not in self._formatted or self._formatted[entity_id][0] is not records.get(entity_id)]
+            self._ranks_unchecked = False
+        else:
+            # 新追加和被修改的记录都会出现在 _rank_stale 中
+            stale = [entity_id for entity_id in self._rank_stale if self.store.contains(self.kind, entity_id)]
+        self._rank_stale.clear()
+        self._reranked.update(stale)
+        for entity_id in stale:
+            record = self.store.get(self.kind, entity_id) or {'id': entity_id}
+            entry = self._formatted[entity_id] = (record, *format_record(record, self.columns))
+            for column, row_ranks in self._row_ranks.items():
+                row_ranks[entity_id] = self._column_ranks[column].rank(entry[2][column])
+
+    def row_id(self, row: int):
+        return self._ids[row]
+
+    def find_row(self, entity_id) -> int:
+        return self._row_of.get(entity_id, -1)
+
+    def row_data(self, row: int) -> dict:
+        """返回某一行对应的原始记录"""
+        return self.store.get(self.kind, self._ids[row]) or {}
+
+    def row_texts(self, row: int) -> dict:
+        """返回某一行记录的文字形式（id 保持为整数），供编辑对话框使用"""
+        record = self.row_data(row)
+        texts = {key: display_text(value) for key, value in record.items()}
+        texts['id'] = record.get('id')
+        return texts
+
+    def checkout(self, row: int) -> dict:
+        """编辑、删除前调用，返回这一行的记录（记录已在仓库中，见 PagedTableModel.checkout）"""
+        return self.row_data(row)
+
+    def _reindex(self):
+        self._row_of = dict(zip(self._ids, range(len(self._ids))))
+
+    # --- Qt 模型接口 ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return super().headerData(section, orientation, role)
+
+    def _formatted_row(self, row: int):
+        entity_id = self._ids[row]
+        record = self.store.get(self.kind, entity_id)
+        if record is None:
+            return None
+        cached = self._formatted.get(entity_id)
+        if cached is None or cached[0] is not record:
+            cached = self._formatted[entity_id] = (record, *format_record(record, self.columns))
+        return cached
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, SORT_ROLE):
+            return None
+        formatted = self._formatted_row(index.row())
+        if formatted is None:
+            return None
+        return formatted[1 if role == Qt.ItemDataRole.DisplayRole else 2][index.column()]
+
+    # --- 仓库变化 ---
+
+    def _on_store_changed(self, kind: str, ids):
+        if kind != self.kind:
+            return
+        if ids is None:
+            # 整批刷新：去掉已经不存在的记录，其余行原地重绘
+            self._ranks_unchecked = True
+            alive = [i for i in self._ids if self.store.contains(self.kind, i)]
+            if len(alive) != len(self._ids):
+                self.beginResetModel()
+                self._ids = alive
+                self._reindex()
+                self.endResetModel()
+            elif self._ids:
+                self.dataChanged.emit(self.index(0, 0), self.index(len(self._ids) - 1, len(self.columns) - 1))
+            return
+
+        self._rank_stale.update(ids)
+        changed, to_remove, to_append = [], [], []
+        pending = set(self._pending[self._next:])
+        for entity_id in ids:
+            record = self.store.get(self.kind, entity_id)
+            belongs = record is not None and (self.accepts is None or self.accepts(record))
+            row = self._row_of.get(entity_id)
+            if row is not None and belongs:
+                changed.append(row)
+            elif row is not None:
+                to_remove.append(row)
+            elif belongs and self.accepts is not None and entity_id not in pending:
+                to_append.append(entity_id)
+
+        # 批量修改、删除时合并成一次重绘，连续的行一次移除
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), 0), self.index(max(changed), len(self.columns) - 1))
+        runs = []  # [[起始行, 结束行], ...]，从后往前
+        for row in sorted(to_remove, reverse=True):
+            if runs and runs[-1][0] == row + 1:
+                runs[-1][0] = row
+            else:
+                runs.append([row, row])
+        for first, last in runs:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for entity_id in self._ids[first:last + 1]:
+                self._formatted.pop(entity_id, None)
+            del self._ids[first:last + 1]
+            self.endRemoveRows()
+        if to_append and self.is_loading():
+            # 还在分批显示时，新记录排在等待显示的记录之后
+            self._pending.extend(to_append)
+        elif to_append:
+            start = len(self._ids)
+            self.beginInsertRows(QModelIndex(), start, start + len(to_append) - 1)
+            self._ids.extend(to_append)
+            self.endInsertRows()
+        if to_remove or to_append:
+            self._reindex()
+
+
+class PagedTableModel(QAbstractTableModel):
+    """
+    按需分页加载的只读表格模型（虚拟滚动）。
+
+    视图滚动到已加载部分的末尾时，Qt 通过 canFetchMore/fetchMore 请求下一页。
+    内存中最多保留 max_pages 页记录，超出时淘汰最久没有显示过的页；被淘汰的行仍然占据原来的位置，
+    再次滚动到这些行时重新请求所在的页，返回之前显示为占位文字。
+    因此无论列表有多少条记录，模型保存的记录都不超过 max_pages × page_size 条。
+
+    分页请求通过 page_requested 交给所在的模块发出（与模块的其它请求一样经过主窗口的任务队列），
+    记录不写入 EntityStore。仓库中的记录发生变化时（例如在本模块中修改、删除），更新已加载的对应行。
+
+    内存中没有完整的列表，表头排序交给后端（sort 参数），依次点击的列组成多列排序，排序后从第一页重新加载。
+    """
+    # (结果回调, ApiClient.fetch_page 的参数)
+    page_requested = pyqtSignal(object, tuple)
+    # 分页请求失败的错误信息；失败的页不会自动重试，直到下一次 reload
+    load_failed = pyqtSignal(str)
+
+    PLACEHOLDER = "加载中…"
+
+    def __init__(self, store: EntityStore, kind: str, columns: list, page_size: int = 200, max_pages: int = 10,
+                 parent=None):
+        """
+        Args:
+            store (EntityStore): 用于接收本模块修改、删除记录的通知。
+            kind (str): 'students' 或 'rooms'。
+            columns (list): [(表头, 字段名或 callable(row) -> 显示值), ...]
+            page_size (int): 每页的记录数。
+            max_pages (int): 内存中最多保留的页数。
+        """
+        super().__init__(parent)
+        self.store = store
+        self.kind = kind
+        self.columns = columns
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.filters = {}
+        self._sorting = []  # 依次点击过的 [(字段, 是否降序), ...]，最后一项优先
+        # 每次 reset 加一，之前发出的请求返回时直接丢弃
+        self._generation = 0
+        self._row_count = 0
+        self._exhausted = True
+        # 页号 -> [(记录, 显示文字, 排序键), ...]，按最近一次显示的先后排列，最前面的最先被淘汰
+        self._pages = OrderedDict()
+        self._where = {}  # id -> (页号, 页内位置)，只包含已加载的页
+        self._requested = set()
+        self._failed = set()
+        self._wanted = set()  # data() 中遇到的未加载的页，在事件循环中统一请求
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.setInterval(0)
+        self._request_timer.timeout.connect(self._request_wanted)
+        self.store.changed.connect(self._on_store_changed)
+
+    # --- 分页 ---
+
+    def reset(self, filters: dict = None):
+        """按新的筛选条件从第一页重新加载"""
+        self.filters = dict(filters or {})
+        self._generation += 1
+        self.beginResetModel()
+        self._row_count = 0
+        self._exhausted = False
+        self._pages.clear()
+        self._where.clear()
+        self._requested.clear()
+        self._failed.clear()
+        self._wanted.clear()
+        self.endResetModel()
+        self._request(0)
+
+    def reload(self):
+        """
+        保留当前的行数、滚动位置和已加载的页，在后台重新请求已加载的页（定时刷新）。
+        请求返回前各页照常显示；返回的内容与已加载的相同时不做任何改动，只替换有变化的页。
+        """
+        if self._row_count == 0:
+            self.reset(self.filters)
+            return
+        self._failed.clear()
+        for page in list(self._pages):
+            self._request(page)
+
+    def is_loaded(self, row: int) -> bool:
+        return row // self.page_size in self._pages
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return False
+        page = self._row_count // self.page_size
+        return page not in self._requested and page not in self._failed
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request(self._row_count // self.page_size)
+
+    def _fields(self):
+        fields = [field for _, field in self.columns]
+        return None if any(callable(field) for field in fields) else fields
+
+    def _request(self, page: int):
+        if page in self._requested:
+            return
+        self._requested.add(page)
+        callback = with_transform(partial(self._on_page_loaded, self._generation, page), self._format_page)
+        sort = [('-' if descending else '') + field for field, descending in reversed(self._sorting)] or None
+        self.page_requested.emit(callback, (self.kind, self.filters, self._fields(), sort,
+                                            page * self.page_size, self.page_size))
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        if not 0 <= column < len(self.columns) or callable(self.columns[column][1]):
+            return
+        field = self.columns[column][1]
+        self._sorting = [item for item in self._sorting if item[0] != field]
+        self._sorting = self._sorting[-(EntityTableModel.MAX_SORT_COLUMNS - 1):] + \
+            [(field, order == Qt.SortOrder.DescendingOrder)]
+        self.reset(self.filters)
+
+    def _want(self, page: int):
+        if page not in self._requested and page not in self._failed:
+            self._wanted.add(page)
+            self._request_timer.start()
+
+    def _request_wanted(self):
+        wanted, self._wanted = sorted(self._wanted), set()
+        for page in wanted:
+            if page not in self._pages:
+                self._request(page)
+
+    def _format_page(self, records: list) -> list:
+        """在后台线程中调用：计算一页记录的显示文字和排序键"""
+        return [(record, *format_record(record, self.columns)) for record in records if 'id' in record]
+
+    def _on_page_loaded(self, generation: int, page: int, is_success: bool, data: object):
+        if generation != self._generation:
+            return
+        self._requested.discard(page)
+        if not is_success:
+            self._failed.add(page)
+            self.load_failed.emit(str(data))
+            return
+        old = self._pages.get(page)
+        if old is not None and [entry[0] for entry in old] == [entry[0] for entry in data]:
+            # 重新请求的页没有变化，不替换也不通知视图
+            return
+        start = page * self.page_size
+        end = start + len(data)
+        self._install(page, data)
+        if end > self._row_count:
+            self.beginInsertRows(QModelIndex(), self._row_count, end - 1)
+            self._row_count = end
+            self.endInsertRows()
+        elif len(data) < self.page_size and end < self._row_count:
+            # 后端的列表变短了：这一页之后的行都已不存在
+            self.beginRemoveRows(QModelIndex(), end, self._row_count - 1)
+            self._drop_pages_from(page + 1)
+            self._row_count = end
+            self.endRemoveRows()
+        if len(data) < self.page_size:
+            self._exhausted = True
+        elif end >= self._row_count:
+            self._exhausted = False
+        if end > start:
+            self.dataChanged.emit(self.index(start, 0), self.index(end - 1, len(self.columns) - 1))
+
+    def _install(self, page: int, rows: list):
+        old = self._pages.pop(page, None)
+        for entry in old or ():
+            self._where.pop(entry[0]['id'], None)
+        self._pages[page] = rows
+        self._where.update((entry[0]['id'], (page, offset)) for offset, entry in enumerate(rows))
+        while len(self._pages) > self.max_pages:
+            _, evicted = self._pages.popitem(last=False)
+            for entry in evicted:
+                self._where.pop(entry[0]['id'], None)
+
+    def _drop_pages_from(self, first_page: int):
+        for page in [page for page in self._pages if page >= first_page]:
+            for entry in self._pages.pop(page):
+                self._where.pop(entry[0]['id'], None)
+
+    # --- 行访问 ---
+
+    def _entry(self, row: int):
+        page, offset = divmod(row, self.page_size)
+        rows = self._pages.get(page)
+        if rows is None or offset >= len(rows):
+            return None
+        return rows[offset]
+
+    def row_id(self, row: int):
+        entry = self._entry(row)
+        return entry[0]['id'] if entry else None
+
+    def find_row(self, entity_id) -> int:
+        location = self._where.get(entity_id)
+        return -1 if location is None else location[0] * self.page_size + location[1]
+
+    def row_data(self, row: int) -> dict:
+        """返回某一行对应的原始记录，所在的页未加载时返回空字典"""
+        entry = self._entry(row)
+        return entry[0] if entry else {}
+
+    def row_texts(self, row: int) -> dict:
+        """返回某一行记录的文字形式（id 保持为整数），供编辑对话框使用"""
+        record = self.row_data(row)
+        texts = {key: display_text(value) for key, value in record.items()}
+        texts['id'] = record.get('id')
+        return texts
+
+    def checkout(self, row: int) -> dict:
+        """
+        编辑、删除前调用：把这一行的记录放入实体仓库（仓库中还没有时），
+        使 begin_change 的乐观更新和回滚照常工作，并通过仓库的变化通知更新本行。
+        """
+        record = self.row_data(row)
+        if record and not self.store.contains(self.kind, record['id']):
+            self.store.upsert(self.kind, record)
+        return record
+
+    # --- Qt 模型接口 ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, SORT_ROLE):
+            return None
+        page = index.row() // self.page_size
+        entry = self._entry(index.row())
+        if entry is None:
+            # 所在的页已被淘汰（或尚未返回）：请求这一页，先显示占位文字
+            self._want(page)
+            return self.PLACEHOLDER if role == Qt.ItemDataRole.DisplayRole and index.column() == 0 else None
+        self._pages.move_to_end(page)
+        return entry[1 if role == Qt.ItemDataRole.DisplayRole else 2][index.column()]
+
+    # --- 仓库变化 ---
+
+    def _on_store_changed(self, kind: str, ids):
+        if kind != self.kind or not self._where:
+            return
+        # 整批刷新时仓库中没有的记录只是没有被缓存，不代表已被删除
+        batch = ids is None
+        for entity_id in (list(self._where) if batch else ids):
+            location = self._where.get(entity_id)
+            if location is None:
+                continue
+            page, offset = location
+            row = page * self.page_size + offset
+            record = self.store.get(self.kind, entity_id)
+            if record is None:
+                if not batch:
+                    self._remove_row(page, row)
+                continue
+            merged = {**self._pages[page][offset][0], **record}
+            self._pages[page][offset] = (merged, *format_record(merged, self.columns))
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def _remove_row(self, page: int, row: int):
+        """记录已被删除：去掉这一行，之后各页的位置都前移了一行，丢弃后随显示重新请求"""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._drop_pages_from(page)
+        self._row_count -= 1
+        self.endRemoveRows()
+
+
+class IdFilterProxyModel(QSortFilterProxyModel):
+    """
+    按 id 集合过滤 EntityTableModel 的代理模型，用于搜索结果的显示。
+    只保存允许显示的 id，不复制任何行数据。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._allowed_ids = None
+
+    def set_allowed_ids(self, ids):
+        """ids 为 None 时显示全部行"""
+        self._allowed_ids = ids
+        self.invalidateFilter()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """排序交给源模型（按预先算好的名次排序），代理本身保持源模型的顺序"""
+        self.sourceModel().sort(column, order)
+
+    def source_row(self, proxy_row: int) -> int:
+        return self.mapToSource(self.index(proxy_row, 0)).row()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._allowed_ids is None:
+            return True
+        return self.sourceModel().row_id(source_row) in self._allowed_ids
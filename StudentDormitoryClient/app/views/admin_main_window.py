@@ -1,12 +1,14 @@
 # StudentDormitoryClient/app/views/admin_main_window.py
 
+from collections import deque
+
 from PyQt6.QtWidgets import QMainWindow, QStatusBar, QApplication, QWidget, QHBoxLayout, QListWidget, QStackedWidget, \
     QListWidgetItem, QMessageBox
 from PyQt6.QtGui import QAction, QIcon
 from PyQt6.QtCore import QSize, QThread
 
 from ..api_client import ApiClient
-from ..workers import ApiWorker
+from ..workers import ApiWorker, transform_of, error_handler_of
 
 from .student_view_widget import StudentViewWidget
 from .teacher_view_widget import TeacherViewWidget
@@ -15,6 +17,12 @@ from .dorm_manager_view_widget import DormManagerViewWidget
 from .dorm_building_view_widget import DormBuildingViewWidget
 from .dorm_room_view_widget import DormRoomViewWidget
 from .dorm_allocation_widget import DormAllocationWidget
+from .occupancy_analytics_widget import OccupancyAnalyticsWidget
+from .integrity_audit_widget import IntegrityAuditWidget
+from .idle_prefetcher import IdlePrefetcher
+from .refresh_scheduler import RefreshScheduler
+from .offline_sync import OfflineSync
+from .connection_status_dialog import ConnectionStatusDialog
 
 
 class AdminMainWindow(QMainWindow):
@@ -26,12 +34,21 @@ class AdminMainWindow(QMainWindow):
         self.thread = None
         self.worker = None
         self.is_busy = False
+        # 乐观更新不会等待提交结果，忙碌时到达的请求排队依次执行，而不是被丢弃
+        self.pending_tasks = deque()
 
         self.setWindowTitle(f"管理员后台 - 欢迎您, {self.user_info.get('username')}")
         self.setGeometry(100, 100, 1280, 800)
 
         self._init_ui()
         self._create_menus()
+        # 空闲时为尚未打开的模块预先加载数据
+        widgets = [self.stacked_widget.widget(i) for i in range(self.stacked_widget.count())]
+        self.prefetcher = IdlePrefetcher(self.api_client, widgets, can_run=lambda: not self.is_busy, parent=self)
+        # 定时重新验证当前可见模块的数据
+        self.refresh_scheduler = RefreshScheduler(self, self.stacked_widget.currentWidget, can_run=lambda: not self.is_busy)
+        # 离线期间的修改在连接恢复后自动同步，同步后刷新当前模块
+        self.offline_sync = OfflineSync(self, self.api_client, on_replayed=self.refresh_scheduler.refresh_now)
 
         if self.stacked_widget.count() > 0:
             self.handle_tab_change(0)
@@ -58,27 +75,42 @@ class AdminMainWindow(QMainWindow):
         main_layout.addWidget(self.stacked_widget)
 
         self.add_module("宿舍分配管理", "assets/icons/users.svg", DormAllocationWidget)
-        self.add_module("学生信息管理", "assets/icons/user.svg", StudentViewWidget)
+        # 学生和房间的数量可能很大，列表按需分页加载
+        self.add_module("学生信息管理", "assets/icons/user.svg", StudentViewWidget, paged=True)
         self.add_module("教师信息管理", "assets/icons/briefcase.svg", TeacherViewWidget)
         self.add_module("辅导员信息管理", "assets/icons/smile.svg", CounselorViewWidget)
         self.add_module("宿管信息管理", "assets/icons/key.svg", DormManagerViewWidget)
         self.add_module("宿舍楼信息管理", "assets/icons/home.svg", DormBuildingViewWidget)
-        self.add_module("宿舍房间管理", "assets/icons/grid.svg", DormRoomViewWidget)
+        self.add_module("宿舍房间管理", "assets/icons/grid.svg", DormRoomViewWidget, paged=True)
+        self.add_module("入住统计", "assets/icons/bar-chart-2.svg", OccupancyAnalyticsWidget)
+        self.add_module("数据核查", "assets/icons/check-square.svg", IntegrityAuditWidget)
 
         self.nav_list.currentRowChanged.connect(self.handle_tab_change)
 
     def handle_tab_change(self, index):
         self.stacked_widget.setCurrentIndex(index)
         current_widget = self.stacked_widget.widget(index)
-        if current_widget and hasattr(current_widget, 'initial_data_loaded') and not current_widget.initial_data_loaded:
+        if current_widget is None:
+            return
+        self.prefetcher.note_activity()
+        self.prefetcher.record_visit(current_widget)
+        if self.prefetcher.owns(current_widget):
+            # 模块正在后台预取：未开始的请求改为正常执行，已在途的请求等待其结果即可
+            in_flight = self.prefetcher.is_in_flight(current_widget)
+            parked = self.prefetcher.release(current_widget)
+            for task in parked:
+                self.handle_task_request(*task)
+            if parked or in_flight or current_widget.initial_data_loaded:
+                return
+        if hasattr(current_widget, 'initial_data_loaded') and not current_widget.initial_data_loaded:
             if hasattr(current_widget, 'load_data'):
                 current_widget.load_data()
             elif hasattr(current_widget, 'refresh_all_data'):
                 current_widget.refresh_all_data()
 
-    def add_module(self, name, icon_path, widget_class):
+    def add_module(self, name, icon_path, widget_class, **options):
         permissions = {'can_add': True, 'can_edit': True, 'can_delete': True}
-        module_widget = widget_class(self.api_client, permissions, self)
+        module_widget = widget_class(self.api_client, permissions, self, **options)
 
         if hasattr(module_widget, 'task_requested'):
             module_widget.task_requested.connect(self.handle_task_request)
@@ -95,8 +127,15 @@ class AdminMainWindow(QMainWindow):
         self.nav_list.addItem(item)
 
     def handle_task_request(self, func_name, on_finished_slot, args):
+        sender = self.sender()
+        if sender is not self.stacked_widget.currentWidget() and self.prefetcher.owns(sender):
+            # 后台预取中的模块发出的请求（包括加载后的后续请求）走预取通道
+            self.prefetcher.submit(sender, func_name, on_finished_slot, args)
+            return
+        if sender is self.stacked_widget.currentWidget():
+            self.prefetcher.note_activity()
         if self.is_busy:
-            QMessageBox.warning(self, "请稍候", "另一个后台操作正在进行中。")
+            self.pending_tasks.append((func_name, on_finished_slot, args))
             return
         self.is_busy = True
         current_widget = self.stacked_widget.currentWidget()
@@ -104,13 +143,17 @@ class AdminMainWindow(QMainWindow):
             current_widget.set_buttons_enabled(False)
         self.statusBar().showMessage(f"正在执行: {func_name}...", 0)
         self.thread = QThread()
-        self.worker = ApiWorker(self.api_client, func_name, *args)
+        self.worker = ApiWorker(self.api_client, func_name, *args, transform=transform_of(on_finished_slot))
         self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(on_finished_slot)
+        if error_handler_of(on_finished_slot) is not None:
+            self.worker.error.connect(error_handler_of(on_finished_slot))
         if hasattr(current_widget, 'on_task_error'):
             self.worker.error.connect(current_widget.on_task_error)
         self.thread.finished.connect(self.on_task_finished)
         self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
         self.thread.start()
 
     def on_task_finished(self):
@@ -119,6 +162,9 @@ class AdminMainWindow(QMainWindow):
         self.worker = None
         self.thread = None
         self.is_busy = False
+        if self.pending_tasks:
+            self.handle_task_request(*self.pending_tasks.popleft())
+            return
         current_widget = self.stacked_widget.currentWidget()
         if hasattr(current_widget, 'set_buttons_enabled'):
             current_widget.set_buttons_enabled(True)
@@ -134,6 +180,11 @@ class AdminMainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        tools_menu = menu_bar.addMenu("工具")
+        status_action = QAction("连接状态", self)
+        status_action.triggered.connect(lambda: ConnectionStatusDialog(self.api_client, self).exec())
+        tools_menu.addAction(status_action)
+
         # 【核心修改】保留菜单占位符，但暂时不添加任何功能
         account_menu = menu_bar.addMenu("账户")
         # personal_info_action = QAction("个人信息中心", self)
@@ -144,8 +195,15 @@ class AdminMainWindow(QMainWindow):
         self.close()
 
     def closeEvent(self, event):
-        if self.is_busy:
+        widgets = [self.stacked_widget.widget(i) for i in range(self.stacked_widget.count())]
+        if self.is_busy or any(hasattr(w, 'has_pending_work') and w.has_pending_work() for w in widgets):
             QMessageBox.warning(self, "操作正在进行", "有后台任务正在运行，请等待其完成后再关闭。")
             event.ignore()
         else:
+            self.prefetcher.shutdown()
+            self.refresh_scheduler.stop()
+            self.offline_sync.stop()
+            for widget in widgets:
+                if hasattr(widget, 'shutdown'):
+                    widget.shutdown()
             event.accept()
\ No newline at end of file
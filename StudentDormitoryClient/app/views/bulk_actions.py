@@ -0,0 +1,205 @@
+# StudentDormitoryClient/app/views/bulk_actions.py
+
+from functools import partial
+
+from PyQt6.QtWidgets import QDialog, QMessageBox, QFormLayout, QComboBox, QPushButton, QHBoxLayout, QVBoxLayout, \
+    QAbstractItemView
+from PyQt6.QtCore import QObject
+from ..workers import with_error_handler
+
+
+class BulkEditDialog(QDialog):
+    """选择一个字段并输入新值，应用到所有选中的记录"""
+
+    def __init__(self, fields: list, count: int, parent=None):
+        """
+        Args:
+            fields (list): [(标签, 字段名[, int 或 可选值列表]), ...]；int 表示数值字段，列表表示只能从中选择。
+            count (int): 选中的记录数，显示在标题中。
+        """
+        super().__init__(parent)
+        self.fields = fields
+        self.payload = None
+        self.setWindowTitle(f"批量修改（{count} 条记录）")
+        layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+        self.field_selector = QComboBox()
+        self.field_selector.addItems([spec[0] for spec in fields])
+        self.value_edit = QComboBox()
+        form_layout.addRow("修改字段:", self.field_selector)
+        form_layout.addRow("新的值:", self.value_edit)
+        layout.addLayout(form_layout)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.save_button = QPushButton("保存")
+        self.cancel_button = QPushButton("取消")
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+        self.field_selector.currentIndexChanged.connect(self.on_field_changed)
+        self.save_button.clicked.connect(self.handle_save)
+        self.cancel_button.clicked.connect(self.reject)
+        self.on_field_changed(0)
+
+    def _kind(self, index: int):
+        spec = self.fields[index]
+        return spec[2] if len(spec) > 2 else str
+
+    def on_field_changed(self, index: int):
+        kind = self._kind(index)
+        self.value_edit.clear()
+        # 有可选值的字段只能从中选择，其它字段直接输入
+        self.value_edit.setEditable(not isinstance(kind, list))
+        if isinstance(kind, list):
+            self.value_edit.addItems(kind)
+
+    def handle_save(self):
+        index = self.field_selector.currentIndex()
+        label, key, kind = self.fields[index][0], self.fields[index][1], self._kind(index)
+        text = self.value_edit.currentText().strip()
+        if not text:
+            QMessageBox.warning(self, "输入错误", f"{label}不能为空！")
+            return
+        if kind is int and not text.isdigit():
+            QMessageBox.warning(self, "输入错误", f"{label}必须是一个数字！")
+            return
+        self.payload = {key: int(text) if kind is int else text}
+        self.accept()
+
+
+class BulkActions(QObject):
+    """
+    列表视图共用的批量删除、批量修改控制器。
+
+    表格改为可以多选；对选中的记录只确认一次，然后按 CHUNK_SIZE 分块，
+    每块作为一个 bulk_delete / bulk_update 任务依次经过所属视图的任务队列提交（块内的并发由 ApiClient 控制），
+    进度通过 status_message_signal 显示。各块的结果先汇总，全部完成后对实体仓库只做一次修改，
+    表格和各个索引只收到一次变化通知；失败的记录保持原样，在结束时统一列出。
+    某一块的任务执行出错（ApiWorker.error）时，该块的记录全部记为失败，其余的块照常提交。
+    """
+    CHUNK_SIZE = 100
+
+    def __init__(self, owner, api_client, kind: str, table_view, noun: str, describe, edit_fields: list = None):
+        """
+        Args:
+            owner (QWidget): 所属视图，需要提供 task_requested 和 status_message_signal。
+            kind (str): 实体类型，例如 'students'。
+            table_view (QTableView): 显示列表的表格，模型可以是 EntityTableModel、PagedTableModel 或 IdFilterProxyModel。
+            noun (str): 确认和提示中使用的名称，例如 "学生"。
+            describe (callable): record -> 在确认和失败列表中显示的文字。
+            edit_fields (list): 允许批量修改的字段，格式见 BulkEditDialog。
+        """
+        super().__init__(owner)
+        self.owner = owner
+        self.api_client = api_client
+        self.kind = kind
+        self.table_view = table_view
+        self.noun = noun
+        self.describe = describe
+        self.edit_fields = edit_fields or []
+        self.job = None
+        table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+
+    def is_running(self) -> bool:
+        return self.job is not None
+
+    def selected(self) -> list:
+        """返回选中行的 [(id, 记录)]，按行号排列；分页表格中尚未加载的行被跳过"""
+        view_model = self.table_view.model()
+        rows = sorted(index.row() for index in self.table_view.selectionModel().selectedRows())
+        model = view_model
+        if hasattr(view_model, 'source_row'):
+            model = view_model.sourceModel()
+            rows = [view_model.source_row(row) for row in rows]
+        items = []
+        for row in rows:
+            entity_id = model.row_id(row)
+            if entity_id is not None:
+                items.append((entity_id, model.row_data(row)))
+        return items
+
+    def _preview(self, items: list) -> str:
+        names = [self.describe(record) for _, record in items[:5]]
+        more = f" 等 {len(items)} 个{self.noun}" if len(items) > len(names) else ""
+        return "、".join(names) + more
+
+    def delete(self, items: list):
+        if not items:
+            return QMessageBox.warning(self.owner, "提示", f"请先选择要删除的{self.noun}！")
+        if self._busy():
+            return
+        reply = QMessageBox.question(self.owner, "确认批量删除",
+                                     f"确定要删除选中的 {len(items)} 个{self.noun}吗？\n{self._preview(items)}")
+        if reply == QMessageBox.StandardButton.Yes:
+            self._start('bulk_delete', "删除", items, ())
+
+    def edit(self, items: list = None):
+        if self._busy():
+            return
+        items = self.selected() if items is None else items
+        if not items:
+            return QMessageBox.warning(self.owner, "提示", f"请先选择要修改的{self.noun}！")
+        dialog = BulkEditDialog(self.edit_fields, len(items), self.owner)
+        if dialog.exec():
+            self._start('bulk_update', "修改", items, (dialog.payload,))
+
+    def _busy(self) -> bool:
+        if self.is_running():
+            QMessageBox.information(self.owner, "提示", "上一次批量操作还没有完成，请稍候。")
+        return self.is_running()
+
+    def _start(self, method: str, verb: str, items: list, extra_args: tuple):
+        if not items:
+            return
+        store = self.api_client.store
+        # 分页表格的记录不在仓库中，先一次性放入，结束时的仓库修改才能反映到这些行上
+        missing = [record for entity_id, record in items if record and not store.contains(self.kind, entity_id)]
+        if missing:
+            store.merge_fields(self.kind, missing)
+        ids = [entity_id for entity_id, _ in items]
+        self.job = {'method': method, 'verb': verb, 'args': extra_args, 'records': dict(items),
+                    'chunks': [ids[start:start + self.CHUNK_SIZE] for start in range(0, len(ids), self.CHUNK_SIZE)],
+                    'total': len(ids), 'done': 0, 'succeeded': [], 'failed': []}
+        self._submit_next()
+
+    def _submit_next(self):
+        job = self.job
+        chunk = job['chunks'].pop(0)
+        on_finished = with_error_handler(partial(self._on_chunk_finished, chunk),
+                                         partial(self._on_chunk_finished, chunk, False))
+        self.owner.task_requested.emit(job['method'], on_finished, (self.kind, chunk, *job['args']))
+        self.owner.status_message_signal.emit(f"正在批量{job['verb']}{self.noun}... {job['done']} / {job['total']}", 0)
+
+    def _on_chunk_finished(self, chunk: list, is_success: bool, data: object):
+        job = self.job
+        if is_success:
+            for result in data:
+                if result['success']:
+                    job['succeeded'].append(result['id'])
+                else:
+                    job['failed'].append((result['id'], result['error']))
+        else:
+            job['failed'].extend((entity_id, data) for entity_id in chunk)
+        job['done'] += len(chunk)
+        if job['chunks']:
+            self._submit_next()
+        else:
+            self._finish()
+
+    def _finish(self):
+        job, self.job = self.job, None
+        store = self.api_client.store
+        if job['method'] == 'bulk_delete':
+            store.remove_many(self.kind, job['succeeded'])
+        else:
+            store.update_many(self.kind, job['succeeded'], job['args'][0])
+        self.owner.status_message_signal.emit(
+            f"批量{job['verb']}完成：成功 {len(job['succeeded'])}，失败 {len(job['failed'])}。", 5000)
+        if job['failed']:
+            lines = [f"{self.describe(job['records'].get(entity_id) or {})} (ID {entity_id}): {error}"
+                     for entity_id, error in job['failed']]
+            box = QMessageBox(QMessageBox.Icon.Warning, f"部分{job['verb']}失败",
+                              f"有 {len(lines)} 个{self.noun}未能{job['verb']}，这些记录保持原样。", parent=self.owner)
+            box.setDetailedText("\n".join(lines))
+            box.show()
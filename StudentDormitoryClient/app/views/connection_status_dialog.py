@@ -0,0 +1,51 @@
+# StudentDormitoryClient/app/views/connection_status_dialog.py
+
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QLabel
+from PyQt6.QtCore import QTimer
+
+
+class ConnectionStatusDialog(QDialog):
+    """显示各接口的延迟、当前超时期限和熔断器状态，每秒刷新一次"""
+
+    STATE_NAMES = {'closed': '正常', 'open': '熔断', 'half_open': '恢复检测中'}
+    HEADERS = ['接口', '状态', '请求数', '失败数', 'p50 (ms)', 'p95 (ms)', '超时 (s)']
+
+    def __init__(self, api_client, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.setWindowTitle("连接状态")
+        self.resize(820, 420)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    @staticmethod
+    def _ms(seconds) -> str:
+        return '' if seconds is None else f"{seconds * 1000:.0f}"
+
+    def refresh(self):
+        rows = self.api_client.metrics()
+        outbox = self.api_client.outbox
+        status = "离线" if outbox.offline else "在线"
+        self.summary_label.setText(f"连接：{status}　待同步的修改：{len(outbox)}")
+        self.table.setRowCount(len(rows))
+        for row, item in enumerate(rows):
+            state = self.STATE_NAMES.get(item['state'], item['state'])
+            if item['state'] == 'open':
+                state += f"（{item['retry_in']:.0f} 秒后重试）"
+            timeout = '默认' if item['timeout'] is None else f"{item['timeout']:.1f}"
+            values = [item['endpoint'], state, str(item['requests']), str(item['failures']),
+                      self._ms(item['p50']), self._ms(item['p95']), timeout]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
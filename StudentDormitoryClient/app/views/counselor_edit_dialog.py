@@ -6,6 +6,7 @@ import random
 import string
 
 from ..api_client import ApiClient
+from ..table_models import changed_fields
 
 class CounselorEditDialog(QDialog):
     def __init__(self, api_client: ApiClient, counselor_data: dict = None, parent=None):
@@ -88,7 +89,12 @@ class CounselorEditDialog(QDialog):
             return
 
         if self.is_edit_mode:
-            result = self.api_client.update_counselor(self.data['id'], payload)
+            # 只提交改动的字段；没有改动时不提交
+            changes = changed_fields(self.data, payload)
+            if not changes:
+                self.accept()
+                return
+            result = self.api_client.update_counselor(self.data['id'], changes)
         else:
             payload['username'] = self.username_edit.text().strip()
             payload['password'] = self.password_edit.text()
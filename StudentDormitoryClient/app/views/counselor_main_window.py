@@ -1,12 +1,17 @@
 # StudentDorymitoryClient/app/views/counselor_main_window.py
 
+from collections import deque
+
 from PyQt6.QtWidgets import QMainWindow, QTabWidget, QStatusBar, QApplication, QWidget, QLabel, QVBoxLayout, QMessageBox
 from PyQt6.QtGui import QAction
 from PyQt6.QtCore import QThread, QTimer
 
 from ..api_client import ApiClient
-from ..workers import ApiWorker
+from ..workers import ApiWorker, transform_of, error_handler_of
+from ..scoped_client import ScopedApiClient
 from .student_view_widget import StudentViewWidget
+from .refresh_scheduler import RefreshScheduler
+from .offline_sync import OfflineSync
 
 
 class CounselorMainWindow(QMainWindow):
@@ -18,6 +23,7 @@ class CounselorMainWindow(QMainWindow):
         self.thread = None
         self.worker = None
         self.is_busy = False
+        self.pending_tasks = deque()
         self.profile_data = None
 
         self.setWindowTitle(f"辅导员工作台 - 欢迎您, {self.user_info.get('username')}")
@@ -28,6 +34,10 @@ class CounselorMainWindow(QMainWindow):
         self.setStatusBar(QStatusBar(self))
 
         self._create_menus()
+        # 定时重新验证当前标签页的数据
+        self.refresh_scheduler = RefreshScheduler(self, self.tab_widget.currentWidget, can_run=lambda: not self.is_busy)
+        # 离线期间的修改在连接恢复后自动同步，同步后刷新当前模块
+        self.offline_sync = OfflineSync(self, self.api_client, on_replayed=self.refresh_scheduler.refresh_now)
         QTimer.singleShot(50, self.load_profile)
 
     def _create_menus(self):
@@ -62,12 +72,15 @@ class CounselorMainWindow(QMainWindow):
         department = self.profile_data.get('department')
 
         if department:
-            filtered_api_client = self.api_client
-            filtered_api_client.get_all_students = lambda: self.api_client.get_students_by_department(department)
+            # 名册查询限定在本院系范围内，并在后台提前加载
+            scoped_client = ScopedApiClient.for_department(self.api_client, department)
+            scoped_client.prefetch(fields=[key for _, key in StudentViewWidget.COLUMNS])
 
-            self.student_view = StudentViewWidget(filtered_api_client, counselor_permissions)
+            self.student_view = StudentViewWidget(scoped_client, counselor_permissions, self)
+            self.student_view.task_requested.connect(self.handle_task_request)
             self.student_view.status_message_signal.connect(self.statusBar().showMessage)
             self.tab_widget.addTab(self.student_view, f"{department} - 学生信息管理")
+            self.student_view.load_data()
         else:
             no_dept_widget = QWidget()
             layout = QVBoxLayout(no_dept_widget)
@@ -75,17 +88,33 @@ class CounselorMainWindow(QMainWindow):
             self.tab_widget.addTab(no_dept_widget, "学生信息管理")
             return
 
-    def start_api_task(self, func_name, on_finished_slot, *args):
+    def handle_task_request(self, func_name, on_finished_slot, args, client=None):
+        """
+        子组件发出的任务请求；有任务正在执行时排队，等它结束后依次执行。
+        请求在发出它的组件自己的客户端上执行（学生名册使用限定作用域的 ScopedApiClient）。
+        """
+        if client is None:
+            client = getattr(self.sender(), 'api_client', self.api_client)
+        if self.is_busy:
+            self.pending_tasks.append((func_name, on_finished_slot, args, client))
+            return
+        self.start_api_task(func_name, on_finished_slot, *args, client=client)
+
+    def start_api_task(self, func_name, on_finished_slot, *args, client=None):
         if self.is_busy: return
         self.is_busy = True
         self.statusBar().showMessage(f"正在执行: {func_name}...", 0)
         self.thread = QThread()
-        self.worker = ApiWorker(self.api_client, func_name, *args)
+        self.worker = ApiWorker(client or self.api_client, func_name, *args, transform=transform_of(on_finished_slot))
         self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(on_finished_slot)
+        if error_handler_of(on_finished_slot) is not None:
+            self.worker.error.connect(error_handler_of(on_finished_slot))
         self.worker.error.connect(lambda msg: QMessageBox.critical(self, "后台错误", msg))
         self.thread.finished.connect(self.on_task_finished)
         self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
         self.thread.start()
 
     def on_task_finished(self):
@@ -94,10 +123,15 @@ class CounselorMainWindow(QMainWindow):
         self.worker = None
         self.thread = None
         self.is_busy = False
+        if self.pending_tasks:
+            self.handle_task_request(*self.pending_tasks.popleft())
 
     def closeEvent(self, event):
-        if self.thread is not None and self.thread.isRunning():
+        student_view = getattr(self, 'student_view', None)
+        if (self.thread is not None and self.thread.isRunning()) or (student_view and student_view.has_pending_work()):
             QMessageBox.warning(self, "操作正在进行", "有后台任务正在运行，请等待其完成后再关闭。")
             event.ignore()
         else:
+            self.refresh_scheduler.stop()
+            self.offline_sync.stop()
             event.accept()
\ No newline at end of file
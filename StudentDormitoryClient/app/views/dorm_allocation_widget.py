@@ -1,18 +1,37 @@
 # StudentDorymitoryClient/app/views/dorm_allocation_widget.py
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView, QComboBox, QLabel, QSplitter
+from functools import partial
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView, QComboBox, QLabel, QSplitter, QCheckBox
 from PyQt6.QtCore import pyqtSignal, Qt, QTimer
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtGui import QShortcut, QKeySequence
+from ..room_index import RoomRecommender, free_beds, room_accepts
+from ..table_models import EntityTableModel, enable_sorting
+from ..workers import AllocationPipeline, with_transform
+from .load_progress_label import LoadProgressLabel
 
 class DormAllocationWidget(QWidget):
     task_requested = pyqtSignal(str, object, tuple)
     status_message_signal = pyqtSignal(str, int)
+    # 楼栋下拉框的第一项：不限楼栋，按选中学生的性别、班级和院系推荐全校有空床位的房间
+    RECOMMEND_ITEM = "推荐房间（全部楼栋）"
+    RECOMMEND_LIMIT = 200
 
     def __init__(self, api_client, permissions: dict, parent=None):
         super().__init__(parent)
         self.api_client = api_client
         self.permissions = permissions
         self.initial_data_loaded = False
+
+        # 快速分配模式：请求以流水线方式提交，只在结束后汇总失败项
+        self.allocation_pipeline = AllocationPipeline(self.api_client, parent=self)
+        self.pending_allocations = {}  # 学生id -> OptimisticChange
+        self.failed_allocations = []  # [(学生id, 房间id, 错误信息)]
+        self.rapid_stats = {'submitted': 0, 'succeeded': 0, 'failed': 0}
+        self.recommender = RoomRecommender(self.api_client.store, self)
+        self.all_rooms_loaded = False
+        self.recommend_student = None  # 推荐房间时当前选中的学生记录
+
         self._init_ui()
         self._setup_connections()
 
@@ -23,26 +42,41 @@ class DormAllocationWidget(QWidget):
         left_layout = QVBoxLayout(left_widget)
         left_layout.addWidget(QLabel("<h3>未分配宿舍学生</h3>"))
         self.students_table = QTableView()
-        self.students_model = QStandardItemModel()
+        student_columns = [('ID', 'id'), ('姓名', 'name'), ('性别', 'gender'), ('院系', 'department'), ('班级', 'class_name')]
+        # 学生一旦在任何地方被分配了宿舍，就会自动从“未分配”列表中移除
+        self.students_model = EntityTableModel(self.api_client.store, 'students', student_columns,
+                                               accepts=lambda student: not student.get('dormitory_room'), parent=self)
         self.students_table.setModel(self.students_model)
-        self.students_model.setHorizontalHeaderLabels(['ID', '姓名', '性别', '院系', '班级'])
+        enable_sorting(self.students_table)
         left_layout.addWidget(self.students_table)
+        left_layout.addWidget(LoadProgressLabel(self.students_model, self))
         right_widget = QWidget()
         right_layout = QVBoxLayout(right_widget)
         building_layout = QHBoxLayout()
         building_layout.addWidget(QLabel("选择楼栋:"))
         self.building_selector = QComboBox()
         building_layout.addWidget(self.building_selector)
+        self.free_beds_label = QLabel("", self)
+        building_layout.addWidget(self.free_beds_label)
+        building_layout.addStretch()
         right_layout.addLayout(building_layout)
         self.rooms_table = QTableView(self)
-        self.rooms_model = QStandardItemModel()
+        room_columns = [('ID', 'id'), ('楼栋', 'building_name'), ('房间号', 'room_number'), ('容量', 'capacity'),
+                        ('已住/容量', lambda room: f"{room.get('current_occupancy', 0)} / {room.get('capacity', 0)}"),
+                        ('空床位', free_beds), ('性别类型', 'gender_type'), ('同班/同院系', self._affinity_text)]
+        self.rooms_model = EntityTableModel(self.api_client.store, 'rooms', room_columns,
+                                            accepts=self._room_in_view, parent=self)
         self.rooms_table.setModel(self.rooms_model)
-        self.rooms_model.setHorizontalHeaderLabels(['ID', '房间号', '容量', '已住/容量', '性别类型'])
+        enable_sorting(self.rooms_table)
         right_layout.addWidget(self.rooms_table)
         splitter.addWidget(left_widget)
         splitter.addWidget(right_widget)
         splitter.setSizes([400, 600])
         bottom_layout = QHBoxLayout()
+        self.rapid_mode_checkbox = QCheckBox("快速分配模式（回车分配，可多选学生）", self)
+        self.progress_label = QLabel("", self)
+        bottom_layout.addWidget(self.rapid_mode_checkbox)
+        bottom_layout.addWidget(self.progress_label)
         bottom_layout.addStretch()
         self.allocate_button = QPushButton("执行分配", self)
         self.refresh_button = QPushButton("全部刷新", self)
@@ -57,10 +91,32 @@ class DormAllocationWidget(QWidget):
             table.setSelectionBehavior(table.SelectionBehavior.SelectRows)
             table.setSelectionMode(table.SelectionMode.SingleSelection)
 
+    def _room_in_view(self, room: dict) -> bool:
+        if self.is_recommending():
+            # 房间住满或不再适合当前学生时自动从推荐列表中移除
+            return self.recommend_student is not None and room_accepts(room, self.recommend_student.get('gender'))
+        return room.get('building_name') == self.building_selector.currentText()
+
+    def _affinity_text(self, room: dict) -> str:
+        if self.recommend_student is None or not self.is_recommending():
+            return ''
+        classmates, peers = self.recommender.affinity(self.recommend_student, room)
+        return f"{classmates} / {peers}" if classmates or peers else ''
+
+    def is_recommending(self) -> bool:
+        return self.building_selector.currentText() == self.RECOMMEND_ITEM
+
     def _setup_connections(self):
-        self.building_selector.currentTextChanged.connect(self.load_rooms)
+        self.building_selector.currentTextChanged.connect(self.on_building_changed)
+        self.students_table.selectionModel().selectionChanged.connect(self.on_student_selection_changed)
         self.refresh_button.clicked.connect(self.refresh_all_data)
         self.allocate_button.clicked.connect(self.handle_allocation)
+        self.rapid_mode_checkbox.toggled.connect(self.on_rapid_mode_toggled)
+        self.allocation_pipeline.item_finished.connect(self.on_pipeline_item_finished)
+        for key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            shortcut = QShortcut(QKeySequence(key), self)
+            shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(self.handle_allocation)
 
     def load_data(self):
         self.refresh_all_data()
@@ -80,6 +136,7 @@ class DormAllocationWidget(QWidget):
             current_selection = self.building_selector.currentText()
             self.building_selector.blockSignals(True)
             self.building_selector.clear()
+            self.building_selector.addItem(self.RECOMMEND_ITEM)
             for building in data: self.building_selector.addItem(building['building_name'])
             index = self.building_selector.findText(current_selection)
             if index != -1: self.building_selector.setCurrentIndex(index)
@@ -89,54 +146,186 @@ class DormAllocationWidget(QWidget):
             self.on_task_error(f"无法加载楼栋列表: {data}")
 
     def load_unallocated_students(self):
-        self.task_requested.emit('get_unallocated_students', self.on_students_loaded, tuple())
+        # dormitory_room 用于判断学生是否仍属于“未分配”列表
+        fields = ['name', 'gender', 'department', 'class_name', 'dormitory_building', 'dormitory_room']
+        self.task_requested.emit('query_students', with_transform(self.on_students_loaded, self.students_model.make_buffer),
+                                 ({'allocated': False}, fields))
 
     def on_students_loaded(self, is_success: bool, data: object):
         if is_success:
-            self.students_model.removeRows(0, self.students_model.rowCount())
-            for item in data:
-                row = [QStandardItem(str(item.get(k, ''))) for k in ['id', 'name', 'gender', 'department', 'class_name']]
-                self.students_model.appendRow(row)
+            self.students_model.set_rows(data)
             if not self.initial_data_loaded:
                 self.initial_data_loaded = True
                 QTimer.singleShot(0, self.load_rooms)
         else:
             self.on_task_error(f"无法加载学生列表: {data}")
 
+    def on_building_changed(self):
+        # 全校房间只需加载一次，之后的分配在本地更新空床位索引，手动刷新时再重新加载
+        if self.is_recommending() and self.all_rooms_loaded:
+            self.show_recommendations()
+        else:
+            self.load_rooms()
+
     def load_rooms(self):
         building_name = self.building_selector.currentText()
         if not building_name: return
-        self.task_requested.emit('get_rooms', self.on_rooms_loaded, (building_name,))
+        fields = ['room_number', 'building_name', 'capacity', 'current_occupancy', 'gender_type']
+        if self.is_recommending():
+            # 已分配学生的班级、院系用于统计各房间的住宿构成
+            student_fields = ['gender', 'department', 'class_name', 'dormitory_building', 'dormitory_room']
+            self.task_requested.emit('query_students', self.on_allocated_students_loaded, ({'allocated': True}, student_fields))
+            return self.task_requested.emit('query_rooms', self.on_all_rooms_loaded, (None, fields))
+        self.free_beds_label.clear()
+        self.recommend_student = None
+        self.task_requested.emit('query_rooms', with_transform(self.on_rooms_loaded, self.rooms_model.make_buffer),
+                                 ({'building': building_name}, fields))
 
     def on_rooms_loaded(self, is_success: bool, data: object):
         if is_success:
-            self.rooms_model.removeRows(0, self.rooms_model.rowCount())
-            for item in data:
-                occupancy_str = f"{item.get('current_occupancy', 0)} / {item.get('capacity', 0)}"
-                row = [QStandardItem(str(item.get('id'))), QStandardItem(item.get('room_number')), QStandardItem(str(item.get('capacity'))), QStandardItem(occupancy_str), QStandardItem(item.get('gender_type'))]
-                self.rooms_model.appendRow(row)
+            self.rooms_model.set_rows(data)
         else:
             self.on_task_error(f"无法加载房间列表: {data}")
 
+    def on_all_rooms_loaded(self, is_success: bool, data: object):
+        if is_success:
+            self.all_rooms_loaded = True
+            if self.is_recommending():
+                self.show_recommendations()
+        else:
+            self.on_task_error(f"无法加载房间列表: {data}")
+
+    def on_allocated_students_loaded(self, is_success: bool, data: object):
+        if not is_success:
+            self.status_message_signal.emit(f"无法加载已分配学生，推荐时不考虑同班、同院系: {data}", 5000)
+        elif self.all_rooms_loaded and self.is_recommending():
+            self.show_recommendations()
+
+    def on_student_selection_changed(self, *args):
+        if self.is_recommending():
+            self.show_recommendations()
+
+    def show_recommendations(self):
+        """为选中的（第一名）学生推荐全校可入住的房间（见 RoomRecommender），按推荐顺序显示"""
+        student_selection = self.students_table.selectionModel().selectedRows()
+        if not student_selection:
+            self.recommend_student = None
+            self.rooms_model.clear()
+            self.free_beds_label.setText("选择学生后显示可入住的房间")
+            return
+        student = self.students_model.row_data(min(index.row() for index in student_selection))
+        if student is not self.recommend_student:
+            # “同班/同院系”一列随学生变化，先清空表格，丢弃按上一名学生格式化的文字
+            self.rooms_model.clear()
+        self.recommend_student = student
+        room_ids = self.recommender.recommend(student, limit=self.RECOMMEND_LIMIT)
+        self.rooms_model.set_rows(self.api_client.store.get_many('rooms', room_ids))
+        free_count = self.recommender.availability.free_bed_count(student.get('gender'))
+        self.free_beds_label.setText(f"可住空床位 {free_count} 个")
+
     def handle_allocation(self):
+        if self.rapid_mode_checkbox.isChecked():
+            return self.enqueue_selected_allocations()
         student_selection = self.students_table.selectionModel().selectedRows()
         room_selection = self.rooms_table.selectionModel().selectedRows()
         if not student_selection or not room_selection: return QMessageBox.warning(self, "提示", "请同时选择一名学生和一个房间。")
-        student_id = int(self.students_model.item(student_selection[0].row(), 0).text())
-        student_name = self.students_model.item(student_selection[0].row(), 1).text()
-        room_id = int(self.rooms_model.item(room_selection[0].row(), 0).text())
-        room_number = self.rooms_model.item(room_selection[0].row(), 1).text()
-        reply = QMessageBox.question(self, "确认分配", f"确定要将 **{student_name}** 分配到 **{self.building_selector.currentText()}-{room_number}** 房间吗？")
+        student_id = self.students_model.row_id(student_selection[0].row())
+        student_name = self.students_model.row_data(student_selection[0].row()).get('name', '')
+        room_id = self.rooms_model.row_id(room_selection[0].row())
+        room = self.rooms_model.row_data(room_selection[0].row())
+        reply = QMessageBox.question(self, "确认分配", f"确定要将 **{student_name}** 分配到 **{room.get('building_name', '')}-{room.get('room_number', '')}** 房间吗？")
         if reply == QMessageBox.StandardButton.Yes:
-            self.task_requested.emit('allocate_dorm', self.on_allocation_finished, (student_id, room_id))
+            # 学生立即从未分配列表中移除、房间人数立即加一，后台提交失败时回滚
+            change = self.api_client.apply_allocation_locally(student_id, room_id)
+            self.task_requested.emit('allocate_dorm', partial(self.on_allocation_finished, change), (student_id, room_id))
 
-    def on_allocation_finished(self, is_success: bool, data: object):
+    def on_allocation_finished(self, change, is_success: bool, data: object):
         if is_success:
-            QMessageBox.information(self, "成功", data.get("message", "分配成功！"))
-            QTimer.singleShot(0, self.refresh_all_data)
+            self.status_message_signal.emit(data.get("message", "分配成功！"), 3000)
         else:
+            change.rollback()
             self.on_task_error(f"分配失败: {data}")
 
+    def on_rapid_mode_toggled(self, enabled: bool):
+        mode = self.students_table.SelectionMode.ExtendedSelection if enabled else self.students_table.SelectionMode.SingleSelection
+        self.students_table.setSelectionMode(mode)
+        if enabled:
+            self.rapid_stats = {'submitted': 0, 'succeeded': 0, 'failed': 0}
+            self._update_progress_label()
+            self.students_table.setFocus()
+        elif not self.pending_allocations:
+            self.progress_label.clear()
+
+    def enqueue_selected_allocations(self):
+        """
+        把选中的学生（可多选）依次分配到选中的房间，不弹确认框。
+        每个分配先在本地生效（学生移出列表、房间人数加一），请求交给流水线在后台提交。
+        """
+        student_rows = sorted(index.row() for index in self.students_table.selectionModel().selectedRows())
+        room_selection = self.rooms_table.selectionModel().selectedRows()
+        if not student_rows or not room_selection:
+            self.status_message_signal.emit("请先选择学生和房间。", 3000)
+            return
+        room_id = self.rooms_model.row_id(room_selection[0].row())
+        student_ids = [self.students_model.row_id(row) for row in student_rows]
+        store = self.api_client.store
+
+        for student_id in student_ids:
+            room = store.get('rooms', room_id) or {}
+            if (room.get('current_occupancy') or 0) >= (room.get('capacity') or 0):
+                self.status_message_signal.emit(f"房间 {room.get('room_number', '')} 已住满。", 3000)
+                break
+            student = store.get('students', student_id) or {}
+            if room.get('gender_type') and student.get('gender') and room['gender_type'] != student['gender']:
+                self.status_message_signal.emit(f"{student.get('name', '')} 与房间性别类型不符，已跳过。", 3000)
+                continue
+            self.pending_allocations[student_id] = self.api_client.apply_allocation_locally(student_id, room_id)
+            self.allocation_pipeline.submit(student_id, room_id)
+            self.rapid_stats['submitted'] += 1
+
+        # 已分配的学生已经从表格移除，自动选中原位置的下一名学生以便连续操作
+        if self.students_model.rowCount():
+            self.students_table.selectRow(min(student_rows[0], self.students_model.rowCount() - 1))
+        self._update_progress_label()
+
+    def on_pipeline_item_finished(self, student_id: int, room_id: int, is_success: bool, data: object):
+        change = self.pending_allocations.pop(student_id, None)
+        if is_success:
+            self.rapid_stats['succeeded'] += 1
+        else:
+            self.rapid_stats['failed'] += 1
+            if change:
+                change.rollback()
+            self.failed_allocations.append((student_id, room_id, data))
+        self._update_progress_label()
+        if not self.pending_allocations and self.failed_allocations:
+            self._report_failed_allocations()
+
+    def _update_progress_label(self):
+        stats = self.rapid_stats
+        self.progress_label.setText(f"已提交 {stats['submitted']}，成功 {stats['succeeded']}，"
+                                    f"失败 {stats['failed']}，处理中 {len(self.pending_allocations)}")
+
+    def _report_failed_allocations(self):
+        store = self.api_client.store
+        lines = []
+        for student_id, room_id, error in self.failed_allocations:
+            student = store.get('students', student_id) or {}
+            room = store.get('rooms', room_id) or {}
+            lines.append(f"{student.get('name', student_id)} -> {room.get('building_name', '')}-{room.get('room_number', room_id)}: {error}")
+        self.failed_allocations = []
+        box = QMessageBox(QMessageBox.Icon.Warning, "部分分配失败",
+                          f"有 {len(lines)} 个分配未能完成，相关学生已恢复到未分配列表。", parent=self)
+        box.setDetailedText("\n".join(lines))
+        box.show()
+
+    def has_pending_work(self) -> bool:
+        return bool(self.pending_allocations)
+
+    def shutdown(self):
+        """主窗口关闭时调用，停止分配流水线的线程池"""
+        self.allocation_pipeline.shutdown()
+
     def set_buttons_enabled(self, enabled: bool):
         self.allocate_button.setEnabled(enabled)
         self.refresh_button.setEnabled(enabled)
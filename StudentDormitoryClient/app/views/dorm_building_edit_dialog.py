@@ -1,6 +1,7 @@
 # StudentDormitoryClient/app/views/dorm_building_edit_dialog.py
 
 from PyQt6.QtWidgets import QDialog, QMessageBox, QFormLayout, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout
+from ..table_models import changed_fields
 
 class DormBuildingEditDialog(QDialog):
     def __init__(self, api_client, building_data: dict = None, parent=None):
@@ -62,7 +63,12 @@ class DormBuildingEditDialog(QDialog):
             payload["available_rooms"] = int(self.available_rooms_edit.text().strip())
 
         if self.is_edit_mode:
-            result = self.api_client.update_building(self.data['id'], payload)
+            # 只提交改动的字段；没有改动时不提交
+            changes = changed_fields(self.data, payload)
+            if not changes:
+                self.accept()
+                return
+            result = self.api_client.update_building(self.data['id'], changes)
         else:
             result = self.api_client.add_building(payload)
 
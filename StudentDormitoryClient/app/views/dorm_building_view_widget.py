@@ -1,9 +1,13 @@
 # StudentDorymitoryClient/app/views/dorm_building_view_widget.py
 
+from functools import partial
+
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView
-from PyQt6.QtCore import pyqtSignal, QTimer
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import pyqtSignal
+from ..table_models import EntityTableModel, enable_sorting
+from ..workers import with_transform
 from .dorm_building_edit_dialog import DormBuildingEditDialog
+from .bulk_actions import BulkActions
 
 class DormBuildingViewWidget(QWidget):
     task_requested = pyqtSignal(str, object, tuple)
@@ -30,10 +34,13 @@ class DormBuildingViewWidget(QWidget):
         button_layout.addWidget(self.delete_button)
         button_layout.addStretch()
         self.table_view = QTableView(self)
-        self.model = QStandardItemModel()
+        columns = [('ID', 'id'), ('楼栋名称', 'building_name'), ('总房间数', 'total_rooms'), ('可用房间数', 'available_rooms')]
+        self.model = EntityTableModel(self.api_client.store, 'buildings', columns, accepts=lambda row: True, parent=self)
         self.table_view.setModel(self.model)
-        self.model.setHorizontalHeaderLabels(['ID', '楼栋名称', '总房间数', '可用房间数'])
+        enable_sorting(self.table_view)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.bulk = BulkActions(self, self.api_client, 'buildings', self.table_view, "楼栋",
+                                lambda building: building.get('building_name', ''))
         main_layout.addLayout(button_layout)
         main_layout.addWidget(self.table_view)
         self.add_button.setVisible(self.permissions.get('can_add', False))
@@ -47,48 +54,52 @@ class DormBuildingViewWidget(QWidget):
         self.delete_button.clicked.connect(self.handle_delete)
 
     def load_data(self):
-        self.task_requested.emit('get_buildings', self.on_load_finished, tuple())
+        self.task_requested.emit('get_buildings', with_transform(self.on_load_finished, self.model.make_buffer), tuple())
 
     def on_load_finished(self, is_success: bool, data: object):
         if is_success:
             self.initial_data_loaded = True
-            self.model.removeRows(0, self.model.rowCount())
-            for item in data:
-                row = [QStandardItem(str(item.get(k, ''))) for k in ['id', 'building_name', 'total_rooms', 'available_rooms']]
-                self.model.appendRow(row)
+            self.model.set_rows(data)
             self.status_message_signal.emit(f"宿舍楼数据加载成功！共 {len(data)} 条记录。", 5000)
         else:
             self.on_task_error(f"无法加载宿舍楼列表: {data}")
 
     def open_add_dialog(self):
         dialog = DormBuildingEditDialog(self.api_client, parent=self)
-        if dialog.exec(): self.load_data()
+        dialog.exec()
 
     def open_edit_dialog(self):
         selected_indexes = self.table_view.selectionModel().selectedRows()
         if not selected_indexes: return QMessageBox.warning(self, "提示", "请先选择要修改的楼栋！")
-        selected_row = selected_indexes[0].row()
-        data = { 'id': int(self.model.item(selected_row, 0).text()), 'building_name': self.model.item(selected_row, 1).text(), 'total_rooms': self.model.item(selected_row, 2).text(), 'available_rooms': self.model.item(selected_row, 3).text() }
+        data = self.model.row_texts(selected_indexes[0].row())
         dialog = DormBuildingEditDialog(self.api_client, data, self)
-        if dialog.exec(): self.load_data()
+        dialog.exec()
 
     def handle_delete(self):
         selected_indexes = self.table_view.selectionModel().selectedRows()
         if not selected_indexes: return QMessageBox.warning(self, "提示", "请先选择要删除的楼栋！")
+        # 分页表格中尚未加载的行不计入 bulk.selected()
+        selected = self.bulk.selected()
+        if len(selected) > 1: return self.bulk.delete(selected)
         selected_row = selected_indexes[0].row()
-        name = self.model.item(selected_row, 1).text()
-        obj_id = int(self.model.item(selected_row, 0).text())
+        name = self.model.row_data(selected_row).get('building_name', '')
+        obj_id = self.model.row_id(selected_row)
         reply = QMessageBox.question(self, "确认删除", f"确定要删除 **{name}** 吗？")
         if reply == QMessageBox.StandardButton.Yes:
-            self.task_requested.emit('delete_building', self.on_delete_finished, (obj_id,))
+            change = self.api_client.store.begin_change()
+            change.remove('buildings', obj_id)
+            self.task_requested.emit('delete_building', partial(self.on_delete_finished, change), (obj_id,))
 
-    def on_delete_finished(self, is_success: bool, data: object):
+    def on_delete_finished(self, change, is_success: bool, data: object):
         if is_success:
-            self.status_message_signal.emit("删除成功！正在刷新列表...", 3000)
-            QTimer.singleShot(0, self.load_data)
+            self.status_message_signal.emit("删除成功！", 3000)
         else:
+            change.rollback()
             self.on_task_error(f"删除失败: {data}")
 
+    def has_pending_work(self) -> bool:
+        return self.bulk.is_running()
+
     def set_buttons_enabled(self, enabled: bool):
         self.refresh_button.setEnabled(enabled)
         if self.permissions.get('can_add', False): self.add_button.setEnabled(enabled)
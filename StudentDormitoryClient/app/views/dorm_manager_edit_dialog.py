@@ -5,6 +5,7 @@ import random
 import string
 
 from ..api_client import ApiClient
+from ..table_models import changed_fields
 
 class DormManagerEditDialog(QDialog):
     def __init__(self, api_client: ApiClient, manager_data: dict = None, parent=None):
@@ -83,7 +84,12 @@ class DormManagerEditDialog(QDialog):
             return
 
         if self.is_edit_mode:
-            result = self.api_client.update_dorm_manager(self.data['id'], payload)
+            # 只提交改动的字段；没有改动时不提交
+            changes = changed_fields(self.data, payload)
+            if not changes:
+                self.accept()
+                return
+            result = self.api_client.update_dorm_manager(self.data['id'], changes)
         else:
             payload['username'] = self.username_edit.text().strip()
             payload['password'] = self.password_edit.text()
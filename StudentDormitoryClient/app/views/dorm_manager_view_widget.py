@@ -1,9 +1,13 @@
 # StudentDorymitoryClient/app/views/dorm_manager_view_widget.py
 
+from functools import partial
+
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView
-from PyQt6.QtCore import pyqtSignal, QTimer
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import pyqtSignal
+from ..table_models import EntityTableModel, enable_sorting
+from ..workers import with_transform
 from .dorm_manager_edit_dialog import DormManagerEditDialog
+from .bulk_actions import BulkActions
 
 class DormManagerViewWidget(QWidget):
     task_requested = pyqtSignal(str, object, tuple)
@@ -23,21 +27,28 @@ class DormManagerViewWidget(QWidget):
         self.refresh_button = QPushButton("刷新列表", self)
         self.add_button = QPushButton("添加宿管", self)
         self.edit_button = QPushButton("修改信息", self)
+        self.bulk_edit_button = QPushButton("批量修改", self)
         self.delete_button = QPushButton("删除宿管", self)
         button_layout.addWidget(self.refresh_button)
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.edit_button)
+        button_layout.addWidget(self.bulk_edit_button)
         button_layout.addWidget(self.delete_button)
         button_layout.addStretch()
         self.table_view = QTableView(self)
-        self.model = QStandardItemModel()
+        columns = [('ID', 'id'), ('姓名', 'name'), ('工号', 'manager_id'), ('负责楼栋', 'managed_building'),
+                   ('联系方式', 'phone')]
+        self.model = EntityTableModel(self.api_client.store, 'dorm_managers', columns, accepts=lambda row: True, parent=self)
         self.table_view.setModel(self.model)
-        self.model.setHorizontalHeaderLabels(['ID', '姓名', '工号', '负责楼栋', '联系方式'])
+        enable_sorting(self.table_view)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.bulk = BulkActions(self, self.api_client, 'dorm_managers', self.table_view, "宿管", lambda row: row.get('name', ''),
+                                edit_fields=[("负责楼栋", 'managed_building')])
         main_layout.addLayout(button_layout)
         main_layout.addWidget(self.table_view)
         self.add_button.setVisible(self.permissions.get('can_add', False))
         self.edit_button.setVisible(self.permissions.get('can_edit', False))
+        self.bulk_edit_button.setVisible(self.permissions.get('can_edit', False))
         self.delete_button.setVisible(self.permissions.get('can_delete', False))
 
     def _setup_connections(self):
@@ -45,54 +56,61 @@ class DormManagerViewWidget(QWidget):
         self.add_button.clicked.connect(self.open_add_dialog)
         self.edit_button.clicked.connect(self.open_edit_dialog)
         self.delete_button.clicked.connect(self.handle_delete)
+        self.bulk_edit_button.clicked.connect(lambda: self.bulk.edit())
 
     def load_data(self):
-        self.task_requested.emit('get_dorm_managers', self.on_load_finished, tuple())
+        self.task_requested.emit('get_dorm_managers', with_transform(self.on_load_finished, self.model.make_buffer), tuple())
 
     def on_load_finished(self, is_success: bool, data: object):
         if is_success:
             self.initial_data_loaded = True
-            self.model.removeRows(0, self.model.rowCount())
-            for item in data:
-                row = [QStandardItem(str(item.get(k, ''))) for k in ['id', 'name', 'manager_id', 'managed_building', 'phone']]
-                self.model.appendRow(row)
+            self.model.set_rows(data)
             self.status_message_signal.emit(f"宿管数据加载成功！共 {len(data)} 条记录。", 5000)
         else:
             self.on_task_error(f"无法加载宿管列表: {data}")
 
     def open_add_dialog(self):
         dialog = DormManagerEditDialog(self.api_client, parent=self)
-        if dialog.exec(): self.load_data()
+        dialog.exec()
 
     def open_edit_dialog(self):
         selected_indexes = self.table_view.selectionModel().selectedRows()
         if not selected_indexes: return QMessageBox.warning(self, "提示", "请先选择要修改的宿管！")
-        selected_row = selected_indexes[0].row()
-        data = { 'id': int(self.model.item(selected_row, 0).text()), 'name': self.model.item(selected_row, 1).text(), 'manager_id': self.model.item(selected_row, 2).text(), 'managed_building': self.model.item(selected_row, 3).text(), 'phone': self.model.item(selected_row, 4).text() }
+        data = self.model.row_texts(selected_indexes[0].row())
         dialog = DormManagerEditDialog(self.api_client, data, self)
-        if dialog.exec(): self.load_data()
+        dialog.exec()
 
     def handle_delete(self):
         selected_indexes = self.table_view.selectionModel().selectedRows()
         if not selected_indexes: return QMessageBox.warning(self, "提示", "请先选择要删除的宿管！")
+        # 分页表格中尚未加载的行不计入 bulk.selected()
+        selected = self.bulk.selected()
+        if len(selected) > 1: return self.bulk.delete(selected)
         selected_row = selected_indexes[0].row()
-        name = self.model.item(selected_row, 1).text()
-        obj_id = int(self.model.item(selected_row, 0).text())
+        name = self.model.row_data(selected_row).get('name', '')
+        obj_id = self.model.row_id(selected_row)
         reply = QMessageBox.question(self, "确认删除", f"确定要删除宿管 **{name}** 吗？")
         if reply == QMessageBox.StandardButton.Yes:
-            self.task_requested.emit('delete_dorm_manager', self.on_delete_finished, (obj_id,))
+            change = self.api_client.store.begin_change()
+            change.remove('dorm_managers', obj_id)
+            self.task_requested.emit('delete_dorm_manager', partial(self.on_delete_finished, change), (obj_id,))
 
-    def on_delete_finished(self, is_success: bool, data: object):
+    def on_delete_finished(self, change, is_success: bool, data: object):
         if is_success:
-            self.status_message_signal.emit("删除成功！正在刷新列表...", 3000)
-            QTimer.singleShot(0, self.load_data)
+            self.status_message_signal.emit("删除成功！", 3000)
         else:
+            change.rollback()
             self.on_task_error(f"删除失败: {data}")
 
+    def has_pending_work(self) -> bool:
+        return self.bulk.is_running()
+
     def set_buttons_enabled(self, enabled: bool):
         self.refresh_button.setEnabled(enabled)
         if self.permissions.get('can_add', False): self.add_button.setEnabled(enabled)
-        if self.permissions.get('can_edit', False): self.edit_button.setEnabled(enabled)
+        if self.permissions.get('can_edit', False):
+            self.edit_button.setEnabled(enabled)
+            self.bulk_edit_button.setEnabled(enabled)
         if self.permissions.get('can_delete', False): self.delete_button.setEnabled(enabled)
 
     def on_task_error(self, error_msg: str):
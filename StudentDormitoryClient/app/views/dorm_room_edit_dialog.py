@@ -2,13 +2,17 @@
 
 from PyQt6.QtWidgets import QDialog, QMessageBox, QFormLayout, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout, QComboBox
 from ..api_client import ApiClient
+from ..table_models import changed_fields
 
 class DormRoomEditDialog(QDialog):
-    def __init__(self, api_client: ApiClient, room_data: dict = None, parent=None):
+    def __init__(self, api_client: ApiClient, room_data: dict = None, parent=None, commit: bool = True):
         super().__init__(parent)
         self.api_client = api_client
         self.data = room_data
         self.is_edit_mode = room_data is not None
+        # commit 为 False 时，编辑模式只负责收集表单，由调用方在后台提交并做乐观更新
+        self.commit = commit
+        self.payload = None
 
         self.all_buildings = [] # 用于存储所有楼栋名称
 
@@ -90,7 +94,13 @@ class DormRoomEditDialog(QDialog):
         }
 
         if self.is_edit_mode:
-            result = self.api_client.update_room(self.data['id'], payload)
+            # 只提交改动的字段；没有改动时不提交
+            changes = changed_fields(self.data, payload)
+            if not self.commit or not changes:
+                self.payload = changes
+                self.accept()
+                return
+            result = self.api_client.update_room(self.data['id'], changes)
         else:
             result = self.api_client.add_room(payload)
 
@@ -1,18 +1,29 @@
 # StudentDorymitoryClient/app/views/dorm_room_view_widget.py
 
+from functools import partial
+
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView, QComboBox, QLabel
-from PyQt6.QtCore import pyqtSignal, QTimer
-from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import pyqtSignal
+from ..table_models import EntityTableModel, PagedTableModel, enable_sorting
+from ..workers import with_transform
+from .load_progress_label import LoadProgressLabel
 from .dorm_room_edit_dialog import DormRoomEditDialog
+from .list_exporter import ListExporter
+from .bulk_actions import BulkActions
 
 class DormRoomViewWidget(QWidget):
     task_requested = pyqtSignal(str, object, tuple)
     status_message_signal = pyqtSignal(str, int)
 
-    def __init__(self, api_client, permissions: dict, parent=None):
+    def __init__(self, api_client, permissions: dict, parent=None, paged: bool = False):
+        """
+        Args:
+            paged (bool): 为 True 时房间列表按需分页加载（见 PagedTableModel），内存中只保留最近显示过的若干页。
+        """
         super().__init__(parent)
         self.api_client = api_client
         self.permissions = permissions
+        self.paged = paged
         self.initial_data_loaded = False
         self._init_ui()
         self._setup_connections()
@@ -27,22 +38,46 @@ class DormRoomViewWidget(QWidget):
         self.add_button = QPushButton("添加新房间", self)
         self.edit_button = QPushButton("修改房间信息", self)
         self.delete_button = QPushButton("删除房间", self)
+        self.bulk_edit_button = QPushButton("批量修改", self)
+        self.export_button = QPushButton("导出", self)
         top_layout.addWidget(self.add_button)
         top_layout.addWidget(self.edit_button)
+        top_layout.addWidget(self.bulk_edit_button)
         top_layout.addWidget(self.delete_button)
+        top_layout.addWidget(self.export_button)
         self.table_view = QTableView(self)
-        self.model = QStandardItemModel()
+        columns = [('ID', 'id'), ('房间号', 'room_number'), ('所属楼栋', 'building_name'), ('容量', 'capacity'),
+                   ('已住人数', 'current_occupancy'), ('性别类型', 'gender_type')]
+        if self.paged:
+            self.model = PagedTableModel(self.api_client.store, 'rooms', columns, parent=self)
+        else:
+            self.model = EntityTableModel(self.api_client.store, 'rooms', columns, accepts=self._room_in_view, parent=self)
+            top_layout.insertWidget(3, LoadProgressLabel(self.model, self))
         self.table_view.setModel(self.model)
-        self.model.setHorizontalHeaderLabels(['ID', '房间号', '所属楼栋', '容量', '已住人数', '性别类型'])
+        enable_sorting(self.table_view)
+        self.exporter = ListExporter(self, self.api_client, 'rooms/', columns, "房间列表")
+        self.bulk = BulkActions(self, self.api_client, 'rooms', self.table_view, "房间",
+                                lambda room: f"{room.get('building_name', '')}-{room.get('room_number', '')}",
+                                edit_fields=[("容量", 'capacity', int), ("性别类型", 'gender_type', ["男", "女"])])
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         main_layout.addLayout(top_layout)
         main_layout.addWidget(self.table_view)
 
+    def _room_in_view(self, room: dict) -> bool:
+        """新增或修改后的房间是否属于当前筛选的楼栋"""
+        building_name = self.building_selector.currentText()
+        return building_name == "所有楼栋" or room.get('building_name') == building_name
+
     def _setup_connections(self):
         self.building_selector.currentTextChanged.connect(self.on_building_selected)
         self.add_button.clicked.connect(self.open_add_dialog)
         self.edit_button.clicked.connect(self.open_edit_dialog)
         self.delete_button.clicked.connect(self.handle_delete)
+        self.bulk_edit_button.clicked.connect(lambda: self.bulk.edit())
+        self.export_button.clicked.connect(self.handle_export)
+        if self.paged:
+            self.model.page_requested.connect(lambda slot, args: self.task_requested.emit('fetch_page', slot, args))
+            self.model.load_failed.connect(lambda error: self.on_task_error(f"无法加载房间列表: {error}"))
 
     def load_data(self):
         self.task_requested.emit('get_buildings', self.on_buildings_loaded, tuple())
@@ -64,50 +99,92 @@ class DormRoomViewWidget(QWidget):
 
     def on_building_selected(self, building_name):
         if not building_name: return
-        param = (building_name,) if building_name != "所有楼栋" else tuple()
-        self.task_requested.emit('get_rooms', self.on_rooms_loaded, param)
+        filters = {'building': building_name} if building_name != "所有楼栋" else {}
+        if self.paged:
+            self.model.reset(filters)
+            return
+        fields = [key for _, key in self.model.columns]
+        self.task_requested.emit('query_rooms', with_transform(self.on_rooms_loaded, self.model.make_buffer), (filters, fields))
+
+    def refresh_data(self):
+        """重新加载楼栋列表和当前筛选的房间"""
+        self.load_data()
+        if self.paged:
+            # 保留滚动位置，只重新请求正在显示的页
+            self.model.reload()
+        else:
+            self.on_building_selected(self.building_selector.currentText())
 
     def on_rooms_loaded(self, is_success: bool, data: object):
         if is_success:
-            self.model.removeRows(0, self.model.rowCount())
-            for item in data:
-                row = [QStandardItem(str(item.get(k, ''))) for k in ['id', 'room_number', 'building_name', 'capacity', 'current_occupancy', 'gender_type']]
-                self.model.appendRow(row)
+            self.model.set_rows(data)
         else:
             self.on_task_error(f"无法加载房间列表: {data}")
 
     def open_add_dialog(self):
         dialog = DormRoomEditDialog(self.api_client, parent=self)
-        if dialog.exec(): self.on_building_selected(self.building_selector.currentText())
+        if dialog.exec() and self.paged:
+            # 分页表格只更新已加载的行，新增的记录需要重新加载才能出现
+            self.model.reset(self.model.filters)
 
     def open_edit_dialog(self):
         selected_indexes = self.table_view.selectionModel().selectedRows()
         if not selected_indexes: return QMessageBox.warning(self, "提示", "请先选择要修改的房间！")
-        selected_row = selected_indexes[0].row()
-        data = { 'id': int(self.model.item(selected_row, 0).text()), 'room_number': self.model.item(selected_row, 1).text(), 'building_name': self.model.item(selected_row, 2).text(), 'capacity': self.model.item(selected_row, 3).text(), 'gender_type': self.model.item(selected_row, 5).text() }
-        dialog = DormRoomEditDialog(self.api_client, data, self)
-        if dialog.exec(): self.on_building_selected(self.building_selector.currentText())
+        if self.model.row_id(selected_indexes[0].row()) is None: return
+        self.model.checkout(selected_indexes[0].row())
+        data = self.model.row_texts(selected_indexes[0].row())
+        dialog = DormRoomEditDialog(self.api_client, data, self, commit=False)
+        # 没有改动任何字段时 payload 为空，不提交
+        if dialog.exec() and dialog.payload:
+            change = self.api_client.store.begin_change()
+            change.update_fields('rooms', data['id'], dialog.payload)
+            self.task_requested.emit('update_room', partial(self.on_update_finished, change),
+                                     (data['id'], dialog.payload))
+
+    def on_update_finished(self, change, is_success: bool, data: object):
+        if is_success:
+            self.status_message_signal.emit("房间信息已保存。", 3000)
+        else:
+            change.rollback()
+            self.on_task_error(f"保存失败，已恢复原数据: {data}")
 
     def handle_delete(self):
         selected_indexes = self.table_view.selectionModel().selectedRows()
         if not selected_indexes: return QMessageBox.warning(self, "提示", "请先选择要删除的房间！")
+        # 分页表格中尚未加载的行不计入 bulk.selected()
+        selected = self.bulk.selected()
+        if len(selected) > 1: return self.bulk.delete(selected)
         selected_row = selected_indexes[0].row()
-        building = self.model.item(selected_row, 2).text()
-        room_num = self.model.item(selected_row, 1).text()
-        obj_id = int(self.model.item(selected_row, 0).text())
+        if self.model.row_id(selected_row) is None: return
+        room = self.model.checkout(selected_row)
+        building = room.get('building_name', '')
+        room_num = room.get('room_number', '')
+        obj_id = self.model.row_id(selected_row)
         reply = QMessageBox.question(self, "确认删除", f"确定要删除 **{building}-{room_num}** 吗？")
         if reply == QMessageBox.StandardButton.Yes:
-            self.task_requested.emit('delete_room', self.on_delete_finished, (obj_id,))
+            change = self.api_client.store.begin_change()
+            change.remove('rooms', obj_id)
+            self.task_requested.emit('delete_room', partial(self.on_delete_finished, change), (obj_id,))
 
-    def on_delete_finished(self, is_success: bool, data: object):
+    def on_delete_finished(self, change, is_success: bool, data: object):
         if is_success:
-            QTimer.singleShot(0, lambda: self.on_building_selected(self.building_selector.currentText()))
+            self.status_message_signal.emit("删除成功！", 3000)
         else:
+            change.rollback()
             self.on_task_error(f"删除失败: {data}")
 
+    def handle_export(self):
+        building_name = self.building_selector.currentText()
+        params = {'building': building_name} if building_name and building_name != "所有楼栋" else {}
+        self.exporter.start(params)
+
+    def has_pending_work(self) -> bool:
+        return self.exporter.is_running() or self.bulk.is_running()
+
     def set_buttons_enabled(self, enabled: bool):
         self.add_button.setEnabled(enabled)
         self.edit_button.setEnabled(enabled)
+        self.bulk_edit_button.setEnabled(enabled)
         self.delete_button.setEnabled(enabled)
 
     def on_task_error(self, error_msg: str):
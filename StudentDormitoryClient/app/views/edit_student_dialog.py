@@ -2,6 +2,7 @@
 
 from PyQt6.QtWidgets import QDialog, QMessageBox
 from ..api_client import ApiClient
+from ..table_models import changed_fields
 from .ui_edit_student_dialog import Ui_Dialog as Ui_EditStudentDialog
 
 
@@ -44,6 +45,11 @@ class EditStudentDialog(QDialog, Ui_EditStudentDialog):
             return
 
         student_id_to_update = self.student_data['id']
+        # 只提交改动的字段；没有改动时不提交
+        updated_data = changed_fields(self.student_data, updated_data)
+        if not updated_data:
+            self.accept()
+            return
 
         self.save_button.setEnabled(False)
         self.save_button.setText("保存中...")
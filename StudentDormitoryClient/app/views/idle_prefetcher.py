@@ -0,0 +1,181 @@
+# StudentDormitoryClient/app/views/idle_prefetcher.py
+
+from collections import deque
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QThread, QTimer, QSettings, QEvent
+
+from ..workers import ApiWorker, transform_of, error_handler_of
+
+
+class IdlePrefetcher(QObject):
+    """
+    管理员后台的空闲预取器。
+    用户一段时间没有操作、也没有前台任务时，按模块的打开次数（其次按导航顺序）
+    依次为尚未加载的模块预先加载数据，之后第一次打开这些模块就不必再等待网络。
+
+    - 预取请求在低优先级线程中执行，同一时间最多一个，两个请求之间至少间隔 interval_ms，
+      每个空闲期最多发出 budget 个请求；
+    - 任何用户操作（键盘、鼠标、滚轮输入，切换模块、发起任务）都会暂停尚未开始的预取，并重新开始计算空闲时间；
+      被暂停的请求在下一个空闲期继续，或在用户打开该模块时交还主窗口正常执行；
+    - 预取失败时静默放弃，本次登录不再预取该模块，模块被打开时照常加载。
+    """
+
+    ACTIVITY_EVENTS = (QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.MouseMove, QEvent.Type.Wheel)
+
+    def __init__(self, api_client, widgets: list, can_run, idle_ms: int = 3000, interval_ms: int = 500,
+                 budget: int = 6, parent=None):
+        """
+        Args:
+            widgets (list): 按导航顺序排列的模块。
+            can_run (callable): 返回 False 时（例如前台任务正在执行）暂不预取。
+        """
+        super().__init__(parent)
+        self.api_client = api_client
+        self.widgets = widgets
+        self.can_run = can_run
+        self.interval_ms = interval_ms
+        self.budget = budget
+        self._budget_left = budget
+        self._warming = set()  # 正在预取的模块
+        self._failed = set()  # 预取失败的模块
+        self._idle = False
+        self._queue = deque()  # (模块, 函数名, 回调, 参数)
+        self._current_widget = None  # 最近一次 submit 来自的模块
+        self.thread = None
+        self.worker = None
+        self.settings = QSettings("StudentDormitoryClient", "AdminNavigation")
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(idle_ms)
+        self.idle_timer.timeout.connect(self._on_idle)
+        self.idle_timer.start()
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        # 输入、滚动期间不开始预取
+        if event.type() in self.ACTIVITY_EVENTS:
+            self.note_activity()
+        return False
+
+    # --- 与主窗口的交互 ---
+
+    def note_activity(self):
+        """用户有操作：暂停尚未开始的预取，重新计时"""
+        self._idle = False
+        self._budget_left = self.budget
+        self.idle_timer.start()
+
+    def record_visit(self, widget):
+        """记录一次模块打开，用于决定预取顺序"""
+        key = f"visits/{type(widget).__name__}"
+        self.settings.setValue(key, int(self.settings.value(key, 0)) + 1)
+
+    def owns(self, widget) -> bool:
+        return widget in self._warming
+
+    def release(self, widget) -> list:
+        """
+        模块被用户打开：不再由预取器负责，返回它尚未开始的预取请求，由主窗口改为正常执行。
+        """
+        self._warming.discard(widget)
+        taken = [(func_name, slot, args) for owner, func_name, slot, args in self._queue if owner is widget]
+        self._queue = deque(item for item in self._queue if item[0] is not widget)
+        return taken
+
+    def is_in_flight(self, widget) -> bool:
+        return self.thread is not None and self._current_widget is widget
+
+    def submit(self, widget, func_name: str, on_finished_slot, args: tuple):
+        """接收预取中模块发出的请求（包括加载完成后的后续请求）"""
+        self._queue.append((widget, func_name, on_finished_slot, args))
+        self._run_next()
+
+    def shutdown(self):
+        QApplication.instance().removeEventFilter(self)
+        self.idle_timer.stop()
+        self._idle = False
+        self._queue.clear()
+        if self.thread is not None:
+            self.thread.quit()
+            self.thread.wait(self.api_client.timeout * 1000)
+
+    # --- 调度 ---
+
+    def _candidates(self):
+        def visits(widget):
+            return int(self.settings.value(f"visits/{type(widget).__name__}", 0))
+        pending = [w for w in self.widgets if not getattr(w, 'initial_data_loaded', True)
+                   and w not in self._warming and w not in self._failed]
+        # sorted 是稳定排序，打开次数相同的模块保持导航顺序
+        return sorted(pending, key=visits, reverse=True)
+
+    def _on_idle(self):
+        if not self.can_run():
+            self.idle_timer.start()
+            return
+        self._idle = True
+        if self.thread is not None:
+            return
+        if self._queue:
+            self._run_next()
+            return
+        if self._budget_left <= 0:
+            return
+        for widget in self._candidates():
+            if widget.isVisible():
+                continue
+            self._warming.add(widget)
+            load = getattr(widget, 'load_data', None) or getattr(widget, 'refresh_all_data')
+            load()  # 请求经主窗口转交给 submit
+            return
+
+    def _run_next(self):
+        if self.thread is not None or not self._queue or not self._idle:
+            return
+        if self._budget_left <= 0 or not self.can_run():
+            return
+        self._budget_left -= 1
+        widget, func_name, on_finished_slot, args = self._queue.popleft()
+        self._current_widget = widget
+        self.thread = QThread()
+        self.worker = ApiWorker(self.api_client, func_name, *args, transform=transform_of(on_finished_slot))
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(lambda is_success, data: self._on_finished(widget, on_finished_slot, is_success, data))
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(lambda msg: self._on_error(widget, msg))
+        if error_handler_of(on_finished_slot) is not None:
+            self.worker.error.connect(error_handler_of(on_finished_slot))
+        self.worker.error.connect(self.thread.quit)
+        self.thread.finished.connect(self._on_thread_finished)
+        self.thread.start(QThread.Priority.LowPriority)
+
+    def _on_finished(self, widget, on_finished_slot, is_success: bool, data: object):
+        if is_success or widget not in self._warming:
+            # 成功，或者模块已经被用户打开：照常交给模块处理
+            on_finished_slot(is_success, data)
+        else:
+            self._on_failed(widget)
+
+    def _on_error(self, widget, error_msg: str):
+        if widget not in self._warming and hasattr(widget, 'on_task_error'):
+            widget.on_task_error(error_msg)
+        else:
+            self._on_failed(widget)
+
+    def _on_failed(self, widget):
+        # 预取失败不打扰用户，模块被打开时会重新加载
+        self._warming.discard(widget)
+        self._failed.add(widget)
+        self._queue = deque(item for item in self._queue if item[0] is not widget)
+
+    def _on_thread_finished(self):
+        if self.worker: self.worker.deleteLater()
+        if self.thread: self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self._current_widget = None
+        if self._idle:
+            QTimer.singleShot(self.interval_ms, self._on_idle)
@@ -0,0 +1,106 @@
+# StudentDormitoryClient/app/views/integrity_audit_widget.py
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView, \
+    QLabel, QFileDialog
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from ..exporters import export_pages
+from ..integrity_audit import audit_records, summarize, ROOM_FIELDS, STUDENT_FIELDS, ISSUE_COLUMNS
+from ..table_models import enable_sorting
+from ..workers import with_transform
+
+
+class IntegrityAuditWidget(QWidget):
+    """
+    数据核查：核对房间人数、容量、性别与学生分配记录是否一致（见 integrity_audit.audit_records）。
+    核对需要取回全部学生和房间，只在点击按钮时执行，不参与空闲预取和定时刷新。
+    离线时列表来自本地缓存，核对照常进行，但结果明确标注为基于缓存数据。
+    """
+    task_requested = pyqtSignal(str, object, tuple)
+    status_message_signal = pyqtSignal(str, int)
+
+    def __init__(self, api_client, permissions: dict, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.permissions = permissions
+        self.issues = []
+        self.used_cache = False
+        self._init_ui()
+        self._setup_connections()
+
+    def _init_ui(self):
+        main_layout = QVBoxLayout(self)
+        button_layout = QHBoxLayout()
+        self.run_button = QPushButton("开始核对", self)
+        self.export_button = QPushButton("导出结果", self)
+        self.export_button.setEnabled(False)
+        self.summary_label = QLabel("核对房间人数、容量、性别与学生的分配记录是否一致。", self)
+        button_layout.addWidget(self.run_button)
+        button_layout.addWidget(self.export_button)
+        button_layout.addWidget(self.summary_label)
+        button_layout.addStretch()
+        self.model = QStandardItemModel(self)
+        self.model.setHorizontalHeaderLabels([header for header, _ in ISSUE_COLUMNS])
+        self.table_view = QTableView(self)
+        self.table_view.setModel(self.model)
+        enable_sorting(self.table_view)
+        self.table_view.setEditTriggers(self.table_view.EditTrigger.NoEditTriggers)
+        self.table_view.setSelectionBehavior(self.table_view.SelectionBehavior.SelectRows)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setStretchLastSection(True)
+        main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.table_view)
+
+    def _setup_connections(self):
+        self.run_button.clicked.connect(self.run_audit)
+        self.export_button.clicked.connect(self.export_issues)
+
+    def run_audit(self):
+        self.summary_label.setText("正在加载房间列表...")
+        self.task_requested.emit('query_rooms', self.on_rooms_loaded, (None, ROOM_FIELDS))
+
+    def on_rooms_loaded(self, is_success: bool, data: object):
+        if not is_success:
+            self.summary_label.clear()
+            return self.on_task_error(f"无法加载房间列表: {data}")
+        rooms = data
+        self.used_cache = self.api_client.outbox.offline
+        self.summary_label.setText("正在加载学生列表并核对...")
+        # 核对在后台线程中紧接着学生列表的请求执行
+        self.task_requested.emit('query_students',
+                                 with_transform(self.on_audit_finished, lambda students: audit_records(students, rooms)),
+                                 (None, STUDENT_FIELDS))
+
+    def on_audit_finished(self, is_success: bool, data: object):
+        if not is_success:
+            self.summary_label.clear()
+            return self.on_task_error(f"无法加载学生列表: {data}")
+        self.issues = data
+        self.model.removeRows(0, self.model.rowCount())
+        for issue in self.issues:
+            self.model.appendRow([QStandardItem(str(issue[key])) for _, key in ISSUE_COLUMNS])
+        self.export_button.setEnabled(bool(self.issues))
+        self.used_cache = self.used_cache or self.api_client.outbox.offline
+        summary = f"共发现 {len(self.issues)} 个问题：{summarize(self.issues)}"
+        if self.used_cache:
+            summary = f"【离线：基于本地缓存的数据，可能与后端不一致】{summary}"
+        self.summary_label.setText(summary)
+        self.status_message_signal.emit("数据核对完成（基于本地缓存）。" if self.used_cache else "数据核对完成。", 5000)
+
+    def export_issues(self):
+        default_name = "数据核对结果（离线缓存）.xlsx" if self.used_cache else "数据核对结果.xlsx"
+        path, _ = QFileDialog.getSaveFileName(self, "导出核对结果", default_name, "Excel 文件 (*.xlsx);;CSV 文件 (*.csv)")
+        if not path:
+            return
+        try:
+            export_pages(path, ISSUE_COLUMNS, [self.issues])
+        except OSError as err:
+            return self.on_task_error(f"导出失败: {err}")
+        self.status_message_signal.emit(f"已导出 {len(self.issues)} 个问题: {path}", 10000)
+
+    def set_buttons_enabled(self, enabled: bool):
+        self.run_button.setEnabled(enabled)
+
+    def on_task_error(self, error_msg: str):
+        QMessageBox.critical(self, "错误", error_msg)
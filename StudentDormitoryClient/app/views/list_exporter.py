@@ -0,0 +1,82 @@
+# StudentDormitoryClient/app/views/list_exporter.py
+
+from PyQt6.QtWidgets import QMessageBox, QFileDialog
+from PyQt6.QtCore import QObject, QThread
+
+from ..workers import ExportWorker
+
+
+class ListExporter(QObject):
+    """
+    列表视图共用的导出控制器。
+    选择保存位置后在独立线程中分页拉取并写入文件，进度通过所属视图的 status_message_signal 显示，
+    导出期间界面可以正常操作；同一时间只运行一个导出任务。
+    """
+
+    def __init__(self, owner, api_client, resource: str, columns: list, default_name: str):
+        """
+        Args:
+            owner (QWidget): 所属视图，需要提供 status_message_signal。
+            resource (str): 列表接口路径，例如 'students/'。
+            columns (list): [(表头, 字段名或 callable(row) -> 值), ...]
+            default_name (str): 保存对话框中默认的文件名（不含扩展名）。
+        """
+        super().__init__(owner)
+        self.owner = owner
+        self.api_client = api_client
+        self.resource = resource
+        self.columns = columns
+        self.default_name = default_name
+        self.thread = None
+        self.worker = None
+
+    def is_running(self) -> bool:
+        return self.thread is not None
+
+    def start(self, params: dict = None):
+        if self.is_running():
+            reply = QMessageBox.question(self.owner, "导出正在进行", "上一次导出还没有完成，是否中止它？")
+            if reply == QMessageBox.StandardButton.Yes:
+                self.worker.cancel()
+            return
+        path, _ = QFileDialog.getSaveFileName(self.owner, "导出列表", f"{self.default_name}.csv",
+                                              "CSV 文件 (*.csv);;Excel 文件 (*.xlsx)")
+        if not path:
+            return
+
+        query = dict(params or {})
+        fields = [key for _, key in self.columns if isinstance(key, str)]
+        if len(fields) == len(self.columns):
+            # 列全部直接对应字段时，只请求导出用到的字段
+            query['fields'] = ','.join(fields)
+        self.thread = QThread()
+        self.worker = ExportWorker(self.api_client, path, self.resource, query, self.columns)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.error.connect(self.on_error)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
+        self.thread.finished.connect(self.on_thread_finished)
+        self.thread.start()
+        self.owner.status_message_signal.emit("正在导出...", 0)
+
+    def on_progress(self, rows: int):
+        self.owner.status_message_signal.emit(f"正在导出... 已写入 {rows} 行", 0)
+
+    def on_finished(self, is_success: bool, summary: object):
+        if summary['cancelled']:
+            self.owner.status_message_signal.emit("导出已中止。", 5000)
+        else:
+            self.owner.status_message_signal.emit(f"导出完成，共 {summary['rows']} 行: {summary['path']}", 10000)
+
+    def on_error(self, error_msg: str):
+        self.owner.status_message_signal.emit("导出失败。", 5000)
+        QMessageBox.critical(self.owner, "导出失败", error_msg)
+
+    def on_thread_finished(self):
+        if self.worker: self.worker.deleteLater()
+        if self.thread: self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
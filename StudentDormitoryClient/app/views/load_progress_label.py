@@ -0,0 +1,16 @@
+# StudentDormitoryClient/app/views/load_progress_label.py
+
+from PyQt6.QtWidgets import QLabel
+
+
+class LoadProgressLabel(QLabel):
+    """显示表格分批显示的进度（见 EntityTableModel.load_progress），显示完毕后自动隐藏"""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setVisible(False)
+        model.load_progress.connect(self.on_progress)
+
+    def on_progress(self, shown: int, total: int):
+        self.setText(f"已显示 {shown} / {total} 行")
+        self.setVisible(shown < total)
@@ -0,0 +1,125 @@
+# StudentDormitoryClient/app/views/occupancy_analytics_widget.py
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView, \
+    QLabel, QTabWidget
+from PyQt6.QtCore import pyqtSignal, Qt, QTimer
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from ..occupancy_analytics import OccupancyAnalytics
+from ..table_models import enable_sorting
+
+
+class OccupancyAnalyticsWidget(QWidget):
+    """入住统计：按楼栋、房间性别类型、院系和学生性别汇总床位与住宿分配情况"""
+    task_requested = pyqtSignal(str, object, tuple)
+    status_message_signal = pyqtSignal(str, int)
+
+    ROOM_COLUMNS = [('名称', 'name'), ('房间数', 'rooms'), ('床位数', 'beds'), ('已住', 'occupied'),
+                    ('空床位', 'vacant'), ('利用率', 'utilization')]
+    STUDENT_COLUMNS = [('名称', 'name'), ('学生数', 'students'), ('已分配', 'allocated'), ('未分配', 'unallocated'),
+                       ('分配率', 'allocation_rate'), ('占已住床位', 'bed_share')]
+    PERCENT_KEYS = ('utilization', 'allocation_rate', 'bed_share')
+    # (标签页标题, 统计方法, 分组, 列)
+    REPORTS = [("按楼栋", 'room_report', 'building', ROOM_COLUMNS),
+               ("按房间性别类型", 'room_report', 'gender', ROOM_COLUMNS),
+               ("按院系", 'student_report', 'department', STUDENT_COLUMNS),
+               ("按学生性别", 'student_report', 'gender', STUDENT_COLUMNS)]
+
+    def __init__(self, api_client, permissions: dict, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.permissions = permissions
+        self.initial_data_loaded = False
+        self.pending_loads = 0
+        self.analytics = OccupancyAnalytics(self.api_client.store, self)
+        self._init_ui()
+        self._setup_connections()
+
+    def _init_ui(self):
+        main_layout = QVBoxLayout(self)
+        button_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("刷新数据", self)
+        self.summary_label = QLabel("", self)
+        button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.summary_label)
+        button_layout.addStretch()
+        self.tab_widget = QTabWidget(self)
+        self.report_tables = []
+        for title, _, _, columns in self.REPORTS:
+            model = QStandardItemModel(self)
+            model.setHorizontalHeaderLabels([header for header, _ in columns])
+            model.setSortRole(Qt.ItemDataRole.UserRole)
+            table = QTableView(self)
+            table.setModel(model)
+            enable_sorting(table)
+            table.setEditTriggers(table.EditTrigger.NoEditTriggers)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            self.tab_widget.addTab(table, title)
+            self.report_tables.append(table)
+        main_layout.addLayout(button_layout)
+        main_layout.addWidget(self.tab_widget)
+        # 分配、调整宿舍等操作会连续修改多条记录，停顿后再统一重新统计
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(300)
+
+    def _setup_connections(self):
+        self.refresh_button.clicked.connect(self.load_data)
+        self.refresh_timer.timeout.connect(self.update_reports)
+        self.api_client.store.changed.connect(self.on_store_changed)
+
+    def on_store_changed(self, kind: str, ids):
+        if kind in ('rooms', 'students') and self.initial_data_loaded and self.isVisible():
+            self.refresh_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 隐藏期间数据可能已经变化，重新显示时统计一次
+        if self.initial_data_loaded:
+            self.update_reports()
+
+    def load_data(self):
+        self.pending_loads = 2
+        self.task_requested.emit('query_rooms', self.on_load_finished,
+                                 (None, ['building_name', 'capacity', 'current_occupancy', 'gender_type']))
+        self.task_requested.emit('query_students', self.on_load_finished,
+                                 (None, ['gender', 'department', 'dormitory_room']))
+
+    def on_load_finished(self, is_success: bool, data: object):
+        if not is_success:
+            self.pending_loads = 0
+            return self.on_task_error(f"无法加载统计数据: {data}")
+        self.pending_loads = max(self.pending_loads - 1, 0)
+        if not self.pending_loads:
+            self.initial_data_loaded = True
+            self.update_reports()
+            self.status_message_signal.emit("入住统计已更新。", 3000)
+
+    def update_reports(self):
+        for table, (_, method, group, columns) in zip(self.report_tables, self.REPORTS):
+            self._fill(table, getattr(self.analytics, method)(group), columns)
+        summary = self.analytics.summary()
+        self.summary_label.setText(f"共 {summary['rooms']} 间房、{summary['beds']} 个床位，已住 {summary['occupied']}，"
+                                   f"空床位 {summary['vacant']}，利用率 {summary['utilization']:.1%}，"
+                                   f"未分配学生 {summary['unallocated']} 人")
+
+    def _fill(self, table: QTableView, rows: list, columns: list):
+        model = table.model()
+        model.removeRows(0, model.rowCount())
+        for row in rows:
+            items = []
+            for _, key in columns:
+                value = row[key]
+                item = QStandardItem(f"{value:.1%}" if key in self.PERCENT_KEYS else str(value))
+                item.setData(value, Qt.ItemDataRole.UserRole)
+                items.append(item)
+            model.appendRow(items)
+        # 统计结果按名称排列，用户点过表头时保持其排序
+        header = table.horizontalHeader()
+        if header.sortIndicatorSection() >= 0:
+            model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+    def set_buttons_enabled(self, enabled: bool):
+        self.refresh_button.setEnabled(enabled)
+
+    def on_task_error(self, error_msg: str):
+        QMessageBox.critical(self, "错误", error_msg)
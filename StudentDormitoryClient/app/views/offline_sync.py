@@ -0,0 +1,83 @@
+# StudentDormitoryClient/app/views/offline_sync.py
+
+from PyQt6.QtWidgets import QLabel, QMessageBox
+from PyQt6.QtCore import QObject, QThread, QTimer
+
+from ..workers import ApiWorker
+
+
+class OfflineSync(QObject):
+    """
+    离线队列的同步器。
+    在状态栏显示离线状态和待同步的修改数；离线或有待同步的修改时，每隔 interval_ms
+    在后台线程中调用 replay_offline_queue，连接恢复后按顺序提交队列中的修改。
+    有修改被提交或被放弃后调用 on_replayed（例如重新加载当前模块），冲突会集中提示一次。
+    """
+
+    def __init__(self, window, api_client, on_replayed=None, interval_ms: int = 10000):
+        super().__init__(window)
+        self.window = window
+        self.api_client = api_client
+        self.on_replayed = on_replayed
+        self.thread = None
+        self.worker = None
+
+        self.label = QLabel()
+        self.label.setVisible(False)
+        window.statusBar().addPermanentWidget(self.label)
+        api_client.outbox.state_changed.connect(self._update_label)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.sync_now)
+        self.timer.start()
+        self._update_label(api_client.outbox.offline, len(api_client.outbox))
+        # 上次退出时留下的修改，启动后尽快同步
+        if len(api_client.outbox):
+            QTimer.singleShot(0, self.sync_now)
+
+    def _update_label(self, offline: bool, pending: int):
+        if offline:
+            text = f"离线模式：{pending} 项修改待同步" if pending else "离线模式：显示的是本地缓存的数据"
+        else:
+            text = f"正在同步 {pending} 项修改..." if pending else ""
+        self.label.setText(text)
+        self.label.setVisible(bool(text))
+
+    def sync_now(self):
+        if self.thread is not None or not self.api_client.outbox.is_active():
+            return
+        self.thread = QThread()
+        self.worker = ApiWorker(self.api_client, 'replay_offline_queue')
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self._on_replayed)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
+        self.thread.finished.connect(self._on_thread_finished)
+        self.thread.start()
+
+    def _on_replayed(self, is_success: bool, report: object):
+        if not is_success:
+            return
+        if report['replayed']:
+            self.window.statusBar().showMessage(f"离线期间的 {report['replayed']} 项修改已同步到服务器", 5000)
+        if report['conflicts']:
+            shown = report['conflicts'][:10]
+            more = len(report['conflicts']) - len(shown)
+            text = "\n".join(shown) + (f"\n……另有 {more} 项" if more > 0 else "")
+            QMessageBox.warning(self.window, "部分离线修改未能提交", f"以下修改已被放弃：\n{text}")
+        if (report['replayed'] or report['conflicts']) and self.on_replayed is not None:
+            self.on_replayed()
+
+    def _on_thread_finished(self):
+        if self.worker: self.worker.deleteLater()
+        if self.thread: self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+
+    def stop(self):
+        self.timer.stop()
+        if self.thread is not None:
+            self.thread.quit()
+            self.thread.wait(self.api_client.timeout * 1000)
@@ -0,0 +1,80 @@
+# StudentDormitoryClient/app/views/refresh_scheduler.py
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QTimer, QEvent
+
+
+class RefreshScheduler(QObject):
+    """
+    定时重新验证当前可见模块的数据，避免数据长时间停留在旧状态。
+
+    - 每次只刷新当前可见的模块（管理员后台的当前页面或工作台的当前标签页），
+      隐藏的模块等到被打开时再加载；
+    - 窗口最小化时不刷新，恢复后立即补一次；用户一段时间没有操作时，刷新间隔逐次加倍，
+      最多到 max_interval_ms，有操作后恢复为 interval_ms；
+    - 有前台任务、打开着模态对话框或模块有未完成的后台工作时跳过本轮。
+
+    列表没有变化时，实体仓库和表格模型都不会发出变化信号，刷新不会导致表格重建。
+    """
+
+    ACTIVITY_EVENTS = (QEvent.Type.MouseButtonPress, QEvent.Type.KeyPress, QEvent.Type.Wheel)
+
+    def __init__(self, window, current_widget, can_run, interval_ms: int = 60000, max_interval_ms: int = 600000):
+        """
+        Args:
+            window (QMainWindow): 所属主窗口。
+            current_widget (callable): 返回当前可见的模块。
+            can_run (callable): 返回 False 时（例如前台任务正在执行）跳过本轮。
+        """
+        super().__init__(window)
+        self.window = window
+        self.current_widget = current_widget
+        self.can_run = can_run
+        self.interval_ms = interval_ms
+        self.max_interval_ms = max_interval_ms
+        self._missed = False  # 最小化期间错过了刷新
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._on_timeout)
+        self.timer.start()
+        window.installEventFilter(self)
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() in self.ACTIVITY_EVENTS:
+            # 用户有操作，恢复正常的刷新间隔
+            if self.timer.interval() != self.interval_ms:
+                self.timer.setInterval(self.interval_ms)
+                self.timer.start()
+        elif obj is self.window and event.type() == QEvent.Type.WindowStateChange:
+            if not self.window.isMinimized() and self._missed:
+                self._missed = False
+                QTimer.singleShot(0, self.refresh_now)
+        return False
+
+    def _on_timeout(self):
+        if self.window.isMinimized():
+            self._missed = True
+        else:
+            self.refresh_now()
+        # 没有新的用户操作时，下一次等待的时间加倍
+        self.timer.setInterval(min(self.timer.interval() * 2, self.max_interval_ms))
+        self.timer.start()
+
+    def refresh_now(self):
+        widget = self.current_widget()
+        if widget is None or not self.can_run() or QApplication.activeModalWidget() is not None:
+            return
+        if not getattr(widget, 'initial_data_loaded', False):
+            return
+        if hasattr(widget, 'has_pending_work') and widget.has_pending_work():
+            return
+        refresh = getattr(widget, 'refresh_data', None) or getattr(widget, 'load_data', None)
+        if refresh is not None:
+            refresh()
+
+    def stop(self):
+        self.timer.stop()
+        QApplication.instance().removeEventFilter(self)
@@ -5,13 +5,17 @@ import random
 import string
 
 from ..api_client import ApiClient
+from ..table_models import changed_fields
 
 class StudentEditDialog(QDialog):
-    def __init__(self, api_client: ApiClient, student_data: dict = None, parent=None):
+    def __init__(self, api_client: ApiClient, student_data: dict = None, parent=None, commit: bool = True):
         super().__init__(parent)
         self.api_client = api_client
         self.data = student_data
         self.is_edit_mode = student_data is not None
+        # commit 为 False 时，编辑模式只负责收集表单，由调用方在后台提交并做乐观更新
+        self.commit = commit
+        self.payload = None
 
         self._init_ui()
         self._setup_connections()
@@ -95,7 +99,13 @@ class StudentEditDialog(QDialog):
             return
 
         if self.is_edit_mode:
-            result = self.api_client.update_student(self.data['id'], payload)
+            # 只提交改动的字段；没有改动时不提交
+            changes = changed_fields(self.data, payload)
+            if not self.commit or not changes:
+                self.payload = changes
+                self.accept()
+                return
+            result = self.api_client.update_student(self.data['id'], changes)
         else:
             payload['username'] = self.username_edit.text().strip()
             payload['password'] = self.password_edit.text()
@@ -0,0 +1,141 @@
+# StudentDormitoryClient/app/views/student_import_dialog.py
+
+from PyQt6.QtWidgets import QDialog, QMessageBox, QFormLayout, QLineEdit, QPushButton, QHBoxLayout, QVBoxLayout, \
+    QLabel, QCheckBox, QProgressBar, QFileDialog
+from PyQt6.QtCore import QThread
+
+from ..api_client import ApiClient
+from ..importers import StudentImportJob
+from ..workers import StudentImportWorker
+
+
+class StudentImportDialog(QDialog):
+    """
+    批量导入学生对话框。
+    CSV/XLSX 文件在后台线程中流式读取、校验并分块上传，中断后可以从上次的进度继续。
+    """
+
+    def __init__(self, api_client: ApiClient, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.thread = None
+        self.worker = None
+        self.imported_count = 0
+
+        self.setWindowTitle("批量导入学生")
+        self.setMinimumWidth(480)
+        self._init_ui()
+        self._setup_connections()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+
+        file_layout = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        self.path_edit.setReadOnly(True)
+        self.browse_button = QPushButton("选择文件")
+        file_layout.addWidget(self.path_edit)
+        file_layout.addWidget(self.browse_button)
+        form_layout.addRow("名单文件:", file_layout)
+
+        self.resume_checkbox = QCheckBox("从上次中断处继续")
+        self.resume_checkbox.setEnabled(False)
+        form_layout.addRow("", self.resume_checkbox)
+        layout.addLayout(form_layout)
+
+        layout.addWidget(QLabel("表头支持: 姓名、性别、年龄、学号、院系、班级、联系方式、登录用户名、初始密码"))
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.status_label = QLabel("")
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.start_button = QPushButton("开始导入")
+        self.start_button.setEnabled(False)
+        self.cancel_button = QPushButton("关闭")
+        button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+
+    def _setup_connections(self):
+        self.browse_button.clicked.connect(self.choose_file)
+        self.start_button.clicked.connect(self.start_import)
+        self.cancel_button.clicked.connect(self.handle_cancel)
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "选择学生名单", "", "学生名单 (*.csv *.xlsx)")
+        if not path:
+            return
+        self.path_edit.setText(path)
+        self.start_button.setEnabled(True)
+        rows_done = StudentImportJob(self.api_client, path).saved_progress()
+        self.resume_checkbox.setEnabled(rows_done > 0)
+        self.resume_checkbox.setChecked(rows_done > 0)
+        self.resume_checkbox.setText(f"从上次中断处继续（已处理到第 {rows_done} 行）" if rows_done else "从上次中断处继续")
+
+    def start_import(self):
+        self.start_button.setEnabled(False)
+        self.browse_button.setEnabled(False)
+        self.resume_checkbox.setEnabled(False)
+        self.cancel_button.setText("中止")
+        self.progress_bar.setRange(0, 0)  # 流式读取无法预知总行数，显示忙碌状态
+        self.status_label.setText("正在读取并上传...")
+
+        self.thread = QThread()
+        self.worker = StudentImportWorker(self.api_client, self.path_edit.text(), self.resume_checkbox.isChecked())
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_import_finished)
+        self.worker.error.connect(self.on_import_error)
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
+        self.thread.finished.connect(self.on_thread_finished)
+        self.thread.start()
+
+    def on_progress(self, read_rows: int, imported: int, rejected: int):
+        self.imported_count = imported
+        self.status_label.setText(f"已读取 {read_rows} 行，成功导入 {imported} 人，拒绝 {rejected} 行")
+
+    def on_import_finished(self, is_success: bool, summary: object):
+        self.imported_count = summary['imported']
+        state = "已中止，下次可从中断处继续。" if summary['cancelled'] else "导入完成。"
+        message = f"{state}\n成功导入 {summary['imported']} 人，拒绝 {summary['rejected']} 行。"
+        if summary['rejected']:
+            message += f"\n被拒绝的行及原因见: {summary['report_path']}"
+        self.status_label.setText(message)
+        QMessageBox.information(self, "批量导入", message)
+
+    def on_import_error(self, error_msg: str):
+        self.status_label.setText(error_msg)
+        QMessageBox.critical(self, "导入失败", error_msg)
+
+    def on_thread_finished(self):
+        if self.worker: self.worker.deleteLater()
+        if self.thread: self.thread.deleteLater()
+        self.worker = None
+        self.thread = None
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1)
+        self.cancel_button.setText("关闭")
+        self.browse_button.setEnabled(True)
+
+    def handle_cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.status_label.setText("正在等待已提交的分块完成...")
+            return
+        if self.imported_count:
+            self.accept()
+        else:
+            self.reject()
+
+    def reject(self):
+        # Esc 键和窗口关闭按钮都会走到这里，导入进行中时不允许关闭对话框
+        if self.thread is not None and self.thread.isRunning():
+            QMessageBox.warning(self, "操作正在进行", "导入仍在进行中，请先中止并等待其结束。")
+            return
+        super().reject()
@@ -1,7 +1,7 @@
 # StudentDorymitoryClient/app/views/student_main_window.py
 
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QFormLayout, QLabel, QStatusBar, QApplication, \
-    QTabWidget, QTableView, QHeaderView, QMessageBox
+    QTabWidget, QTableView, QHeaderView, QMessageBox, QDialog
 from PyQt6.QtGui import QAction, QStandardItemModel, QStandardItem
 from PyQt6.QtCore import QThread, QTimer
 
@@ -12,6 +12,9 @@ from .student_personal_info_dialog import StudentPersonalInfoDialog
 
 
 class StudentMainWindow(QMainWindow):
+    # 室友表格显示的字段
+    ROOMMATE_FIELDS = ['name', 'department', 'class_name', 'phone']
+
     def __init__(self, api_client: ApiClient, user_info: dict, parent=None):
         super().__init__(parent)
         self.api_client = api_client
@@ -96,31 +99,24 @@ class StudentMainWindow(QMainWindow):
         layout.addWidget(self.roommates_table)
 
     def handle_tab_change(self, index):
+        # 首页数据加载失败时，切换到宿舍标签页再尝试一次
         if index == 1 and not self.roommates_data_loaded:
-            self.load_roommate_data()
+            self.load_all_data()
 
     def load_all_data(self):
-        self.start_api_task('get_my_profile', self.on_profile_loaded)
+        # 个人资料、宿舍和室友通过一次组合请求取回
+        self.start_api_task('get_my_dashboard', self.on_dashboard_loaded, False, self.ROOMMATE_FIELDS)
 
-    def on_profile_loaded(self, is_success: bool, data: object):
+    def on_dashboard_loaded(self, is_success: bool, data: object):
         if is_success:
-            self.profile_data = data
-            self.update_profile_ui(data)
+            self.profile_data = data['profile']
+            self.update_profile_ui(self.profile_data)
             self.personal_info_action.setEnabled(True)
-            self.update_dorm_ui(data, [])
-        else:
-            QMessageBox.critical(self, "错误", f"无法加载个人信息: {data}")
-
-    def load_roommate_data(self):
-        self.start_api_task('get_my_roommates', self.on_roommates_loaded)
-
-    def on_roommates_loaded(self, is_success: bool, data: object):
-        if is_success:
+            self.update_dorm_ui(data['room'], data['roommates'])
             self.roommates_data_loaded = True
-            self.update_roommates_table(data)
-            self.statusBar().showMessage("室友信息加载完毕！", 3000)
+            self.statusBar().showMessage("个人信息加载完毕！", 3000)
         else:
-            QMessageBox.critical(self, "错误", f"无法加载室友信息: {data}")
+            QMessageBox.critical(self, "错误", f"无法加载个人信息: {data}")
 
     def update_profile_ui(self, data):
         while self.profile_form_layout.rowCount() > 0: self.profile_form_layout.removeRow(0)
@@ -129,11 +125,9 @@ class StudentMainWindow(QMainWindow):
         for label_text, key in fields.items():
             self.profile_form_layout.addRow(f"<b>{label_text}:</b>", QLabel(str(data.get(key, 'N/A'))))
 
-    def update_dorm_ui(self, profile_data, roommates_data):
-        building = profile_data.get('dormitory_building')
-        room = profile_data.get('dormitory_room')
-        if building and room:
-            self.dorm_info_label.setText(f"<b>宿舍信息:</b> {building} - {room}号房间")
+    def update_dorm_ui(self, room, roommates_data):
+        if room:
+            self.dorm_info_label.setText(f"<b>宿舍信息:</b> {room.get('building_name')} - {room.get('room_number')}号房间")
         else:
             self.dorm_info_label.setText("<b>宿舍信息:</b> 您当前暂未分配宿舍")
         self.update_roommates_table(roommates_data)
@@ -141,7 +135,7 @@ class StudentMainWindow(QMainWindow):
     def update_roommates_table(self, roommates_data):
         self.roommates_model.removeRows(0, self.roommates_model.rowCount())
         for roommate in roommates_data:
-            row = [QStandardItem(roommate.get(k, '')) for k in ['name', 'department', 'class_name', 'phone']]
+            row = [QStandardItem(roommate.get(k, '')) for k in self.ROOMMATE_FIELDS]
             self.roommates_model.appendRow(row)
 
     def start_api_task(self, func_name, on_finished_slot, *args):
@@ -151,10 +145,12 @@ class StudentMainWindow(QMainWindow):
         self.thread = QThread()
         self.worker = ApiWorker(self.api_client, func_name, *args)
         self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(on_finished_slot)
         self.worker.error.connect(lambda msg: QMessageBox.critical(self, "后台错误", msg))
         self.thread.finished.connect(self.on_task_finished)
         self.worker.finished.connect(self.thread.quit)
+        self.worker.error.connect(self.thread.quit)
         self.thread.start()
 
     def on_task_finished(self):
@@ -65,15 +65,15 @@ class StudentPersonalInfoDialog(QDialog):
         layout.addRow("", change_button)
 
     def load_profile(self):
-        """从API加载学生个人信息"""
-        # 这是一个同步调用，因为对话框是模态的，可以接受短暂的阻塞
-        result = self.api_client.get_my_profile()
+        """加载学生个人信息"""
+        # 主窗口已经取回并缓存了首页数据，这里直接复用，不会再发起请求
+        result = self.api_client.get_my_dashboard()
         if 'error' in result:
             QMessageBox.critical(self, "错误", f"无法加载个人信息: {result['error']}")
             self.phone_edit.setEnabled(False) # 加载失败则禁用编辑
             return
 
-        self.profile_data = result
+        self.profile_data = result['profile']
         self.populate_profile_ui()
 
     def populate_profile_ui(self):
@@ -98,6 +98,10 @@ class StudentPersonalInfoDialog(QDialog):
     def handle_profile_update(self):
         """处理更新电话号码的逻辑"""
         new_phone = self.phone_edit.text().strip()
+        if self.profile_data and new_phone == (self.profile_data.get('phone') or ''):
+            # 没有修改，不提交
+            QMessageBox.information(self, "提示", "联系方式没有变化。")
+            return
         result = self.api_client.update_my_profile({"phone": new_phone})
 
         if 'error' in result:
@@ -1,21 +1,42 @@
 # StudentDormitoryClient/app/views/student_view_widget.py
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView
+from functools import partial
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QMessageBox, QHeaderView, \
+    QLineEdit
 from PyQt6.QtCore import pyqtSignal, QTimer
-from PyQt6.QtGui import QStandardItemModel, QStandardItem, QIcon
+from PyQt6.QtGui import QIcon
+from ..table_models import EntityTableModel, IdFilterProxyModel, PagedTableModel, enable_sorting
+from ..workers import with_transform
+from .load_progress_label import LoadProgressLabel
+from ..search_index import StudentSearchIndex
 from .student_edit_dialog import StudentEditDialog
+from .student_import_dialog import StudentImportDialog
+from .list_exporter import ListExporter
+from .bulk_actions import BulkActions
 
 
 class StudentViewWidget(QWidget):
     task_requested = pyqtSignal(str, object, tuple)
     status_message_signal = pyqtSignal(str, int)
+    COLUMNS = [('ID', 'id'), ('姓名', 'name'), ('性别', 'gender'), ('年龄', 'age'), ('学号', 'student_id'),
+               ('院系', 'department'), ('班级', 'class_name'), ('联系方式', 'phone'),
+               ('宿舍楼', 'dormitory_building'), ('房间号', 'dormitory_room')]
 
-    def __init__(self, api_client, permissions: dict, task_commander, parent=None):
+    def __init__(self, api_client, permissions: dict, task_commander=None, parent=None, paged: bool = False):
+        """
+        Args:
+            paged (bool): 为 True 时列表按需分页加载（见 PagedTableModel），内存中只保留最近显示过的若干页；
+                          搜索仍需要完整的名册，只在输入搜索内容时加载。
+        """
         super().__init__(parent)
         self.api_client = api_client
         self.permissions = permissions
         self.commander = task_commander
+        self.paged = paged
         self.initial_data_loaded = False
+        # 完整的名册是否已加载到 student_model 中（分页模式下只在搜索时加载）
+        self.roster_loaded = False
 
         self._init_ui()
         self._setup_connections()
@@ -25,8 +46,11 @@ class StudentViewWidget(QWidget):
         button_layout = QHBoxLayout()
         self.refresh_button = QPushButton("刷新列表", self)
         self.add_student_button = QPushButton("添加学生", self)
+        self.import_button = QPushButton("批量导入", self)
         self.edit_student_button = QPushButton("修改信息", self)
         self.delete_student_button = QPushButton("删除学生", self)
+        self.bulk_edit_button = QPushButton("批量修改", self)
+        self.export_button = QPushButton("导出", self)
         try:
             self.refresh_button.setIcon(QIcon("assets/icons/refresh-cw.svg"))
             self.add_student_button.setIcon(QIcon("assets/icons/plus-circle.svg"))
@@ -36,88 +60,209 @@ class StudentViewWidget(QWidget):
             print(f"警告: 学生管理模块加载图标失败 - {e}")
         button_layout.addWidget(self.refresh_button)
         button_layout.addWidget(self.add_student_button)
+        button_layout.addWidget(self.import_button)
         button_layout.addWidget(self.edit_student_button)
+        button_layout.addWidget(self.bulk_edit_button)
         button_layout.addWidget(self.delete_student_button)
+        button_layout.addWidget(self.export_button)
         button_layout.addStretch()
+        self.student_model = EntityTableModel(self.api_client.store, 'students', self.COLUMNS,
+                                              accepts=self._student_in_view, parent=self)
+        button_layout.addWidget(LoadProgressLabel(self.student_model, self))
+        self.search_edit = QLineEdit(self)
+        self.search_edit.setPlaceholderText("搜索姓名、学号、院系、班级、电话、宿舍（支持拼音首字母）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setMinimumWidth(320)
+        button_layout.addWidget(self.search_edit)
         self.table_view = QTableView(self)
-        self.student_model = QStandardItemModel()
-        self.table_view.setModel(self.student_model)
-        headers = ['ID', '姓名', '性别', '年龄', '学号', '院系', '班级', '联系方式', '宿舍楼', '房间号']
-        self.student_model.setHorizontalHeaderLabels(headers)
+        self.search_index = StudentSearchIndex(self.api_client.store, self)
+        self.proxy_model = IdFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.student_model)
+        self.page_model = None
+        if self.paged:
+            self.page_model = PagedTableModel(self.api_client.store, 'students', self.COLUMNS, parent=self)
+            self.table_view.setModel(self.page_model)
+        else:
+            self.table_view.setModel(self.student_model)
+        enable_sorting(self.table_view)
+        # 输入停顿后再执行查询，避免每个按键都重新过滤表格
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.exporter = ListExporter(self, self.api_client, 'students/', self.COLUMNS, "学生名单")
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table_view.setEditTriggers(self.table_view.EditTrigger.NoEditTriggers)
-        self.table_view.setSelectionBehavior(self.table_view.SelectionBehavior.SelectRows)
-        self.table_view.setSelectionMode(self.table_view.SelectionMode.SingleSelection)
+        # 多选后可以批量删除、批量修改院系和班级
+        self.bulk = BulkActions(self, self.api_client, 'students', self.table_view, "学生",
+                                lambda student: student.get('name', ''),
+                                edit_fields=[("院系", 'department'), ("班级", 'class_name')])
         main_layout.addLayout(button_layout)
         main_layout.addWidget(self.table_view)
         self.add_student_button.setVisible(self.permissions.get('can_add', False))
+        self.import_button.setVisible(self.permissions.get('can_add', False))
         self.edit_student_button.setVisible(self.permissions.get('can_edit', False))
+        self.bulk_edit_button.setVisible(self.permissions.get('can_edit', False))
         self.delete_student_button.setVisible(self.permissions.get('can_delete', False))
 
+    def _student_in_view(self, student: dict) -> bool:
+        """列表加载完成后，新添加的学生直接追加到表格中，无需重新加载"""
+        return self.roster_loaded
+
     def _setup_connections(self):
-        self.refresh_button.clicked.connect(self.load_data)
+        self.refresh_button.clicked.connect(lambda: self.refresh_data(force=True))
         self.add_student_button.clicked.connect(self.open_add_dialog)
+        self.import_button.clicked.connect(self.open_import_dialog)
         self.edit_student_button.clicked.connect(self.open_edit_dialog)
         self.delete_student_button.clicked.connect(self.handle_delete)
+        self.bulk_edit_button.clicked.connect(lambda: self.bulk.edit())
+        self.export_button.clicked.connect(lambda: self.exporter.start())
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.api_client.store.changed.connect(self.on_store_changed)
+        if self.page_model is not None:
+            self.page_model.page_requested.connect(lambda slot, args: self.task_requested.emit('fetch_page', slot, args))
+            self.page_model.load_failed.connect(lambda error: self.on_task_error(f"无法加载学生列表: {error}"))
+
+    def apply_search(self):
+        text = self.search_edit.text()
+        if not text.strip():
+            # 没有搜索时表格直接显示源模型，排序等整表操作不必经过代理逐行过滤
+            self.proxy_model.set_allowed_ids(None)
+            if self.paged:
+                # 搜索结束，回到分页列表，释放名册
+                self._show_model(self.page_model)
+                self.roster_loaded = False
+                self.student_model.clear()
+            else:
+                self._show_model(self.student_model)
+            return
+        if self.paged and not self.roster_loaded:
+            self._load_roster()
+            return
+        self.proxy_model.set_allowed_ids(self.search_index.search(text))
+        self._show_model(self.proxy_model)
+
+    def _show_model(self, model):
+        if self.table_view.model() is not model:
+            self.table_view.setModel(model)
+
+    def _selected_row(self):
+        """返回 (选中行所在的模型, 行号)，没有选中或该行尚未加载时返回 (None, -1)"""
+        selected_indexes = self.table_view.selectionModel().selectedRows()
+        if not selected_indexes:
+            return None, -1
+        row = selected_indexes[0].row()
+        if self.table_view.model() is self.proxy_model:
+            return self.student_model, self.proxy_model.source_row(row)
+        model = self.table_view.model()
+        return (model, row) if model.row_id(row) is not None else (None, -1)
+
+    def on_store_changed(self, kind: str, ids):
+        # 搜索进行中时学生数据发生变化，重新执行一次查询
+        if kind == 'students' and self.search_edit.text().strip():
+            self.search_timer.start()
 
     def load_data(self):
-        self.task_requested.emit('get_all_students', self.on_load_finished, tuple())
+        if self.paged:
+            self.initial_data_loaded = True
+            if self.page_model.rowCount():
+                self.page_model.reload()
+            else:
+                self.page_model.reset()
+            if self.roster_loaded:
+                self._load_roster()
+            return
+        self._load_roster()
+
+    def _load_roster(self):
+        # 只请求表格中显示的字段
+        fields = [key for _, key in self.COLUMNS]
+        self.task_requested.emit('query_students', with_transform(self.on_load_finished, self.student_model.make_buffer),
+                                 (None, fields))
+
+    def refresh_data(self, force: bool = False):
+        # 按院系或楼栋划定范围的客户端带有名册缓存：只有手动刷新才让整个缓存失效，
+        # 定时刷新沿用缓存，其中受修改影响的查询已经由作用域客户端自行丢弃
+        if force and hasattr(self.api_client, 'invalidate'):
+            self.api_client.invalidate()
+        self.load_data()
 
     def on_load_finished(self, is_success: bool, data: object):
         if is_success:
             self.initial_data_loaded = True
-            self.student_model.removeRows(0, self.student_model.rowCount())
-            for student in data:
-                row = [QStandardItem(str(student.get(k, ''))) for k in
-                       ['id', 'name', 'gender', 'age', 'student_id', 'department', 'class_name', 'phone',
-                        'dormitory_building', 'dormitory_room']]
-                self.student_model.appendRow(row)
+            self.roster_loaded = True
+            self.student_model.set_rows(data)
             self.status_message_signal.emit(f"学生数据加载成功！共 {len(data)} 条记录。", 5000)
+            if self.paged:
+                self.apply_search()
         else:
             self.on_task_error(f"无法加载学生列表: {data}")
 
     def open_add_dialog(self):
         dialog = StudentEditDialog(self.api_client, parent=self)
+        if dialog.exec() and self.paged:
+            # 分页表格只更新已加载的行，新增的记录需要重新加载才能出现
+            self.page_model.reset(self.page_model.filters)
+
+    def open_import_dialog(self):
+        dialog = StudentImportDialog(self.api_client, self)
         if dialog.exec():
+            # 导入可能新增上万条记录，结束后统一重新加载一次列表
             self.load_data()
 
     def open_edit_dialog(self):
-        selected_indexes = self.table_view.selectionModel().selectedRows()
-        if not selected_indexes: return
-        selected_row = selected_indexes[0].row()
-        data = {'id': int(self.student_model.item(selected_row, 0).text()),
-                'name': self.student_model.item(selected_row, 1).text(),
-                'gender': self.student_model.item(selected_row, 2).text(),
-                'age': self.student_model.item(selected_row, 3).text(),
-                'student_id': self.student_model.item(selected_row, 4).text(),
-                'department': self.student_model.item(selected_row, 5).text(),
-                'class_name': self.student_model.item(selected_row, 6).text(),
-                'phone': self.student_model.item(selected_row, 7).text()}
-        dialog = StudentEditDialog(self.api_client, data, self)
-        if dialog.exec():
-            self.load_data()
+        model, row = self._selected_row()
+        if model is None: return
+        model.checkout(row)
+        data = model.row_texts(row)
+        dialog = StudentEditDialog(self.api_client, data, self, commit=False)
+        # 没有改动任何字段时 payload 为空，不提交
+        if dialog.exec() and dialog.payload:
+            # 先在本地生效，再在后台提交；失败时回滚
+            change = self.api_client.store.begin_change()
+            change.update_fields('students', data['id'], dialog.payload)
+            self.task_requested.emit('update_student', partial(self.on_update_finished, change),
+                                     (data['id'], dialog.payload))
+
+    def on_update_finished(self, change, is_success: bool, data: object):
+        if is_success:
+            self.status_message_signal.emit("学生信息已保存。", 3000)
+        else:
+            change.rollback()
+            self.on_task_error(f"保存失败，已恢复原数据: {data}")
 
     def handle_delete(self):
-        selected_indexes = self.table_view.selectionModel().selectedRows()
-        if not selected_indexes: return
-        selected_row = selected_indexes[0].row()
-        name = self.student_model.item(selected_row, 1).text()
-        obj_id = int(self.student_model.item(selected_row, 0).text())
+        selected = self.bulk.selected()
+        if len(selected) > 1:
+            return self.bulk.delete(selected)
+        model, row = self._selected_row()
+        if model is None: return
+        name = model.checkout(row).get('name', '')
+        obj_id = model.row_id(row)
         reply = QMessageBox.question(self, "确认删除", f"您确定要删除学生 **{name}** 吗？")
         if reply == QMessageBox.StandardButton.Yes:
-            self.task_requested.emit('delete_student', self.on_delete_finished, (obj_id,))
+            change = self.api_client.store.begin_change()
+            change.remove('students', obj_id)
+            self.task_requested.emit('delete_student', partial(self.on_delete_finished, change), (obj_id,))
 
-    def on_delete_finished(self, is_success: bool, data: object):
+    def on_delete_finished(self, change, is_success: bool, data: object):
         if is_success:
-            self.status_message_signal.emit("删除成功！正在刷新列表...", 3000)
-            QTimer.singleShot(0, self.load_data)
+            self.status_message_signal.emit("删除成功！", 3000)
         else:
+            change.rollback()
             self.on_task_error(f"删除失败: {data}")
 
+    def has_pending_work(self) -> bool:
+        return self.exporter.is_running() or self.bulk.is_running()
+
     def set_buttons_enabled(self, enabled: bool):
         self.refresh_button.setEnabled(enabled)
-        if self.permissions.get('can_add', False): self.add_student_button.setEnabled(enabled)
-        if self.permissions.get('can_edit', False): self.edit_student_button.setEnabled(enabled)
+        if self.permissions.get('can_add', False):
+            self.add_student_button.setEnabled(enabled)
+            self.import_button.setEnabled(enabled)
+        if self.permissions.get('can_edit', False):
+            self.edit_student_button.setEnabled(enabled)
+            self.bulk_edit_button.setEnabled(enabled)
         if self.permissions.get('can_delete', False): self.delete_student_button.setEnabled(enabled)
 
     def on_task_error(self, error_msg: str):
@@ -5,6 +5,7 @@ import random
 import string
 
 from ..api_client import ApiClient
+from ..table_models import changed_fields
 
 class TeacherEditDialog(QDialog):
     def __init__(self, api_client: ApiClient, teacher_data: dict = None, parent=None):
@@ -114,7 +115,12 @@ class TeacherEditDialog(QDialog):
         # 3. 根据模式调用不同的API方法
         if self.is_edit_mode:
             # --- 编辑模式 ---
-            result = self.api_client.update_teacher(self.teacher_data['id'], payload)
+            # 只提交改动的字段；没有改动时不提交
+            changes = changed_fields(self.teacher_data, payload)
+            if not changes:
+                self.accept()
+                return
+            result = self.api_client.update_teacher(self.teacher_data['id'], changes)
         else:
             # --- 添加模式 ---
             # 额外添加用户名和密码
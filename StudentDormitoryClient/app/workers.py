@@ -1,22 +1,61 @@
 # StudentDormitoryClient/app/workers.py
 
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from PyQt6.QtCore import QObject, pyqtSignal
 from .api_client import ApiClient
+from .importers import StudentImportJob
+from .exporters import export_pages
+
+def with_transform(slot, transform):
+    """
+    给结果回调附加一个后台转换步骤：ApiWorker 成功取得数据后，先在后台线程中调用 transform(data)，
+    再把转换结果交给 slot。用于把列表整理成可以直接显示的行（见 EntityTableModel.make_buffer）。
+    """
+    callback = partial(slot)
+    callback.transform = transform
+    return callback
+
+
+def transform_of(slot):
+    """取出 with_transform 附加的转换步骤，没有时返回 None"""
+    return getattr(slot, 'transform', None)
+
+
+def with_error_handler(slot, handler):
+    """
+    给结果回调附加一个错误处理：ApiWorker 执行时抛出异常（error 信号）的情况下调用 handler(错误信息)。
+    用于必须得到答复才能继续的回调，例如 BulkActions 逐块提交；主窗口原有的错误提示不受影响。
+    """
+    callback = partial(slot)
+    callback.on_error = handler
+    return callback
+
+
+def error_handler_of(slot):
+    """取出 with_error_handler 附加的错误处理，没有时返回 None"""
+    return getattr(slot, 'on_error', None)
+
 
 class ApiWorker(QObject):
     """
     一个通用的、运行在独立QThread中的工作器。
     它现在是一个独立的、可被任何模块导入的公共组件。
+    transform 不为 None 时，成功取得的数据先在后台线程中经过 transform 转换，再通过 finished 发出。
     """
     finished = pyqtSignal(bool, object)
     error = pyqtSignal(str)
 
-    def __init__(self, api_client: ApiClient, target_func_name: str, *args, **kwargs):
+    def __init__(self, api_client: ApiClient, target_func_name: str, *args, transform=None, **kwargs):
         super().__init__()
         self.api_client = api_client
         self.target_func_name = target_func_name
         self.args = args
         self.kwargs = kwargs
+        self.transform = transform
 
     def run(self):
         try:
@@ -37,6 +76,130 @@ class ApiWorker(QObject):
                 is_success = False
                 data = "API未返回有效数据"
 
+            if is_success and self.transform is not None:
+                data = self.transform(data)
             self.finished.emit(is_success, data)
         except Exception as e:
-            self.error.emit(f"执行'{self.target_func_name}'时发生致命错误: {e}")
\ No newline at end of file
+            self.error.emit(f"执行'{self.target_func_name}'时发生致命错误: {e}")
+
+
+class AllocationPipeline(QObject):
+    """
+    流水线式的宿舍分配提交器。
+    操作员每确认一次分配就把它放进队列，后台最多有 max_in_flight 个批次在途；
+    队列中积压的分配会合并成一次 allocate_many 批量请求，
+    操作员不需要等待上一个请求返回就可以继续分配下一名学生。
+    """
+    # (学生id, 房间id, 是否成功, 服务器返回的数据或错误信息)
+    item_finished = pyqtSignal(int, int, bool, object)
+
+    def __init__(self, api_client: ApiClient, max_in_flight: int = 4, batch_size: int = 200, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="allocate")
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._active = 0
+        self._pending = 0
+
+    def submit(self, student_id: int, room_id: int):
+        with self._lock:
+            self._queue.append((student_id, room_id))
+            self._pending += 1
+            start_drain = self._active < self.max_in_flight
+            if start_drain:
+                self._active += 1
+        if start_drain:
+            self._executor.submit(self._drain)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._active -= 1
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                results = self.api_client.allocate_many(batch, max_workers=2)
+            except Exception as e:
+                results = [{'student_id': s, 'room_id': r, 'success': False, 'error': str(e)} for s, r in batch]
+            with self._lock:
+                self._pending -= len(batch)
+            # 在线程池中发射信号，Qt 会把它排队投递到界面线程
+            for result in results:
+                data = result.get('data') if result['success'] else result.get('error')
+                self.item_finished.emit(result['student_id'], result['room_id'], result['success'], data)
+
+    def shutdown(self):
+        """所属窗口关闭时调用：等待在途的批次结束并回收线程，之后不再发出 item_finished"""
+        self._executor.shutdown(wait=True)
+        try:
+            self.item_finished.disconnect()
+        except TypeError:
+            pass
+
+
+class StudentImportWorker(QObject):
+    """
+    在独立 QThread 中执行学生批量导入。
+    文件读取、逐行校验和分块上传都在后台线程完成，界面线程只接收进度信号。
+    """
+    progress = pyqtSignal(int, int, int)  # 已读取行数, 成功导入数, 被拒绝数
+    finished = pyqtSignal(bool, object)
+    error = pyqtSignal(str)
+
+    def __init__(self, api_client: ApiClient, source_path: str, resume: bool = False):
+        super().__init__()
+        self.job = StudentImportJob(api_client, source_path)
+        self.resume = resume
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            summary = self.job.run(resume=self.resume, on_progress=self.progress.emit,
+                                   is_cancelled=self._cancelled.is_set)
+            self.finished.emit(True, summary)
+        except Exception as e:
+            self.error.emit(f"导入学生名单时发生错误: {e}")
+
+
+class ExportWorker(QObject):
+    """
+    在独立 QThread 中把列表接口的数据分页拉取并流式写入文件。
+    数据直接来自 API 而不是界面上的表格模型，导出大量数据时内存占用保持平稳。
+    """
+    progress = pyqtSignal(int)  # 已写入行数
+    finished = pyqtSignal(bool, object)
+    error = pyqtSignal(str)
+
+    def __init__(self, api_client: ApiClient, path: str, resource: str, params: dict, columns: list,
+                 page_size: int = 1000):
+        super().__init__()
+        self.api_client = api_client
+        self.path = path
+        self.resource = resource
+        self.params = params
+        self.columns = columns
+        self.page_size = page_size
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            pages = self.api_client.iter_pages(self.resource, self.params, self.page_size)
+            summary = export_pages(self.path, self.columns, pages, on_progress=self.progress.emit,
+                                   is_cancelled=self._cancelled.is_set)
+            self.finished.emit(True, summary)
+        except Exception as e:
+            self.error.emit(f"导出数据时发生错误: {e}")
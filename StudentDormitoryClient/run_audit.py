@@ -0,0 +1,9 @@
+# StudentDormitoryClient/run_audit.py
+
+import sys
+
+from app.integrity_audit import main
+
+if __name__ == '__main__':
+    # 命令行核对数据完整性，参数见 python run_audit.py --help
+    sys.exit(main())